@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+ランの書式設定のマイクロベンチマーク
+プロパティを1つずつ書き込む従来方式と TextStyle.apply を比較する
+"""
+
+import argparse
+import timeit
+
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+from create_slides import COLOR_BLACK, COLOR_WHITE, FONT_EN, FONT_JP, TextStyle
+
+# よく使う書式（本文・英語タイトル）
+STYLES = [
+    (FONT_JP, Pt(13), COLOR_BLACK, None),
+    (FONT_EN, Pt(28), COLOR_WHITE, True),
+]
+
+def new_paragraph():
+    """計測用の段落を1つ作る"""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    box = slide.shapes.add_textbox(Inches(0), Inches(0), Inches(4), Inches(1))
+    return box.text_frame.paragraphs[0]
+
+def bench(runs, repeat):
+    """1ランあたりの所要時間（マイクロ秒, 最良値）を返す"""
+    def legacy():
+        p = new_paragraph()
+        for i in range(runs):
+            font_name, font_size, font_color, bold = STYLES[i % len(STYLES)]
+            run = p.add_run()
+            run.text = "テキスト"
+            run.font.name = font_name
+            run.font.size = font_size
+            run.font.color.rgb = font_color
+            if bold is not None:
+                run.font.bold = bold
+
+    def interned():
+        p = new_paragraph()
+        for i in range(runs):
+            run = p.add_run()
+            run.text = "テキスト"
+            TextStyle(*STYLES[i % len(STYLES)]).apply(run)
+
+    def baseline():
+        p = new_paragraph()
+        for i in range(runs):
+            run = p.add_run()
+            run.text = "テキスト"
+
+    results = {}
+    for name, func in (("baseline", baseline), ("legacy", legacy), ("text_style", interned)):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        results[name] = best / runs * 1e6
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="ラン書式設定のマイクロベンチマーク")
+    parser.add_argument("--runs", type=int, default=5000, help="1回の計測で追加するラン数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    results = bench(args.runs, args.repeat)
+    base = results["baseline"]
+    print(f"baseline   : {base:7.2f} µs/run（ラン追加のみ）")
+    for name in ("legacy", "text_style"):
+        print(f"{name:<11}: {results[name]:7.2f} µs/run（書式設定分 {results[name] - base:6.2f} µs）")
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,48 @@ from pptx import Presentation
 from pptx.util import Inches, Pt, Emu
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
-from pptx.enum.shapes import MSO_SHAPE
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.text.text import _Run
+from pptx.enum.shapes import MSO_SHAPE, MSO_SHAPE_TYPE
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.image import Image, ImagePart
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from copy import deepcopy
+from dataclasses import dataclass
+from functools import lru_cache
+import argparse
+import hashlib
+import io
+import json
+import logging
 import os
+import pickle
+import re
+import time
+import traceback
+import uuid
+
+from deck_ir import (
+    ALIGN_CENTER, ALIGN_LEFT, ALIGN_RIGHT, NO_LINE,
+    Cell, Paragraph, Picture, Rect, Run, SlideIR, Table, TextBox,
+)
+from deck_layout import Box
+from deck_spec import CACHE_DIR, DEFAULT_PLAN, SPEC_FORMAT_VERSION, load_spec
+import deck_export
+import deck_data
+import deck_ir
+import deck_layout
+import deck_metrics
+import deck_textfit
+import deck_validate
+import deck_zip
 
 # =============================================================================
 # デザイン定数
@@ -26,6 +66,7 @@ COLOR_BG_GRAY = RGBColor(245, 248, 248)   # #f5f8f8 - 背景
 COLOR_TEXT_GRAY = RGBColor(155, 155, 155) # #9B9B9B
 COLOR_DARK_GRAY = RGBColor(74, 74, 74)    # #4A4A4A
 COLOR_SECTION_NUM = RGBColor(102, 102, 102)  # #666666
+COLOR_TABLE_LINE = RGBColor(224, 224, 224)   # #E0E0E0 - 表の罫線
 
 # フォント
 FONT_EN = "Oswald"
@@ -37,491 +78,607 @@ PINK_BAR_WIDTH = Inches(0.15)
 MARGIN = Inches(0.5)
 
 # ロゴパス
-LOGO_PATH = "/Users/tanakashunsuke/.claude/skills/novalis-slide-template/assets/NOVALIS3.png"
+LOGO_PATH = os.environ.get(
+    "NOVALIS_LOGO_PATH",
+    "/Users/tanakashunsuke/.claude/skills/novalis-slide-template/assets/NOVALIS3.png",
+)
+
+# 出力先
+DEFAULT_OUTPUT_PATH = "/Users/tanakashunsuke/Desktop/AI-Advisory-Service-Design/AI顧問サービス資料_NOVALIS.pptx"
+
+# テンプレートキャッシュ（ヘッダー・ピンクバー・ロゴを焼き込んだレイアウト）
+CONTENT_LAYOUT_NAME = "NOVALIS Content"
+# 表紙・テンプレート未使用時のレイアウト
+BLANK_LAYOUT_NAME = "Blank"
 
 # =============================================================================
-# ヘルパー関数
+# 画像アセットキャッシュ
 # =============================================================================
 
-def set_shape_fill(shape, color):
-    """図形の塗りつぶし色を設定"""
-    shape.fill.solid()
-    shape.fill.fore_color.rgb = color
-
-def set_shape_no_line(shape):
-    """図形の線を消す"""
-    shape.line.fill.background()
-
-def add_text_frame(shape, text, font_name, font_size, font_color, bold=False, alignment=PP_ALIGN.LEFT):
-    """テキストフレームにテキストを追加"""
-    tf = shape.text_frame
-    tf.clear()
-    p = tf.paragraphs[0]
-    p.alignment = alignment
-    run = p.add_run()
-    run.text = text
-    run.font.name = font_name
-    run.font.size = font_size
-    run.font.color.rgb = font_color
-    run.font.bold = bold
-    return tf
-
-def add_paragraph(text_frame, text, font_name, font_size, font_color, bold=False, alignment=PP_ALIGN.LEFT, space_before=Pt(0), space_after=Pt(6)):
-    """テキストフレームに段落を追加"""
-    p = text_frame.add_paragraph()
-    p.alignment = alignment
-    p.space_before = space_before
-    p.space_after = space_after
-    run = p.add_run()
-    run.text = text
-    run.font.name = font_name
-    run.font.size = font_size
-    run.font.color.rgb = font_color
-    run.font.bold = bold
-    return p
-
-def create_content_slide_base(prs, eng_title, page_num=None):
-    """コンテンツスライドのベースを作成（ヘッダー、ピンクバー、ロゴ）"""
-    slide_layout = prs.slide_layouts[6]  # 空白レイアウト
-    slide = prs.slides.add_slide(slide_layout)
-
-    # 背景色設定
-    background = slide.background
-    fill = background.fill
-    fill.solid()
-    fill.fore_color.rgb = COLOR_BG_GRAY
+# パス -> Image（存在しないパスはNone）。プロセス内で1回だけ読み込む
+_image_assets = {}
+# (パス, width, height) -> 配置サイズ(EMU)
+_image_sizes = {}
+# パッケージに持たせる {sha1: ImagePart} の属性名。デッキ内の全スライドで同じメディアパートを共有する
+# （WeakKeyDictionary だと値の ImagePart がパッケージを参照し続け、デッキが解放されない）
+_IMAGE_PARTS_ATTR = "_novalis_image_parts"
+
+def load_image_asset(path):
+    """画像アセットを読み込む（プロセスごとに1回。存在しなければNone）"""
+    try:
+        return _image_assets[path]
+    except KeyError:
+        pass
+    image = Image.from_file(path) if os.path.exists(path) else None
+    _image_assets[path] = image
+    return image
+
+def clear_image_assets():
+    """読み込み済みの画像を捨てる（ウォッチモードでロゴが差し替えられたとき）"""
+    _image_assets.clear()
+    _image_sizes.clear()
+
+def scaled_image_size(path, image, width=None, height=None):
+    """縦横比を保った配置サイズを返す（ImagePart.scale と同じ計算をキャッシュ）"""
+    key = (path, width, height)
+    try:
+        return _image_sizes[key]
+    except KeyError:
+        pass
+    if width and height:
+        size = (width, height)
+    else:
+        (width_px, height_px), (horz_dpi, vert_dpi) = image.size, image.dpi
+        native_cx = Emu(int(914400 * width_px / horz_dpi))
+        native_cy = Emu(int(914400 * height_px / vert_dpi))
+        if width is None and height is None:
+            size = (native_cx, native_cy)
+        elif width is None:
+            size = (int(round(native_cx * (float(height) / float(native_cy)))), height)
+        else:
+            size = (width, int(round(native_cy * (float(width) / float(native_cx)))))
+    _image_sizes[key] = size
+    return size
+
+def get_image_part(package, image):
+    """パッケージ内の画像パートを返す（初回のみ検索・作成）"""
+    parts = package.__dict__.setdefault(_IMAGE_PARTS_ATTR, {})
+    image_part = parts.get(image.sha1)
+    if image_part is None:
+        # テンプレート由来の既存パートがあれば再利用
+        image_part = package._image_parts._find_by_sha1(image.sha1)
+        if image_part is None:
+            image_part = ImagePart.new(package, image)
+        parts[image.sha1] = image_part
+    return image_part
+
+def picture(path, left, top, width=None, height=None):
+    """キャッシュ済みアセットから画像の IR を作る（ファイルがなければNone）"""
+    image = load_image_asset(path)
+    if image is None:
+        return None
+    cx, cy = scaled_image_size(path, image, width, height)
+    return Picture(left, top, cx, cy, path)
 
-    # 黒ヘッダー
-    header = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        SLIDE_WIDTH, HEADER_HEIGHT
-    )
-    set_shape_fill(header, COLOR_BLACK)
-    set_shape_no_line(header)
-
-    # ピンク縦バー
-    pink_bar = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        PINK_BAR_WIDTH, HEADER_HEIGHT
-    )
-    set_shape_fill(pink_bar, COLOR_PINK)
-    set_shape_no_line(pink_bar)
+# =============================================================================
+# ヘルパー関数
+# =============================================================================
 
-    # 英語タイトル
-    title_box = slide.shapes.add_textbox(
-        Inches(0.4), Inches(0.25),
-        Inches(8), Inches(0.5)
+class TextStyle:
+    """ランの書式（フォント・サイズ・色・太字）
+
+    同じ書式は1つのインスタンスに集約し、生成済みの rPr 要素を
+    コピーするだけで適用する（プロパティごとの書き込みを省く）。
+    bold=None のときは b 属性を付けない。
+    """
+    __slots__ = ("font_name", "font_size", "font_color", "bold", "_rPr")
+    _interned = {}
+
+    def __new__(cls, font_name, font_size, font_color, bold=None):
+        key = (font_name, font_size, font_color, bold)
+        style = cls._interned.get(key)
+        if style is None:
+            style = super().__new__(cls)
+            style.font_name = font_name
+            style.font_size = font_size
+            style.font_color = font_color
+            style.bold = bold
+            style._rPr = style._build_rPr()
+            cls._interned[key] = style
+        return style
+
+    def _build_rPr(self):
+        """python-pptx のフォントAPIで rPr を1回だけ組み立てる"""
+        run = _Run(OxmlElement("a:r"), None)
+        run.font.name = self.font_name
+        run.font.size = self.font_size
+        run.font.color.rgb = self.font_color
+        if self.bold is not None:
+            run.font.bold = self.bold
+        return run._r.rPr
+
+    def apply(self, run):
+        """ランの書式を置き換える"""
+        r = run._r
+        rPr = r.rPr
+        if rPr is not None:
+            r.remove(rPr)
+        r.insert(0, deepcopy(self._rPr))
+        return run
+
+    def run(self, text):
+        """この書式のランの IR を作る"""
+        return Run(text, self.font_name, self.font_size, self.font_color, self.bold)
+
+    def __repr__(self):
+        return f"TextStyle({self.font_name!r}, {self.font_size.pt:g}pt, {self.font_color}, bold={self.bold})"
+
+def paragraph(*runs, align=None, space_before=None, space_after=None):
+    """ランを並べた段落の IR"""
+    return Paragraph(list(runs), align, space_before, space_after)
+
+def add_textbox(slide, left, top, width, height, *paragraphs, wrap=False):
+    """テキストボックスを追加（wrap=True で折り返す）"""
+    return slide.add(TextBox(left, top, width, height, list(paragraphs), wrap))
+
+def add_text_frame(slide, left, top, width, height, text, font_name, font_size, font_color, bold=False, alignment=ALIGN_LEFT):
+    """1行のテキストボックスを追加"""
+    return add_textbox(
+        slide, left, top, width, height,
+        paragraph(TextStyle(font_name, font_size, font_color, bold).run(text), align=alignment),
     )
-    add_text_frame(title_box, eng_title, FONT_EN, Pt(28), COLOR_WHITE, bold=True)
 
+def add_rect(slide, left, top, width, height, color, geometry="rect"):
+    """線なしの塗りつぶし図形を追加"""
+    return slide.add(Rect(left, top, width, height, geometry, fill=color))
+
+def header_chrome():
+    """黒ヘッダー・ピンク縦バー・ロゴの図形"""
+    shapes = [
+        # 黒ヘッダー
+        Rect(Inches(0), Inches(0), SLIDE_WIDTH, HEADER_HEIGHT, fill=COLOR_BLACK),
+        # ピンク縦バー
+        Rect(Inches(0), Inches(0), PINK_BAR_WIDTH, HEADER_HEIGHT, fill=COLOR_PINK),
+    ]
     # ロゴ
+    logo = picture(LOGO_PATH, SLIDE_WIDTH - Inches(1.8), Inches(0.2), height=Inches(0.5))
+    if logo is not None:
+        shapes.append(logo)
+    return shapes
+
+# =============================================================================
+# テンプレートキャッシュ
+# =============================================================================
+
+def template_cache_key():
+    """テンプレートの内容を決める定数からキャッシュキーを作る"""
+    logo_stamp = None
     if os.path.exists(LOGO_PATH):
-        logo = slide.shapes.add_picture(
-            LOGO_PATH,
-            SLIDE_WIDTH - Inches(1.8), Inches(0.2),
-            height=Inches(0.5)
-        )
+        stat = os.stat(LOGO_PATH)
+        logo_stamp = (stat.st_size, stat.st_mtime_ns)
+    source = repr((
+        SLIDE_WIDTH, SLIDE_HEIGHT, HEADER_HEIGHT, PINK_BAR_WIDTH,
+        str(COLOR_BLACK), str(COLOR_PINK), str(COLOR_BG_GRAY),
+        LOGO_PATH, logo_stamp, CONTENT_LAYOUT_NAME,
+    ))
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+def build_template():
+    """ヘッダー類を焼き込んだコンテンツ用レイアウトを持つPresentationを作る
+
+    未使用の「Title Only」レイアウトを作り替えて使う。
+    """
+    prs = Presentation()
+    prs.slide_width = SLIDE_WIDTH
+    prs.slide_height = SLIDE_HEIGHT
 
-    # ページ番号
-    if page_num:
-        page_box = slide.shapes.add_textbox(
-            SLIDE_WIDTH / 2 - Inches(0.25), SLIDE_HEIGHT - Inches(0.4),
-            Inches(0.5), Inches(0.3)
-        )
-        add_text_frame(page_box, str(page_num), FONT_EN, Pt(12), COLOR_TEXT_GRAY, alignment=PP_ALIGN.CENTER)
+    layout = prs.slide_layouts[5]
+    layout.name = CONTENT_LAYOUT_NAME
+    sp_tree = layout.shapes._spTree
+    for shape_elm in list(sp_tree.iter_shape_elms()):
+        sp_tree.remove(shape_elm)
 
+    # 背景色
+    fill = layout.background.fill
+    fill.solid()
+    fill.fore_color.rgb = COLOR_BG_GRAY
+
+    # 作業用スライドで図形を作り、レイアウトへ移す
+    scratch = render_slide(prs, SlideIR(BLANK_LAYOUT_NAME, header_chrome()))
+    for shape in list(scratch.shapes):
+        shape_elm = shape._element
+        if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+            image_part = scratch.part.related_part(shape._pic.blip_rId)
+            shape_elm.blipFill.blip.rEmbed = layout.part.relate_to(image_part, RT.IMAGE)
+        sp_tree.append(shape_elm)
+
+    # 作業用スライドを削除
+    sld_id_lst = prs.slides._sldIdLst
+    sld_id = sld_id_lst[-1]
+    sld_id_lst.remove(sld_id)
+    prs.part.drop_rel(sld_id.rId)
+    return prs
+
+def template_path():
+    """キャッシュ済みテンプレートのパス（なければ作成）"""
+    path = os.path.join(CACHE_DIR, f"template-{template_cache_key()}.pptx")
+    if not os.path.exists(path):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = temporary_path(path)
+        build_template().save(tmp_path)
+        os.replace(tmp_path, path)
+    return path
+
+# テンプレートのパス -> 内容（プロセスごとに1回だけ読み込む。ロゴが変わればパスも変わる）
+_template_bytes = {}
+
+def template_bytes():
+    """キャッシュ済みテンプレートの内容（ワーカーで温めておき、デッキごとにファイルを読まない）"""
+    path = template_path()
+    data = _template_bytes.get(path)
+    if data is None:
+        with open(path, "rb") as f:
+            data = _template_bytes[path] = f.read()
+    return data
+
+def new_presentation(use_template=True):
+    """空のPresentationを作る（use_template ならキャッシュ済みテンプレートから）"""
+    if use_template:
+        return Presentation(io.BytesIO(template_bytes()))
+    prs = Presentation()
+    prs.slide_width = SLIDE_WIDTH
+    prs.slide_height = SLIDE_HEIGHT
+    return prs
+
+def get_content_layout(prs):
+    """ヘッダー類を焼き込んだレイアウトを返す（テンプレート未使用ならNone）"""
+    for layout in prs.slide_layouts:
+        if layout.name == CONTENT_LAYOUT_NAME:
+            return layout
+    return None
+
+
+# =============================================================================
+# スライドベース
+# =============================================================================
+
+def content_slide_base(eng_title, page_num=None):
+    """コンテンツスライドのベース（英語タイトル・ページ番号）
+
+    ヘッダー・ピンクバー・ロゴ・背景は CONTENT_LAYOUT_NAME のレイアウト側にあり、
+    テンプレート未使用のデッキでは render_slide がスライドに直接追加する。
+    """
+    slide = SlideIR(CONTENT_LAYOUT_NAME)
+    add_eng_title_and_page(slide, eng_title, page_num)
     return slide
 
+def add_eng_title_and_page(slide, eng_title, page_num=None):
+    """英語タイトルとページ番号を追加"""
+    # 英語タイトル
+    add_text_frame(slide, Inches(0.4), Inches(0.25), Inches(8), Inches(0.5),
+                   eng_title, FONT_EN, Pt(28), COLOR_WHITE, bold=True)
+
+    # ページ番号
+    if page_num:
+        add_text_frame(slide, SLIDE_WIDTH / 2 - Inches(0.25), SLIDE_HEIGHT - Inches(0.4), Inches(0.5), Inches(0.3),
+                       str(page_num), FONT_EN, Pt(12), COLOR_TEXT_GRAY, alignment=ALIGN_CENTER)
+
 def add_white_content_box(slide, left, top, width, height):
     """白いコンテンツボックスを追加"""
-    box = slide.shapes.add_shape(
-        MSO_SHAPE.ROUNDED_RECTANGLE,
-        left, top, width, height
-    )
-    set_shape_fill(box, COLOR_WHITE)
-    set_shape_no_line(box)
     # 角丸を小さく
-    box.adjustments[0] = 0.02
-    return box
+    return slide.add(Rect(left, top, width, height, "roundRect", fill=COLOR_WHITE, adjust=0.02))
+
+# =============================================================================
+# 描画バックエンド
+# =============================================================================
+#
+# スライドの IR をデッキに追加する方法
+#   xml  : deck_ir のテンプレートでスライドのXMLを直接組み立てる（既定・高速）
+#   pptx : python-pptx のオブジェクトAPIで図形を1つずつ追加する（検証用の基準実装）
+# どちらも同じXMLになる（compare_backends で確認できる）。
+
+BACKENDS = ("xml", "pptx")
+DEFAULT_BACKEND = "xml"
+
+def render_slide(prs, slide_ir, backend=DEFAULT_BACKEND):
+    """スライドの IR をデッキの末尾に追加する"""
+    if slide_ir.layout == CONTENT_LAYOUT_NAME and get_content_layout(prs) is None:
+        # テンプレート未使用：空白レイアウトに背景色とヘッダー類を直接置く
+        slide_ir = SlideIR(BLANK_LAYOUT_NAME, header_chrome() + slide_ir.shapes, COLOR_BG_GRAY)
+    if backend == "pptx":
+        return render_slide_pptx(prs, slide_ir)
+    return render_slide_xml(prs, slide_ir)
+
+def render_slide_xml(prs, slide_ir):
+    """IR をXMLに直列化し、スライドとして復元する"""
+    # 画像の説明はデッキ内の画像パートに合わせる（テンプレート由来なら image.png など）
+    package = prs.part.package
+    xml, images = deck_ir.serialize_slide(
+        slide_ir, lambda path: get_image_part(package, load_image_asset(path)).desc)
+    return restore_slide(prs, SlideSnapshot(xml, slide_ir.layout, images))
+
+_PP_ALIGNMENTS = {ALIGN_LEFT: PP_ALIGN.LEFT, ALIGN_CENTER: PP_ALIGN.CENTER, ALIGN_RIGHT: PP_ALIGN.RIGHT}
+_MSO_SHAPES = {"rect": MSO_SHAPE.RECTANGLE, "roundRect": MSO_SHAPE.ROUNDED_RECTANGLE, "ellipse": MSO_SHAPE.OVAL}
+_MSO_ANCHORS = {"t": MSO_ANCHOR.TOP, "ctr": MSO_ANCHOR.MIDDLE, "b": MSO_ANCHOR.BOTTOM}
+
+def _rgb(color):
+    return color if isinstance(color, RGBColor) else RGBColor.from_string(str(color))
+
+def _fill_text_frame(text_frame, paragraphs):
+    """テキストフレームに段落の IR を書き込む"""
+    for i, para in enumerate(paragraphs):
+        p = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+        if para.align:
+            p.alignment = _PP_ALIGNMENTS[para.align]
+        if para.space_before is not None:
+            p.space_before = para.space_before
+        if para.space_after is not None:
+            p.space_after = para.space_after
+        for run in para.runs:
+            r = p.add_run()
+            r.text = run.text
+            TextStyle(run.font, run.size, _rgb(run.color), run.bold).apply(r)
+
+def _add_textbox_pptx(slide, shape):
+    box = slide.shapes.add_textbox(shape.left, shape.top, shape.width, shape.height)
+    if shape.wrap is not False:
+        box.text_frame.word_wrap = shape.wrap
+    _fill_text_frame(box.text_frame, shape.paragraphs)
+
+def _add_rect_pptx(slide, shape):
+    box = slide.shapes.add_shape(_MSO_SHAPES[shape.geometry], shape.left, shape.top, shape.width, shape.height)
+    if shape.fill is not None:
+        box.fill.solid()
+        box.fill.fore_color.rgb = _rgb(shape.fill)
+    if shape.line is None:
+        box.line.fill.background()
+    else:
+        box.line.color.rgb = _rgb(shape.line)
+        if shape.line_width is not None:
+            box.line.width = shape.line_width
+    if shape.adjust is not None:
+        box.adjustments[0] = shape.adjust
+
+def _add_picture_pptx(slide, shape):
+    # 画像パートはデッキ内で共有する（add_picture は毎回画像を読み込むため使わない）
+    image_part = get_image_part(slide.part.package, load_image_asset(shape.path))
+    rId = slide.part.relate_to(image_part, RT.IMAGE)
+    shapes = slide.shapes
+    id_ = shapes._next_shape_id
+    shapes._spTree.add_pic(id_, "Picture %d" % (id_ - 1), image_part.desc, rId,
+                           shape.left, shape.top, shape.width, shape.height)
+    shapes._recalculate_extents()
+
+def set_cell_border(cell, color, width):
+    """表セルの上下左右の罫線を設定（color が NO_LINE なら線なし）"""
+    tcPr = cell._tc.get_or_add_tcPr()
+    for index, tag in enumerate(("a:lnL", "a:lnR", "a:lnT", "a:lnB")):
+        old = tcPr.find(qn(tag))
+        if old is not None:
+            tcPr.remove(old)
+        ln = OxmlElement(tag)
+        if color == NO_LINE:
+            ln.append(OxmlElement("a:noFill"))
+        else:
+            ln.set("w", str(int(width)))
+            solid_fill = OxmlElement("a:solidFill")
+            srgb = OxmlElement("a:srgbClr")
+            srgb.set("val", str(color))
+            solid_fill.append(srgb)
+            ln.append(solid_fill)
+        # 罫線は塗りつぶしより前に置く（スキーマの要素順）
+        tcPr.insert(index, ln)
+
+def _add_table_pptx(slide, shape):
+    rows, cols = len(shape.rows), len(shape.col_widths)
+    frame = slide.shapes.add_table(rows, cols, shape.left, shape.top,
+                                   sum(shape.col_widths), shape.row_height * rows)
+    table = frame.table
+    # 既定の表スタイルの見出し行・縞模様は使わず、セルごとに指定する
+    table.first_row = False
+    table.horz_banding = False
+    for column, width in zip(table.columns, shape.col_widths):
+        column.width = width
+    for row in table.rows:
+        row.height = shape.row_height
+
+    for i, cells in enumerate(shape.rows):
+        for j, spec in enumerate(cells):
+            cell = table.cell(i, j)
+            if spec.fill is not None:
+                cell.fill.solid()
+                cell.fill.fore_color.rgb = _rgb(spec.fill)
+            if spec.border is not None:
+                set_cell_border(cell, spec.border, spec.border_width)
+            if spec.anchor:
+                cell.vertical_anchor = _MSO_ANCHORS[spec.anchor]
+            if spec.margin_left is not None:
+                cell.margin_left = spec.margin_left
+            if spec.margin_right is not None:
+                cell.margin_right = spec.margin_right
+            _fill_text_frame(cell.text_frame, [spec.paragraph])
+
+_PPTX_WRITERS = {TextBox: _add_textbox_pptx, Rect: _add_rect_pptx, Picture: _add_picture_pptx, Table: _add_table_pptx}
+
+def render_slide_pptx(prs, slide_ir):
+    """python-pptx のオブジェクトAPIで IR の図形を1つずつ追加する"""
+    layout = next(layout for layout in prs.slide_layouts if layout.name == slide_ir.layout)
+    slide = prs.slides.add_slide(layout)
+    if slide_ir.background is not None:
+        fill = slide.background.fill
+        fill.solid()
+        fill.fore_color.rgb = _rgb(slide_ir.background)
+    for shape in slide_ir.shapes:
+        _PPTX_WRITERS[type(shape)](slide, shape)
+    return slide
 
 # =============================================================================
 # スライド作成関数
 # =============================================================================
+#
+# *_slide_ir(plan) がスライドの IR を組み立て、create_*_slide(prs, plan) が
+# それをデッキに追加する。
 
-def create_cover_slide(prs):
+def cover_slide_ir(plan=DEFAULT_PLAN):
     """ページ1：表紙スライド"""
-    slide_layout = prs.slide_layouts[6]
-    slide = prs.slides.add_slide(slide_layout)
-
+    cover = plan.cover
     # 黒背景
-    background = slide.background
-    fill = background.fill
-    fill.solid()
-    fill.fore_color.rgb = COLOR_BLACK
+    slide = SlideIR(BLANK_LAYOUT_NAME, background=COLOR_BLACK)
+
+    # 宛名（見込み客ごとの個別資料のみ）
+    if cover.prospect:
+        add_text_frame(slide, Inches(0.8), Inches(0.6), Inches(11.5), Inches(0.6),
+                       f"{cover.prospect} 御中", FONT_JP, Pt(20), COLOR_WHITE, alignment=ALIGN_CENTER)
 
     # メインキャッチコピー（日本語）
-    catch_box = slide.shapes.add_textbox(
-        Inches(0.8), Inches(1.5),
-        Inches(11.5), Inches(1.2)
-    )
-    tf = catch_box.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    p.alignment = PP_ALIGN.CENTER
-    run = p.add_run()
-    run.text = "「AIを使いたいけど、何から始めれば...」"
-    run.font.name = FONT_JP
-    run.font.size = Pt(32)
-    run.font.color.rgb = COLOR_TEXT_GRAY
+    add_textbox(slide, Inches(0.8), Inches(1.5), Inches(11.5), Inches(1.2),
+                paragraph(TextStyle(FONT_JP, Pt(32), COLOR_TEXT_GRAY).run(cover.catch), align=ALIGN_CENTER),
+                wrap=True)
 
     # 英語タイトル
-    eng_title_box = slide.shapes.add_textbox(
-        Inches(0.8), Inches(2.5),
-        Inches(11.5), Inches(1.5)
-    )
-    tf = eng_title_box.text_frame
-    p = tf.paragraphs[0]
-    p.alignment = PP_ALIGN.CENTER
-    run = p.add_run()
-    run.text = "AI ADVISORY SERVICE"
-    run.font.name = FONT_EN
-    run.font.size = Pt(72)
-    run.font.color.rgb = COLOR_WHITE
-    run.font.bold = True
+    add_textbox(slide, Inches(0.8), Inches(2.5), Inches(11.5), Inches(1.5),
+                paragraph(TextStyle(FONT_EN, Pt(72), COLOR_WHITE, bold=True).run(cover.title), align=ALIGN_CENTER))
 
     # サブタイトル
-    sub_box = slide.shapes.add_textbox(
-        Inches(0.8), Inches(4.0),
-        Inches(11.5), Inches(0.8)
-    )
-    tf = sub_box.text_frame
-    p = tf.paragraphs[0]
-    p.alignment = PP_ALIGN.CENTER
-    run = p.add_run()
-    run.text = "建設業専門のAI顧問が、月10万円で御社に"
-    run.font.name = FONT_JP
-    run.font.size = Pt(28)
-    run.font.color.rgb = COLOR_TEXT_GRAY
+    subtitle = cover.subtitle.replace("{industry}", plan.industry)
+    add_textbox(slide, Inches(0.8), Inches(4.0), Inches(11.5), Inches(0.8),
+                paragraph(TextStyle(FONT_JP, Pt(28), COLOR_TEXT_GRAY).run(subtitle), align=ALIGN_CENTER))
 
     # 実績コピー
-    cred_box = slide.shapes.add_textbox(
-        Inches(0.8), Inches(5.0),
-        Inches(11.5), Inches(1.0)
-    )
-    tf = cred_box.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    p.alignment = PP_ALIGN.CENTER
-    run = p.add_run()
-    run.text = "複数回全国トップセールス獲得・5年連続で個人年間売上2億円維持\n建設業の現場を知り尽くしたAI専門家が、御社のAI活用を0から伴走支援"
-    run.font.name = FONT_JP
-    run.font.size = Pt(14)
-    run.font.color.rgb = COLOR_TEXT_GRAY
+    add_textbox(slide, Inches(0.8), Inches(5.0), Inches(11.5), Inches(1.0),
+                paragraph(TextStyle(FONT_JP, Pt(14), COLOR_TEXT_GRAY).run(cover.credentials), align=ALIGN_CENTER),
+                wrap=True)
 
     # ロゴ
-    if os.path.exists(LOGO_PATH):
-        slide.shapes.add_picture(
-            LOGO_PATH,
-            SLIDE_WIDTH - Inches(2.0), SLIDE_HEIGHT - Inches(0.8),
-            height=Inches(0.5)
-        )
+    logo = picture(LOGO_PATH, SLIDE_WIDTH - Inches(2.0), SLIDE_HEIGHT - Inches(0.8), height=Inches(0.5))
+    if logo is not None:
+        slide.add(logo)
 
     return slide
 
-def create_problem_slide(prs):
+def problem_slide_ir(plan=DEFAULT_PLAN):
     """ページ2：こんなお悩みありませんか？"""
-    slide = create_content_slide_base(prs, "Problems", 2)
+    slide = content_slide_base("Problems", 2)
 
     # 日本語タイトル
-    jp_title = slide.shapes.add_textbox(
-        Inches(0.5), Inches(1.1),
-        Inches(12), Inches(0.6)
-    )
-    add_text_frame(jp_title, "こんなお悩みありませんか？", FONT_JP, Pt(28), COLOR_BLACK, bold=True)
+    add_text_frame(slide, Inches(0.5), Inches(1.1), Inches(12), Inches(0.6),
+                   plan.problems.title, FONT_JP, Pt(28), COLOR_BLACK, bold=True)
 
     # 白いコンテンツボックス
-    content_box = add_white_content_box(slide, Inches(0.5), Inches(1.8), Inches(12.3), Inches(4.8))
-
-    # 課題リスト用テキストボックス
-    problems = [
-        "□ 日中は現場、定時後に事務処理。気づけば毎月35時間以上の残業",
-        "□ 見積もり作成に2時間以上。原価表を見ながら電卓を叩く日々",
-        "□ 日報・写真整理・報告書作成。この『ちょっとした作業』の積み重ねが残業に",
-        "□ 提案資料がいつも似たようなものになり、差別化できず契約率が上がらない",
-        "□ チラシ制作を外注すると約20万円。自分で作りたいがデザインスキルも時間もない",
-        "□ AIを使いたいが、何から始めればいいかわからない。高額な投資のイメージもある",
-        "□ AI人材を採用したいが年収も高額。でも若手に教えられるほど自分も詳しくない",
-    ]
-
-    problem_box = slide.shapes.add_textbox(
-        Inches(0.8), Inches(2.0),
-        Inches(11.5), Inches(3.8)
-    )
-    tf = problem_box.text_frame
-    tf.word_wrap = True
+    add_white_content_box(slide, Inches(0.5), Inches(1.8), Inches(12.3), Inches(4.8))
 
-    for i, problem in enumerate(problems):
-        if i == 0:
-            p = tf.paragraphs[0]
-        else:
-            p = tf.add_paragraph()
-        p.space_after = Pt(12)
-        run = p.add_run()
-        run.text = problem
-        run.font.name = FONT_JP
-        run.font.size = Pt(16)
-        run.font.color.rgb = COLOR_BLACK
+    # 課題リスト
+    style = TextStyle(FONT_JP, Pt(16), COLOR_BLACK)
+    add_textbox(slide, Inches(0.8), Inches(2.0), Inches(11.5), Inches(3.8),
+                *(paragraph(style.run(problem), space_after=Pt(12)) for problem in plan.problems.items),
+                wrap=True)
 
     # 締めの一言
-    closing_box = slide.shapes.add_textbox(
-        Inches(0.5), Inches(6.0),
-        Inches(12.3), Inches(1.0)
-    )
-    tf = closing_box.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    p.alignment = PP_ALIGN.CENTER
-    run = p.add_run()
-    run.text = "「AIを導入したいけど、どこから手をつければ...」\nその悩み、建設業で毎日0時残業から定時帰りを実現した私が、0から一緒に解決します。"
-    run.font.name = FONT_JP
-    run.font.size = Pt(14)
-    run.font.color.rgb = COLOR_PINK
-    run.font.bold = True
+    add_textbox(slide, Inches(0.5), Inches(6.0), Inches(12.3), Inches(1.0),
+                paragraph(TextStyle(FONT_JP, Pt(14), COLOR_PINK, bold=True).run(plan.problems.closing), align=ALIGN_CENTER),
+                wrap=True)
 
     return slide
 
-def create_why_fail_slide(prs):
+def why_fail_slide_ir(plan=DEFAULT_PLAN):
     """ページ3：なぜ多くの会社がAI導入に失敗するのか"""
-    slide = create_content_slide_base(prs, "Why AI Projects Fail", 3)
+    slide = content_slide_base("Why AI Projects Fail", 3)
+    heading = TextStyle(FONT_JP, Pt(16), COLOR_PINK, bold=True)
+    body = TextStyle(FONT_JP, Pt(13), COLOR_BLACK)
 
     # 日本語タイトル
-    jp_title = slide.shapes.add_textbox(
-        Inches(0.5), Inches(1.1),
-        Inches(12), Inches(0.6)
-    )
-    add_text_frame(jp_title, "なぜ多くの会社がAI導入に失敗するのか", FONT_JP, Pt(26), COLOR_BLACK, bold=True)
+    add_text_frame(slide, Inches(0.5), Inches(1.1), Inches(12), Inches(0.6),
+                   "なぜ多くの会社がAI導入に失敗するのか", FONT_JP, Pt(26), COLOR_BLACK, bold=True)
 
-    # 左側コンテンツボックス（多くの人が想像する効率化）
-    left_box = add_white_content_box(slide, Inches(0.5), Inches(1.8), Inches(5.8), Inches(2.2))
+    # 上段を左右2つ、下段を1つのボックスに分ける
+    upper, lower = deck_layout.rows(Box(Inches(0.5), Inches(1.8), Inches(12.3), Inches(4.8)), 2, Inches(0.2),
+                                    weights=(22, 24))
+    left, right = deck_layout.columns(upper, 2, Inches(0.2), weights=(58, 63))
 
-    left_text = slide.shapes.add_textbox(
-        Inches(0.7), Inches(1.9),
-        Inches(5.4), Inches(2.0)
+    # 左側コンテンツボックス（多くの人が想像する効率化）
+    add_white_content_box(slide, *left)
+    add_textbox(
+        slide, *left.inset(Inches(0.2), Inches(0.1)),
+        paragraph(heading.run("多くの人が想像する『効率化』")),
+        paragraph(body.run("「見積もり作成が、ボタン一つで終わる」\n「提案書が、自動で完璧に仕上がる」\n\nたしかに、AIがあれば実現可能です。\nしかし、最大の効率化とは、\nもっと地味な改善の積み重ねです。"),
+                  space_before=Pt(8)),
+        wrap=True,
     )
-    tf = left_text.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    run = p.add_run()
-    run.text = "多くの人が想像する『効率化』"
-    run.font.name = FONT_JP
-    run.font.size = Pt(16)
-    run.font.color.rgb = COLOR_PINK
-    run.font.bold = True
-
-    p = tf.add_paragraph()
-    p.space_before = Pt(8)
-    run = p.add_run()
-    run.text = "「見積もり作成が、ボタン一つで終わる」\n「提案書が、自動で完璧に仕上がる」\n\nたしかに、AIがあれば実現可能です。\nしかし、最大の効率化とは、\nもっと地味な改善の積み重ねです。"
-    run.font.name = FONT_JP
-    run.font.size = Pt(13)
-    run.font.color.rgb = COLOR_BLACK
 
     # 右側コンテンツボックス（本当の効率化）
-    right_box = add_white_content_box(slide, Inches(6.5), Inches(1.8), Inches(6.3), Inches(2.2))
-
-    right_text = slide.shapes.add_textbox(
-        Inches(6.7), Inches(1.9),
-        Inches(5.9), Inches(2.0)
+    add_white_content_box(slide, *right)
+    add_textbox(
+        slide, *right.inset(Inches(0.2), Inches(0.1)),
+        paragraph(heading.run("本当の効率化とは")),
+        paragraph(body.run("「原価を調べる5分」を2分に。\n「文章を考える3分」を1分に。\n「ファイル名をつける2分」を30秒に。\n\n5分の短縮を10個実現するだけで、50分。\nこれを10日やったら、500分。"),
+                  space_before=Pt(8)),
+        wrap=True,
     )
-    tf = right_text.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    run = p.add_run()
-    run.text = "本当の効率化とは"
-    run.font.name = FONT_JP
-    run.font.size = Pt(16)
-    run.font.color.rgb = COLOR_PINK
-    run.font.bold = True
-
-    p = tf.add_paragraph()
-    p.space_before = Pt(8)
-    run = p.add_run()
-    run.text = "「原価を調べる5分」を2分に。\n「文章を考える3分」を1分に。\n「ファイル名をつける2分」を30秒に。\n\n5分の短縮を10個実現するだけで、50分。\nこれを10日やったら、500分。"
-    run.font.name = FONT_JP
-    run.font.size = Pt(13)
-    run.font.color.rgb = COLOR_BLACK
 
     # 下部コンテンツボックス（だから「AI顧問」）
-    bottom_box = add_white_content_box(slide, Inches(0.5), Inches(4.2), Inches(12.3), Inches(2.4))
-
-    bottom_text = slide.shapes.add_textbox(
-        Inches(0.7), Inches(4.3),
-        Inches(11.9), Inches(2.2)
+    add_white_content_box(slide, *lower)
+    add_textbox(
+        slide, *lower.inset(Inches(0.2), Inches(0.1)),
+        paragraph(heading.run("でも、アプリや外注では解決しない")),
+        paragraph(body.run("「常に、あなたの会社のどこを効率化できるか」を見極め続ける人が必要だから。\n業務はどんなものがあって、どう分解すればいいのか。どこにAIが使えて、どこに使えないのか。\nそれを判断して、解決策まで導く。これは、専門家がいないとできません。"),
+                  space_before=Pt(6)),
+        paragraph(TextStyle(FONT_JP, Pt(14), COLOR_BLACK, bold=True).run("だから、「AI顧問」という形を作りました。常に寄り添ってくれる人。伴走してくれる人。それが、このサービスの本質です。"),
+                  space_before=Pt(12)),
+        wrap=True,
     )
-    tf = bottom_text.text_frame
-    tf.word_wrap = True
-    p = tf.paragraphs[0]
-    run = p.add_run()
-    run.text = "でも、アプリや外注では解決しない"
-    run.font.name = FONT_JP
-    run.font.size = Pt(16)
-    run.font.color.rgb = COLOR_PINK
-    run.font.bold = True
-
-    p = tf.add_paragraph()
-    p.space_before = Pt(6)
-    run = p.add_run()
-    run.text = "「常に、あなたの会社のどこを効率化できるか」を見極め続ける人が必要だから。\n業務はどんなものがあって、どう分解すればいいのか。どこにAIが使えて、どこに使えないのか。\nそれを判断して、解決策まで導く。これは、専門家がいないとできません。"
-    run.font.name = FONT_JP
-    run.font.size = Pt(13)
-    run.font.color.rgb = COLOR_BLACK
-
-    p = tf.add_paragraph()
-    p.space_before = Pt(12)
-    run = p.add_run()
-    run.text = "だから、「AI顧問」という形を作りました。常に寄り添ってくれる人。伴走してくれる人。それが、このサービスの本質です。"
-    run.font.name = FONT_JP
-    run.font.size = Pt(14)
-    run.font.color.rgb = COLOR_BLACK
-    run.font.bold = True
 
     return slide
 
-def create_story_slide(prs):
-    """ページ4：なぜ私が建設業に特化するのか（原体験ストーリー）"""
-    slide = create_content_slide_base(prs, "My Story", 4)
+def story_slide_ir(plan=DEFAULT_PLAN):
+    """ページ4：なぜ私がこの業種に特化するのか（原体験ストーリー）"""
+    slide = content_slide_base("My Story", 4)
+    story = plan.story
+    heading = TextStyle(FONT_JP, Pt(16), COLOR_PINK, bold=True)
 
     # 日本語タイトル
-    jp_title = slide.shapes.add_textbox(
-        Inches(0.5), Inches(1.1),
-        Inches(12), Inches(0.6)
-    )
-    add_text_frame(jp_title, "なぜ私が建設業に特化するのか", FONT_JP, Pt(26), COLOR_BLACK, bold=True)
+    add_text_frame(slide, Inches(0.5), Inches(1.1), Inches(12), Inches(0.6),
+                   story.title.replace("{industry}", plan.industry), FONT_JP, Pt(26), COLOR_BLACK, bold=True)
 
     # 左側：ストーリーボックス
-    story_box = add_white_content_box(slide, Inches(0.5), Inches(1.8), Inches(7.5), Inches(5.0))
+    add_white_content_box(slide, Inches(0.5), Inches(1.8), Inches(7.5), Inches(5.0))
 
-    story_text = slide.shapes.add_textbox(
-        Inches(0.7), Inches(1.95),
-        Inches(7.1), Inches(4.7)
+    add_textbox(
+        slide, Inches(0.7), Inches(1.95), Inches(7.1), Inches(4.7),
+        paragraph(heading.run(story.heading)),
+        paragraph(TextStyle(FONT_JP, Pt(11), COLOR_BLACK).run(story.body.strip()), space_before=Pt(6)),
+        wrap=True,
     )
-    tf = story_text.text_frame
-    tf.word_wrap = True
-
-    p = tf.paragraphs[0]
-    run = p.add_run()
-    run.text = "私がこのサービスを作った理由"
-    run.font.name = FONT_JP
-    run.font.size = Pt(16)
-    run.font.color.rgb = COLOR_PINK
-    run.font.bold = True
-
-    story_content = """
-リフォーム営業として入社した頃、毎日0時を超える残業が当たり前でした。
-
-見積もり作成に2時間以上。原価表すらなく、FAXを指で照らし合わせて原価を調べる。日中は現場、帰社してから事務作業。どれだけ頑張っても、12時を切ることがない。
-
-ある時、気づきました。
-「こんな環境で、新しい社員が定着するわけがない。」
-
-だから私は、効率化を始めました。
-
-提案資料のテンプレートを作り直し、原価表を自分で更新し、見積もりシステムを自作。社内に数え切れないほどあった報告書式。目につくものを片っ端から直していきました。
-
-身の回りのすべてを、端から端まで効率化しました。"""
-
-    p = tf.add_paragraph()
-    p.space_before = Pt(6)
-    run = p.add_run()
-    run.text = story_content.strip()
-    run.font.name = FONT_JP
-    run.font.size = Pt(11)
-    run.font.color.rgb = COLOR_BLACK
 
     # 右側：実績ボックス
-    result_box = add_white_content_box(slide, Inches(8.2), Inches(1.8), Inches(4.6), Inches(5.0))
-
-    result_text = slide.shapes.add_textbox(
-        Inches(8.4), Inches(1.95),
-        Inches(4.2), Inches(4.7)
-    )
-    tf = result_text.text_frame
-    tf.word_wrap = True
-
-    p = tf.paragraphs[0]
-    run = p.add_run()
-    run.text = "その結果"
-    run.font.name = FONT_JP
-    run.font.size = Pt(16)
-    run.font.color.rgb = COLOR_PINK
-    run.font.bold = True
-
-    results = [
-        ("見積もり作成", "2時間 → 10分"),
-        ("毎日0時残業", "→ 定時帰り"),
-        ("全国トップセールス", "複数回獲得"),
-        ("5年連続", "年間売上2億円"),
-        ("創業40年で", "過去最高売上達成"),
-    ]
+    add_white_content_box(slide, Inches(8.2), Inches(1.8), Inches(4.6), Inches(5.0))
 
-    for label, value in results:
-        p = tf.add_paragraph()
-        p.space_before = Pt(16)
-        run = p.add_run()
-        run.text = label
-        run.font.name = FONT_JP
-        run.font.size = Pt(12)
-        run.font.color.rgb = COLOR_TEXT_GRAY
-
-        p = tf.add_paragraph()
-        p.space_before = Pt(2)
-        run = p.add_run()
-        run.text = value
-        run.font.name = FONT_JP
-        run.font.size = Pt(18)
-        run.font.color.rgb = COLOR_BLACK
-        run.font.bold = True
+    label_style = TextStyle(FONT_JP, Pt(12), COLOR_TEXT_GRAY)
+    value_style = TextStyle(FONT_JP, Pt(18), COLOR_BLACK, bold=True)
+    paragraphs = [paragraph(heading.run(story.results_title))]
+    for label, value in story.results:
+        paragraphs.append(paragraph(label_style.run(label), space_before=Pt(16)))
+        paragraphs.append(paragraph(value_style.run(value), space_before=Pt(2)))
+    add_textbox(slide, Inches(8.4), Inches(1.95), Inches(4.2), Inches(4.7), *paragraphs, wrap=True)
 
     return slide
 
-def create_concept_slide(prs):
+def concept_slide_ir(plan=DEFAULT_PLAN):
     """ページ5：サービスのコンセプト"""
-    slide = create_content_slide_base(prs, "Service Concept", 5)
+    slide = content_slide_base("Service Concept", 5)
 
     # 日本語タイトル
-    jp_title = slide.shapes.add_textbox(
-        Inches(0.5), Inches(1.1),
-        Inches(12), Inches(0.6)
-    )
-    add_text_frame(jp_title, "AI人材を「採用」するのではなく、「顧問」として迎える", FONT_JP, Pt(24), COLOR_BLACK, bold=True)
+    add_text_frame(slide, Inches(0.5), Inches(1.1), Inches(12), Inches(0.6),
+                   "AI人材を「採用」するのではなく、「顧問」として迎える", FONT_JP, Pt(24), COLOR_BLACK, bold=True)
 
     # 比較表ボックス
-    table_box = add_white_content_box(slide, Inches(0.5), Inches(1.8), Inches(12.3), Inches(4.2))
-
-    # 表ヘッダー
-    # 左列ヘッダー
-    header_left = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0.7), Inches(2.0),
-        Inches(5.8), Inches(0.6)
-    )
-    set_shape_fill(header_left, COLOR_BLACK)
-    set_shape_no_line(header_left)
-    header_left_text = slide.shapes.add_textbox(Inches(0.7), Inches(2.05), Inches(5.8), Inches(0.5))
-    add_text_frame(header_left_text, "AI人材を採用", FONT_JP, Pt(18), COLOR_WHITE, bold=True, alignment=PP_ALIGN.CENTER)
-
-    # 右列ヘッダー
-    header_right = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(6.7), Inches(2.0),
-        Inches(5.8), Inches(0.6)
-    )
-    set_shape_fill(header_right, COLOR_PINK)
-    set_shape_no_line(header_right)
-    header_right_text = slide.shapes.add_textbox(Inches(6.7), Inches(2.05), Inches(5.8), Inches(0.5))
-    add_text_frame(header_right_text, "AI顧問", FONT_JP, Pt(18), COLOR_WHITE, bold=True, alignment=PP_ALIGN.CENTER)
+    add_white_content_box(slide, Inches(0.5), Inches(1.8), Inches(12.3), Inches(4.2))
+
+    # 表ヘッダー（左列：採用、右列：顧問）
+    headers = deck_layout.columns(Box(Inches(0.7), Inches(2.0), Inches(11.8), Inches(0.6)), 2, Inches(0.2))
+    labels = deck_layout.columns(Box(Inches(0.7), Inches(2.05), Inches(11.8), Inches(0.5)), 2, Inches(0.2))
+    for cell, label, text, color in zip(headers, labels, ("AI人材を採用", "AI顧問"), (COLOR_BLACK, COLOR_PINK)):
+        add_rect(slide, *cell, color)
+        add_text_frame(slide, *label, text, FONT_JP, Pt(18), COLOR_WHITE, bold=True, alignment=ALIGN_CENTER)
 
     # 比較内容
     comparisons = [
@@ -532,222 +689,119 @@ def create_concept_slide(prs):
         ("辞めるリスクがある", "辞めない"),
     ]
 
-    y_start = 2.8
-    for i, (left_text, right_text) in enumerate(comparisons):
-        y = y_start + i * 0.65
+    rows = deck_layout.repeat(Box(Inches(0.7), Inches(2.8), Inches(11.8), Inches(0.55)), len(comparisons), Inches(0.1))
+    for i, (row, (left_text, right_text)) in enumerate(zip(rows, comparisons)):
+        left, right = deck_layout.columns(row, 2, Inches(0.2))
+        size = Pt(16) if i == 0 else Pt(14)
 
         # 左列
-        left_box = slide.shapes.add_textbox(Inches(0.7), Inches(y), Inches(5.8), Inches(0.55))
-        tf = left_box.text_frame
-        p = tf.paragraphs[0]
-        p.alignment = PP_ALIGN.CENTER
-        run = p.add_run()
-        run.text = left_text
-        run.font.name = FONT_JP
-        run.font.size = Pt(16) if i == 0 else Pt(14)
-        run.font.color.rgb = COLOR_BLACK
-        run.font.bold = (i == 0)
+        add_textbox(slide, *left,
+                    paragraph(TextStyle(FONT_JP, size, COLOR_BLACK, bold=(i == 0)).run(left_text), align=ALIGN_CENTER))
 
         # 右列
-        right_box = slide.shapes.add_textbox(Inches(6.7), Inches(y), Inches(5.8), Inches(0.55))
-        tf = right_box.text_frame
-        p = tf.paragraphs[0]
-        p.alignment = PP_ALIGN.CENTER
-        run = p.add_run()
-        run.text = right_text
-        run.font.name = FONT_JP
-        run.font.size = Pt(16) if i == 0 else Pt(14)
-        run.font.color.rgb = COLOR_PINK if i == 0 else COLOR_BLACK
-        run.font.bold = (i == 0)
+        right_style = TextStyle(FONT_JP, size, COLOR_PINK if i == 0 else COLOR_BLACK, bold=(i == 0))
+        add_textbox(slide, *right,
+                    paragraph(right_style.run(right_text), align=ALIGN_CENTER))
 
     # キーメッセージ
-    key_msg = slide.shapes.add_textbox(
-        Inches(0.5), Inches(6.2),
-        Inches(12.3), Inches(0.8)
-    )
-    tf = key_msg.text_frame
-    p = tf.paragraphs[0]
-    p.alignment = PP_ALIGN.CENTER
-    run = p.add_run()
-    run.text = "「この人に聞けば、AI周りはなんとかなる」そんな安心感を、月10万円で。"
-    run.font.name = FONT_JP
-    run.font.size = Pt(18)
-    run.font.color.rgb = COLOR_PINK
-    run.font.bold = True
+    add_textbox(slide, Inches(0.5), Inches(6.2), Inches(12.3), Inches(0.8),
+                paragraph(TextStyle(FONT_JP, Pt(18), COLOR_PINK, bold=True).run("「この人に聞けば、AI周りはなんとかなる」そんな安心感を、月10万円で。"),
+                          align=ALIGN_CENTER))
 
     return slide
 
-def create_plan_slide(prs):
-    """ページ6：3つのプラン"""
-    slide = create_content_slide_base(prs, "Pricing Plans", 6)
+PLAN_AREA = Box(Inches(0.5), Inches(1.8), Inches(12.1), Inches(5.0))
+PLAN_GAP = Inches(0.2)
 
-    # 日本語タイトル
-    jp_title = slide.shapes.add_textbox(
-        Inches(0.5), Inches(1.1),
-        Inches(12), Inches(0.6)
-    )
-    add_text_frame(jp_title, "3つのプランからお選びいただけます", FONT_JP, Pt(24), COLOR_BLACK, bold=True)
-
-    plans = [
-        {
-            "name": "伴走プラン",
-            "price": "月額 15万円",
-            "catch": "「AI専門家が、御社のそばに」",
-            "features": ["チャット無制限", "キックオフMTG", "振り返りMTG", "月次レポート"],
-            "for": "まずはAI活用を始めたい方向け",
-            "highlight": False
-        },
-        {
-            "name": "自走プラン",
-            "price": "月額 40万円",
-            "catch": "「社内にAI人材を育てる」",
-            "features": ["伴走プラン全内容", "社員研修（4名まで）", "内製化支援"],
-            "for": "社員にAIスキルを身につけさせたい方向け",
-            "highlight": True
-        },
-        {
-            "name": "エージェント開発プラン",
-            "price": "月額 60万円",
-            "catch": "「御社専用のAIツールを開発」",
-            "features": ["要件整理MTG", "月1開発MTG", "オーダーメイド開発"],
-            "for": "「これを作ってほしい」がある方向け",
-            "highlight": False
-        }
-    ]
+def fitted_size(text, box, max_size, min_size, bold=False):
+    """box（Box）に折り返して収まる最大のフォントサイズ"""
+    return Pt(deck_textfit.fit_font_size(text, FONT_JP, box.width, box.height, max_size, min_size, bold=bold))
+
+def line_size(text, box, max_size, min_size, bold=False):
+    """box（Box）の幅に1行で収まる最大のフォントサイズ"""
+    return Pt(deck_textfit.fit_line_size(text, FONT_JP, box.width, max_size, min_size, bold=bold))
+
+def plan_slide_ir(plan=DEFAULT_PLAN):
+    """ページ6：料金プラン（プランの数だけ列に分ける）"""
+    slide = content_slide_base("Pricing Plans", 6)
 
-    box_width = Inches(3.9)
-    box_height = Inches(5.0)
-    start_x = Inches(0.5)
-    gap = Inches(0.2)
+    # 日本語タイトル
+    add_text_frame(slide, Inches(0.5), Inches(1.1), Inches(12), Inches(0.6),
+                   plan.plans.title, FONT_JP, Pt(24), COLOR_BLACK, bold=True)
 
-    for i, plan in enumerate(plans):
-        x = start_x + i * (box_width + gap)
+    # 列が狭くなる（プランが多い）ときは、収まるところまで文字を小さくする
+    cards = deck_layout.columns(PLAN_AREA, len(plan.plans.items), PLAN_GAP)
+    for card, pricing in zip(cards, plan.plans.items):
+        accent = COLOR_PINK if pricing.highlight else COLOR_BLACK
 
         # プランボックス
-        plan_box = add_white_content_box(slide, x, Inches(1.8), box_width, box_height)
+        add_white_content_box(slide, *card)
 
         # プラン名ヘッダー
-        header_color = COLOR_PINK if plan["highlight"] else COLOR_BLACK
-        header = slide.shapes.add_shape(
-            MSO_SHAPE.RECTANGLE,
-            x + Inches(0.1), Inches(1.9),
-            box_width - Inches(0.2), Inches(0.5)
-        )
-        set_shape_fill(header, header_color)
-        set_shape_no_line(header)
-
-        header_text = slide.shapes.add_textbox(x + Inches(0.1), Inches(1.92), box_width - Inches(0.2), Inches(0.45))
-        add_text_frame(header_text, plan["name"], FONT_JP, Pt(18), COLOR_WHITE, bold=True, alignment=PP_ALIGN.CENTER)
+        add_rect(slide, *card.band(Inches(0.1), Inches(0.5), Inches(0.1)), accent)
+        name_box = card.band(Inches(0.12), Inches(0.45), Inches(0.1))
+        add_text_frame(slide, *name_box, pricing.name, FONT_JP,
+                       line_size(pricing.name, name_box, 18, 9, bold=True), COLOR_WHITE, bold=True,
+                       alignment=ALIGN_CENTER)
 
         # 価格
-        price_box = slide.shapes.add_textbox(x + Inches(0.1), Inches(2.5), box_width - Inches(0.2), Inches(0.5))
-        tf = price_box.text_frame
-        p = tf.paragraphs[0]
-        p.alignment = PP_ALIGN.CENTER
-        run = p.add_run()
-        run.text = plan["price"]
-        run.font.name = FONT_JP
-        run.font.size = Pt(22)
-        run.font.color.rgb = COLOR_PINK if plan["highlight"] else COLOR_BLACK
-        run.font.bold = True
+        price_box = card.band(Inches(0.7), Inches(0.5), Inches(0.1))
+        price_size = line_size(pricing.price, price_box, 22, 12, bold=True)
+        add_textbox(slide, *price_box,
+                    paragraph(TextStyle(FONT_JP, price_size, accent, bold=True).run(pricing.price), align=ALIGN_CENTER))
 
         # キャッチ
-        catch_box = slide.shapes.add_textbox(x + Inches(0.1), Inches(3.0), box_width - Inches(0.2), Inches(0.4))
-        tf = catch_box.text_frame
-        p = tf.paragraphs[0]
-        p.alignment = PP_ALIGN.CENTER
-        run = p.add_run()
-        run.text = plan["catch"]
-        run.font.name = FONT_JP
-        run.font.size = Pt(11)
-        run.font.color.rgb = COLOR_TEXT_GRAY
+        catch_box = card.band(Inches(1.2), Inches(0.4), Inches(0.1))
+        catch_size = line_size(pricing.catch, catch_box, 11, 8)
+        add_textbox(slide, *catch_box,
+                    paragraph(TextStyle(FONT_JP, catch_size, COLOR_TEXT_GRAY).run(pricing.catch), align=ALIGN_CENTER))
 
         # 特徴リスト
-        features_box = slide.shapes.add_textbox(x + Inches(0.3), Inches(3.5), box_width - Inches(0.4), Inches(2.2))
-        tf = features_box.text_frame
-        tf.word_wrap = True
-
-        for j, feature in enumerate(plan["features"]):
-            if j == 0:
-                p = tf.paragraphs[0]
-            else:
-                p = tf.add_paragraph()
-            p.space_after = Pt(8)
-            run = p.add_run()
-            run.text = f"・{feature}"
-            run.font.name = FONT_JP
-            run.font.size = Pt(13)
-            run.font.color.rgb = COLOR_BLACK
+        features_box = card.band(Inches(1.7), Inches(2.2), Inches(0.3), Inches(0.1))
+        features = [f"・{feature}" for feature in pricing.features]
+        feature_style = TextStyle(FONT_JP, fitted_size("\n".join(features), features_box, 13, 9), COLOR_BLACK)
+        add_textbox(slide, *features_box,
+                    *(paragraph(feature_style.run(feature), space_after=Pt(8)) for feature in features),
+                    wrap=True)
 
         # 対象者
-        for_box = slide.shapes.add_textbox(x + Inches(0.1), Inches(6.3), box_width - Inches(0.2), Inches(0.5))
-        tf = for_box.text_frame
-        tf.word_wrap = True
-        p = tf.paragraphs[0]
-        p.alignment = PP_ALIGN.CENTER
-        run = p.add_run()
-        run.text = plan["for"]
-        run.font.name = FONT_JP
-        run.font.size = Pt(10)
-        run.font.color.rgb = COLOR_TEXT_GRAY
+        add_textbox(slide, *card.band(Inches(4.5), Inches(0.5), Inches(0.1)),
+                    paragraph(TextStyle(FONT_JP, Pt(10), COLOR_TEXT_GRAY).run(pricing.target), align=ALIGN_CENTER),
+                    wrap=True)
 
     return slide
 
-def create_comparison_slide(prs):
+def comparison_slide_ir(plan=DEFAULT_PLAN):
     """ページ7：プラン比較表"""
-    slide = create_content_slide_base(prs, "Plan Comparison", 7)
+    slide = content_slide_base("Plan Comparison", 7)
 
     # 日本語タイトル
-    jp_title = slide.shapes.add_textbox(
-        Inches(0.5), Inches(1.1),
-        Inches(12), Inches(0.5)
-    )
-    add_text_frame(jp_title, "プラン比較表", FONT_JP, Pt(24), COLOR_BLACK, bold=True)
+    add_text_frame(slide, Inches(0.5), Inches(1.1), Inches(12), Inches(0.5),
+                   plan.comparison.title, FONT_JP, Pt(24), COLOR_BLACK, bold=True)
 
     # 白いコンテンツボックス
-    table_bg = add_white_content_box(slide, Inches(0.5), Inches(1.7), Inches(12.3), Inches(5.2))
+    add_white_content_box(slide, Inches(0.5), Inches(1.7), Inches(12.3), Inches(5.2))
 
     # テーブル構造
-    headers = ["項目", "伴走プラン", "自走プラン", "エージェント開発"]
-    rows = [
-        ["月額", "15万円", "40万円", "60万円"],
-        ["チャット相談", "◎ 無制限", "◎ 無制限", "○ 開発関連"],
-        ["キックオフMTG", "◎", "◎", "◎"],
-        ["振り返りMTG（3ヶ月後）", "◎", "◎", "◎"],
-        ["月次レポート", "◎", "◎", "○"],
-        ["月1開発MTG", "−", "−", "◎"],
-        ["社員研修（4名まで）", "−", "◎", "−"],
-        ["内製化支援", "−", "◎", "−"],
-        ["オーダーメイド開発", "−", "−", "◎"],
-    ]
+    headers = plan.comparison.headers
+    rows = plan.comparison.rows
 
-    col_widths = [Inches(3.5), Inches(2.8), Inches(2.8), Inches(3.0)]
     row_height = Inches(0.48)
     start_x = Inches(0.6)
     start_y = Inches(1.85)
+    col_widths = comparison_column_widths(len(headers), Box(start_x, start_y, Inches(12.1), row_height))
+
+    if plan.comparison.render == "table":
+        slide.add(comparison_table(headers, rows, start_x, start_y, col_widths, row_height))
+        return slide
 
     # ヘッダー行
+    header_style = TextStyle(FONT_JP, Pt(13), COLOR_WHITE, bold=True)
     x = start_x
-    for j, (header, width) in enumerate(zip(headers, col_widths)):
-        cell_bg = slide.shapes.add_shape(
-            MSO_SHAPE.RECTANGLE,
-            x, start_y,
-            width, row_height
-        )
-        set_shape_fill(cell_bg, COLOR_BLACK)
-        set_shape_no_line(cell_bg)
-
-        cell_text = slide.shapes.add_textbox(x, start_y + Inches(0.08), width, row_height - Inches(0.1))
-        tf = cell_text.text_frame
-        p = tf.paragraphs[0]
-        p.alignment = PP_ALIGN.CENTER
-        run = p.add_run()
-        run.text = header
-        run.font.name = FONT_JP
-        run.font.size = Pt(13)
-        run.font.color.rgb = COLOR_WHITE
-        run.font.bold = True
-
+    for header, width in zip(headers, col_widths):
+        add_rect(slide, x, start_y, width, row_height, COLOR_BLACK)
+        add_textbox(slide, x, start_y + Inches(0.08), width, row_height - Inches(0.1),
+                    paragraph(header_style.run(header), align=ALIGN_CENTER))
         x += width
 
     # データ行
@@ -758,56 +812,77 @@ def create_comparison_slide(prs):
         for j, (cell, width) in enumerate(zip(row, col_widths)):
             # 背景（交互色）
             bg_color = COLOR_WHITE if i % 2 == 0 else COLOR_BG_GRAY
-            cell_bg = slide.shapes.add_shape(
-                MSO_SHAPE.RECTANGLE,
-                x, y,
-                width, row_height
-            )
-            set_shape_fill(cell_bg, bg_color)
-            cell_bg.line.color.rgb = RGBColor(224, 224, 224)
-            cell_bg.line.width = Pt(0.5)
-
-            # テキスト
-            cell_text = slide.shapes.add_textbox(x + Inches(0.05), y + Inches(0.08), width - Inches(0.1), row_height - Inches(0.1))
-            tf = cell_text.text_frame
-            p = tf.paragraphs[0]
-            p.alignment = PP_ALIGN.CENTER if j > 0 else PP_ALIGN.LEFT
-            run = p.add_run()
-            run.text = cell
-            run.font.name = FONT_JP
-            run.font.size = Pt(12)
-
-            # 価格行は強調
-            if i == 0 and j > 0:
-                run.font.color.rgb = COLOR_PINK
-                run.font.bold = True
-            elif cell == "◎":
-                run.font.color.rgb = COLOR_PINK
-            elif cell == "−":
-                run.font.color.rgb = COLOR_TEXT_GRAY
-            else:
-                run.font.color.rgb = COLOR_BLACK
+            slide.add(Rect(x, y, width, row_height, fill=bg_color, line=COLOR_TABLE_LINE, line_width=Pt(0.5)))
+
+            # テキスト（価格行は強調）
+            color, bold = comparison_cell_style(i, j, cell)
+            add_textbox(slide, x + Inches(0.05), y + Inches(0.08), width - Inches(0.1), row_height - Inches(0.1),
+                        paragraph(TextStyle(FONT_JP, Pt(12), color, bold).run(cell),
+                                  align=ALIGN_CENTER if j > 0 else ALIGN_LEFT))
 
             x += width
 
     return slide
 
-def create_contract_slide(prs):
+# 比較表の列幅の比（既定の4列。それ以外の列数では項目の列を広めにして残りを等分）
+COMPARISON_COLUMN_WEIGHTS = (35, 28, 28, 30)
+
+def comparison_column_widths(count, area):
+    """比較表の count 列の幅（合計は area の幅）"""
+    weights = COMPARISON_COLUMN_WEIGHTS if count == len(COMPARISON_COLUMN_WEIGHTS) else (35,) + (28,) * (count - 1)
+    return [column.width for column in deck_layout.columns(area, count, weights=weights)]
+
+def comparison_cell_style(i, j, cell):
+    """比較表データセルの文字色と太字（価格行・◎・−を色分け）"""
+    if i == 0 and j > 0:
+        return COLOR_PINK, True
+    if cell == "◎":
+        return COLOR_PINK, None
+    if cell == "−":
+        return COLOR_TEXT_GRAY, None
+    return COLOR_BLACK, None
+
+def comparison_table(headers, rows, left, top, col_widths, row_height):
+    """比較表をネイティブの表（graphicFrame 1つ）の IR にする
+
+    既定の表スタイルの見出し行・縞模様は使わず、セルごとに色と罫線を指定する。
+    列数は headers・各行・col_widths でそろっている（compile_spec で検証済み）。
+    """
+    # ヘッダー行
+    header_style = TextStyle(FONT_JP, Pt(13), COLOR_WHITE, bold=True)
+    table_rows = [[
+        Cell(paragraph(header_style.run(header), align=ALIGN_CENTER),
+             fill=COLOR_BLACK, border=NO_LINE, anchor="ctr")
+        for header in headers
+    ]]
+
+    # データ行
+    for i, row in enumerate(rows):
+        bg_color = COLOR_WHITE if i % 2 == 0 else COLOR_BG_GRAY
+        cells = []
+        for j, text in enumerate(row):
+            color, bold = comparison_cell_style(i, j, text)
+            cells.append(Cell(
+                paragraph(TextStyle(FONT_JP, Pt(12), color, bold).run(text),
+                          align=ALIGN_CENTER if j > 0 else ALIGN_LEFT),
+                fill=bg_color, border=COLOR_TABLE_LINE, border_width=Pt(0.5), anchor="ctr",
+                margin_left=Inches(0.05), margin_right=Inches(0.05),
+            ))
+        table_rows.append(cells)
+    return Table(left, top, col_widths, row_height, table_rows)
+
+def contract_slide_ir(plan=DEFAULT_PLAN):
     """ページ8：契約条件・ご利用の流れ"""
-    slide = create_content_slide_base(prs, "Contract & Flow", 8)
+    slide = content_slide_base("Contract & Flow", 8)
 
     # 日本語タイトル
-    jp_title = slide.shapes.add_textbox(
-        Inches(0.5), Inches(1.1),
-        Inches(12), Inches(0.5)
-    )
-    add_text_frame(jp_title, "契約条件・ご利用の流れ", FONT_JP, Pt(24), COLOR_BLACK, bold=True)
+    add_text_frame(slide, Inches(0.5), Inches(1.1), Inches(12), Inches(0.5),
+                   "契約条件・ご利用の流れ", FONT_JP, Pt(24), COLOR_BLACK, bold=True)
 
     # 左側：契約条件
-    left_box = add_white_content_box(slide, Inches(0.5), Inches(1.7), Inches(4.5), Inches(2.5))
-
-    contract_title = slide.shapes.add_textbox(Inches(0.7), Inches(1.85), Inches(4.1), Inches(0.5))
-    add_text_frame(contract_title, "契約条件", FONT_JP, Pt(18), COLOR_PINK, bold=True)
+    add_white_content_box(slide, Inches(0.5), Inches(1.7), Inches(4.5), Inches(2.5))
+    add_text_frame(slide, Inches(0.7), Inches(1.85), Inches(4.1), Inches(0.5),
+                   "契約条件", FONT_JP, Pt(18), COLOR_PINK, bold=True)
 
     conditions = [
         ("最低契約期間", "3ヶ月"),
@@ -815,34 +890,17 @@ def create_contract_slide(prs):
         ("支払い", "月額・前払い"),
     ]
 
-    conditions_box = slide.shapes.add_textbox(Inches(0.7), Inches(2.4), Inches(4.1), Inches(1.6))
-    tf = conditions_box.text_frame
-    tf.word_wrap = True
-
-    for i, (label, value) in enumerate(conditions):
-        if i == 0:
-            p = tf.paragraphs[0]
-        else:
-            p = tf.add_paragraph()
-        p.space_after = Pt(10)
-        run = p.add_run()
-        run.text = f"{label}："
-        run.font.name = FONT_JP
-        run.font.size = Pt(14)
-        run.font.color.rgb = COLOR_TEXT_GRAY
-
-        run = p.add_run()
-        run.text = value
-        run.font.name = FONT_JP
-        run.font.size = Pt(14)
-        run.font.color.rgb = COLOR_BLACK
-        run.font.bold = True
+    label_style = TextStyle(FONT_JP, Pt(14), COLOR_TEXT_GRAY)
+    value_style = TextStyle(FONT_JP, Pt(14), COLOR_BLACK, bold=True)
+    add_textbox(slide, Inches(0.7), Inches(2.4), Inches(4.1), Inches(1.6),
+                *(paragraph(label_style.run(f"{label}："), value_style.run(value), space_after=Pt(10))
+                  for label, value in conditions),
+                wrap=True)
 
     # 右側：ご利用の流れ
-    right_box = add_white_content_box(slide, Inches(5.2), Inches(1.7), Inches(7.6), Inches(5.2))
-
-    flow_title = slide.shapes.add_textbox(Inches(5.4), Inches(1.85), Inches(7.2), Inches(0.5))
-    add_text_frame(flow_title, "ご利用の流れ", FONT_JP, Pt(18), COLOR_PINK, bold=True)
+    add_white_content_box(slide, Inches(5.2), Inches(1.7), Inches(7.6), Inches(5.2))
+    add_text_frame(slide, Inches(5.4), Inches(1.85), Inches(7.2), Inches(0.5),
+                   "ご利用の流れ", FONT_JP, Pt(18), COLOR_PINK, bold=True)
 
     steps = [
         ("①", "無料AI活用診断（30分・Zoom）", "現状の業務をヒアリング、改善ポイントを洗い出し"),
@@ -854,111 +912,133 @@ def create_contract_slide(prs):
     y = Inches(2.4)
     for num, title, desc in steps:
         # 番号
-        num_box = slide.shapes.add_shape(
-            MSO_SHAPE.OVAL,
-            Inches(5.5), y,
-            Inches(0.4), Inches(0.4)
-        )
-        set_shape_fill(num_box, COLOR_PINK)
-        set_shape_no_line(num_box)
-
-        num_text = slide.shapes.add_textbox(Inches(5.5), y + Inches(0.05), Inches(0.4), Inches(0.35))
-        add_text_frame(num_text, num, FONT_JP, Pt(12), COLOR_WHITE, bold=True, alignment=PP_ALIGN.CENTER)
+        add_rect(slide, Inches(5.5), y, Inches(0.4), Inches(0.4), COLOR_PINK, geometry="ellipse")
+        add_text_frame(slide, Inches(5.5), y + Inches(0.05), Inches(0.4), Inches(0.35),
+                       num, FONT_JP, Pt(12), COLOR_WHITE, bold=True, alignment=ALIGN_CENTER)
 
         # タイトル
-        step_title = slide.shapes.add_textbox(Inches(6.0), y, Inches(6.5), Inches(0.4))
-        add_text_frame(step_title, title, FONT_JP, Pt(14), COLOR_BLACK, bold=True)
+        add_text_frame(slide, Inches(6.0), y, Inches(6.5), Inches(0.4),
+                       title, FONT_JP, Pt(14), COLOR_BLACK, bold=True)
 
         # 説明
         if desc:
-            step_desc = slide.shapes.add_textbox(Inches(6.0), y + Inches(0.35), Inches(6.5), Inches(0.5))
-            add_text_frame(step_desc, desc, FONT_JP, Pt(11), COLOR_TEXT_GRAY)
+            add_text_frame(slide, Inches(6.0), y + Inches(0.35), Inches(6.5), Inches(0.5),
+                           desc, FONT_JP, Pt(11), COLOR_TEXT_GRAY)
 
         # 矢印線
         if num != "④":
             line_y = y + Inches(0.55) if desc else y + Inches(0.45)
-            arrow = slide.shapes.add_shape(
-                MSO_SHAPE.RECTANGLE,
-                Inches(5.68), line_y,
-                Inches(0.04), Inches(0.5) if desc else Inches(0.3)
-            )
-            set_shape_fill(arrow, COLOR_TEXT_GRAY)
-            set_shape_no_line(arrow)
+            add_rect(slide, Inches(5.68), line_y, Inches(0.04), Inches(0.5) if desc else Inches(0.3), COLOR_TEXT_GRAY)
 
         y += Inches(1.1) if desc else Inches(0.8)
 
     return slide
 
-def create_qa_slide(prs):
+def qa_slide_ir(plan=DEFAULT_PLAN):
     """ページ9：よくある質問（Q&A）"""
-    slide = create_content_slide_base(prs, "FAQ", 9)
+    slide = content_slide_base("FAQ", 9)
 
     # 日本語タイトル
-    jp_title = slide.shapes.add_textbox(
-        Inches(0.5), Inches(1.1),
-        Inches(12), Inches(0.5)
-    )
-    add_text_frame(jp_title, "よくある質問", FONT_JP, Pt(24), COLOR_BLACK, bold=True)
+    add_text_frame(slide, Inches(0.5), Inches(1.1), Inches(12), Inches(0.5),
+                   plan.faq.title, FONT_JP, Pt(24), COLOR_BLACK, bold=True)
 
     # 白いコンテンツボックス
-    qa_box = add_white_content_box(slide, Inches(0.5), Inches(1.7), Inches(12.3), Inches(5.2))
-
-    qas = [
-        ("Q. なぜ「3ヶ月」なのですか？", "慣れる。習慣化する。日常に溶け込ませる。そこまで伴走して、初めて「効果が出た」と実感できます。"),
-        ("Q. 試用期間とは何ですか？", "最初の1ヶ月で相性を確認。万が一「合わない」と感じた場合は、1ヶ月で終了可能です。"),
-        ("Q. 途中でプラン変更はできますか？", "はい。アップグレード・ダウングレードどちらも対応しています。"),
-        ("Q. チャット相談はどのくらいで返信がありますか？", "24時間以内に返信いたします。"),
-        ("Q. どんな相談ができますか？", "AIに関することなら、どんな相談でも可能です。「こんなこと聞いていいのかな？」もお気軽に。"),
-    ]
+    add_white_content_box(slide, Inches(0.5), Inches(1.7), Inches(12.3), Inches(5.2))
 
-    y = Inches(1.9)
-    for q, a in qas:
+    # 収まるまで質問・回答のフォントサイズを下げる（1列で収まらなければ2列）
+    area = Box(Inches(0.7), Inches(1.9), Inches(11.9), Inches(4.9))
+    q_size, a_size, rows = faq_layout(plan.faq.items, area)
+
+    answer_style = TextStyle(FONT_JP, Pt(a_size), COLOR_BLACK)
+    for (q, a), (row, a_offset) in zip(plan.faq.items, rows):
         # 質問
-        q_box = slide.shapes.add_textbox(Inches(0.7), y, Inches(11.9), Inches(0.4))
-        add_text_frame(q_box, q, FONT_JP, Pt(13), COLOR_PINK, bold=True)
+        q_box = add_text_frame(slide, row.left, row.top, row.width, Inches(0.4), q, FONT_JP, Pt(q_size), COLOR_PINK,
+                               bold=True)
+        if a_offset > Inches(0.35):
+            q_box.wrap = True  # 複数行の質問は折り返す
 
         # 回答
-        a_box = slide.shapes.add_textbox(Inches(0.7), y + Inches(0.35), Inches(11.9), Inches(0.5))
-        tf = a_box.text_frame
-        tf.word_wrap = True
-        p = tf.paragraphs[0]
-        run = p.add_run()
-        run.text = f"→ {a}"
-        run.font.name = FONT_JP
-        run.font.size = Pt(12)
-        run.font.color.rgb = COLOR_BLACK
-
-        y += Inches(0.95)
+        add_textbox(slide, *row.band(a_offset, row.height - a_offset),
+                    paragraph(answer_style.run(f"→ {a}")), wrap=True)
 
     return slide
 
-def create_cta_slide(prs):
+# Q&A の (質問, 回答) フォントサイズの候補（pt, 大きい順）
+FAQ_FONT_SIZES = [(13, 12), (12, 11), (11, 10), (10, 9)]
+FAQ_ROW_GAP = Inches(0.1)
+# 余裕があるときの行の間隔（項目が少ないときに詰まりすぎないように）
+FAQ_ROW_PITCH = Inches(0.95)
+FAQ_COLUMN_GAP = Inches(0.3)
+
+def faq_row_layout(q, a, width, q_size, a_size):
+    """Q&A 1件分の (回答の開始位置, 回答の高さ)（計測した高さそのまま）"""
+    a_offset = max(Inches(0.35), deck_textfit.text_height(q, FONT_JP, q_size, width, bold=True))
+    a_height = deck_textfit.text_height(f"→ {a}", FONT_JP, a_size, width)
+    return a_offset, a_height
+
+def faq_column_rows(measured, column, pitch):
+    """1列分の行の (行の Box, 回答の開始位置) の一覧。計測した高さで収まらなければ None
+
+    行の間隔は計測した高さから決め、余裕があれば pitch まで広げる。
+    """
+    natural = [a_offset + a_height + FAQ_ROW_GAP for a_offset, a_height in measured]
+    if sum(natural) - FAQ_ROW_GAP > column.height:
+        return None
+    steps = [max(pitch, step) for step in natural]
+    if sum(steps) - FAQ_ROW_GAP > column.height:
+        steps = natural
+    rows = []
+    y = column.top
+    for (a_offset, _), step in zip(measured, steps):
+        rows.append((Box(column.left, y, column.width, step - FAQ_ROW_GAP), a_offset))
+        y += step
+    return rows
+
+def faq_layout(qas, area):
+    """Q&A を area に並べる (質問のpt, 回答のpt, [(行の Box, 回答の開始位置)])
+
+    1列で最小のフォントサイズでも収まらなければ2列に分ける（2列でも収まらなければ
+    最小のサイズの2列のまま返す。項目数は deck_spec の MAX_FAQ_ITEMS までに制限している）。
+    """
+    if not qas:
+        return FAQ_FONT_SIZES[0][0], FAQ_FONT_SIZES[0][1], []
+    for column_count in (1, 2):
+        columns = deck_layout.columns(area, column_count, FAQ_COLUMN_GAP)
+        per_column = -(-len(qas) // column_count)
+        pitch = min(FAQ_ROW_PITCH, area.height // per_column)
+        for q_size, a_size in FAQ_FONT_SIZES:
+            measured = [faq_row_layout(q, a, columns[0].width, q_size, a_size) for q, a in qas]
+            rows = []
+            for i, column in enumerate(columns):
+                placed = faq_column_rows(measured[i * per_column:(i + 1) * per_column], column, pitch)
+                if placed is None:
+                    break
+                rows.extend(placed)
+            else:
+                return q_size, a_size, rows
+    # 収まらない：計測した高さのまま上から詰める
+    rows = []
+    for i, column in enumerate(columns):
+        y = column.top
+        for a_offset, a_height in measured[i * per_column:(i + 1) * per_column]:
+            rows.append((Box(column.left, y, column.width, a_offset + a_height), a_offset))
+            y += a_offset + a_height + FAQ_ROW_GAP
+    return q_size, a_size, rows
+
+def cta_slide_ir(plan=DEFAULT_PLAN):
     """ページ10：次のステップ（CTA）"""
-    slide = create_content_slide_base(prs, "Next Step", 10)
+    slide = content_slide_base("Next Step", 10)
 
     # 日本語タイトル
-    jp_title = slide.shapes.add_textbox(
-        Inches(0.5), Inches(1.1),
-        Inches(12), Inches(0.5)
-    )
-    add_text_frame(jp_title, "次のステップ", FONT_JP, Pt(24), COLOR_BLACK, bold=True)
+    add_text_frame(slide, Inches(0.5), Inches(1.1), Inches(12), Inches(0.5),
+                   "次のステップ", FONT_JP, Pt(24), COLOR_BLACK, bold=True)
 
-    # メインコンテンツボックス
-    main_box = add_white_content_box(slide, Inches(0.5), Inches(1.7), Inches(12.3), Inches(5.2))
+    # メインコンテンツボックス（左：メッセージ、右：CTA詳細）
+    add_white_content_box(slide, Inches(0.5), Inches(1.7), Inches(12.3), Inches(5.2))
+    left, right = deck_layout.columns(Box(Inches(0.7), Inches(1.9), Inches(11.8), Inches(4.6)), 2, Inches(0.3),
+                                      weights=(65, 50))
 
     # 左側：メッセージ
-    msg_box = slide.shapes.add_textbox(Inches(0.7), Inches(1.9), Inches(6.5), Inches(3.0))
-    tf = msg_box.text_frame
-    tf.word_wrap = True
-
-    p = tf.paragraphs[0]
-    run = p.add_run()
-    run.text = "まずは無料診断から"
-    run.font.name = FONT_JP
-    run.font.size = Pt(22)
-    run.font.color.rgb = COLOR_PINK
-    run.font.bold = True
-
     message = """
 「何を導入すべきかわからない」
 「どこを改善すべきかわからない」
@@ -972,49 +1052,22 @@ def create_cta_slide(prs):
 優先すべきこと、後回しでいいこと。
 プロの目で、御社のAI活用ポイントを診断します。"""
 
-    p = tf.add_paragraph()
-    p.space_before = Pt(12)
-    run = p.add_run()
-    run.text = message.strip()
-    run.font.name = FONT_JP
-    run.font.size = Pt(12)
-    run.font.color.rgb = COLOR_BLACK
+    add_textbox(
+        slide, *left.band(0, Inches(3.0)),
+        paragraph(TextStyle(FONT_JP, Pt(22), COLOR_PINK, bold=True).run("まずは無料診断から")),
+        paragraph(TextStyle(FONT_JP, Pt(12), COLOR_BLACK).run(message.strip()), space_before=Pt(12)),
+        wrap=True,
+    )
 
     # 右側：CTA詳細
-    cta_box = slide.shapes.add_shape(
-        MSO_SHAPE.ROUNDED_RECTANGLE,
-        Inches(7.5), Inches(2.0),
-        Inches(5.0), Inches(4.5)
-    )
-    set_shape_fill(cta_box, COLOR_BG_GRAY)
-    set_shape_no_line(cta_box)
-    cta_box.adjustments[0] = 0.03
-
-    cta_title = slide.shapes.add_textbox(Inches(7.7), Inches(2.2), Inches(4.6), Inches(0.6))
-    tf = cta_title.text_frame
-    p = tf.paragraphs[0]
-    p.alignment = PP_ALIGN.CENTER
-    run = p.add_run()
-    run.text = "無料AI活用診断"
-    run.font.name = FONT_JP
-    run.font.size = Pt(20)
-    run.font.color.rgb = COLOR_BLACK
-    run.font.bold = True
-
-    cta_sub = slide.shapes.add_textbox(Inches(7.7), Inches(2.7), Inches(4.6), Inches(0.4))
-    tf = cta_sub.text_frame
-    p = tf.paragraphs[0]
-    p.alignment = PP_ALIGN.CENTER
-    run = p.add_run()
-    run.text = "30分・Zoom"
-    run.font.name = FONT_JP
-    run.font.size = Pt(14)
-    run.font.color.rgb = COLOR_PINK
-    run.font.bold = True
-
-    cta_details = slide.shapes.add_textbox(Inches(7.7), Inches(3.2), Inches(4.6), Inches(2.5))
-    tf = cta_details.text_frame
-    tf.word_wrap = True
+    panel = right.band(Inches(0.1), Inches(4.5))
+    slide.add(Rect(*panel, "roundRect", fill=COLOR_BG_GRAY, adjust=0.03))
+
+    add_textbox(slide, *panel.band(Inches(0.2), Inches(0.6), Inches(0.2)),
+                paragraph(TextStyle(FONT_JP, Pt(20), COLOR_BLACK, bold=True).run("無料AI活用診断"), align=ALIGN_CENTER))
+
+    add_textbox(slide, *panel.band(Inches(0.7), Inches(0.4), Inches(0.2)),
+                paragraph(TextStyle(FONT_JP, Pt(14), COLOR_PINK, bold=True).run("30分・Zoom"), align=ALIGN_CENTER))
 
     details = [
         "・御社の業務をヒアリング",
@@ -1024,133 +1077,1255 @@ def create_cta_slide(prs):
         "診断だけでもOK。"
     ]
 
-    for i, detail in enumerate(details):
-        if i == 0:
-            p = tf.paragraphs[0]
-        else:
-            p = tf.add_paragraph()
-        p.space_after = Pt(6)
-        p.alignment = PP_ALIGN.LEFT
-        run = p.add_run()
-        run.text = detail
-        run.font.name = FONT_JP
-        run.font.size = Pt(12)
-        run.font.color.rgb = COLOR_BLACK if i < 3 else COLOR_PINK
-        run.font.bold = (i >= 3)
+    add_textbox(
+        slide, *panel.band(Inches(1.2), Inches(2.5), Inches(0.2)),
+        *(paragraph(TextStyle(FONT_JP, Pt(12), COLOR_BLACK if i < 3 else COLOR_PINK, bold=(i >= 3)).run(detail),
+                    align=ALIGN_LEFT, space_after=Pt(6))
+          for i, detail in enumerate(details)),
+        wrap=True,
+    )
 
     return slide
 
-def create_contact_slide(prs):
+def contact_slide_ir(plan=DEFAULT_PLAN):
     """ページ11：お問い合わせ"""
-    slide = create_content_slide_base(prs, "Contact", 11)
+    slide = content_slide_base("Contact", 11)
 
     # 日本語タイトル
-    jp_title = slide.shapes.add_textbox(
-        Inches(0.5), Inches(1.1),
-        Inches(12), Inches(0.5)
-    )
-    add_text_frame(jp_title, "お問い合わせ", FONT_JP, Pt(24), COLOR_BLACK, bold=True)
+    add_text_frame(slide, Inches(0.5), Inches(1.1), Inches(12), Inches(0.5),
+                   plan.contact.title, FONT_JP, Pt(24), COLOR_BLACK, bold=True)
 
     # メインコンテンツボックス
-    main_box = add_white_content_box(slide, Inches(0.5), Inches(1.7), Inches(12.3), Inches(5.2))
+    add_white_content_box(slide, Inches(0.5), Inches(1.7), Inches(12.3), Inches(5.2))
 
     # 連絡先情報
-    contact_info = [
-        ("WEB", "https://novalisgroup.jp/"),
-        ("Email", "shunsuke.tanaka@novalisgroup.biz"),
-        ("住所", "〒152-0004 東京都目黒区鷹番2丁目20番20号\nイニッゾ学芸大学5-17"),
-    ]
-
+    label_style = TextStyle(FONT_JP, Pt(16), COLOR_PINK, bold=True)
+    value_style = TextStyle(FONT_JP, Pt(16), COLOR_BLACK)
     y = Inches(2.3)
-    for label, value in contact_info:
+    for label, value in plan.contact.items:
         # ラベル
-        label_box = slide.shapes.add_textbox(Inches(2.0), y, Inches(1.5), Inches(0.5))
-        tf = label_box.text_frame
-        p = tf.paragraphs[0]
-        p.alignment = PP_ALIGN.RIGHT
-        run = p.add_run()
-        run.text = label
-        run.font.name = FONT_JP
-        run.font.size = Pt(16)
-        run.font.color.rgb = COLOR_PINK
-        run.font.bold = True
+        add_textbox(slide, Inches(2.0), y, Inches(1.5), Inches(0.5),
+                    paragraph(label_style.run(label), align=ALIGN_RIGHT))
 
         # 値
-        value_box = slide.shapes.add_textbox(Inches(3.7), y, Inches(8.0), Inches(0.8))
-        tf = value_box.text_frame
-        tf.word_wrap = True
-        p = tf.paragraphs[0]
-        run = p.add_run()
-        run.text = value
-        run.font.name = FONT_JP
-        run.font.size = Pt(16)
-        run.font.color.rgb = COLOR_BLACK
-
-        y += Inches(1.0) if "\n" not in value else Inches(1.3)
+        add_textbox(slide, Inches(3.7), y, Inches(8.0), Inches(0.8),
+                    paragraph(value_style.run(value)), wrap=True)
+
+        lines = deck_textfit.count_lines(value, FONT_JP, 16, Inches(8.0))
+        y += Inches(1.0) + (lines - 1) * Inches(0.3)
 
     # 締めのメッセージ
-    closing_box = slide.shapes.add_textbox(Inches(0.7), Inches(5.5), Inches(11.9), Inches(1.0))
-    tf = closing_box.text_frame
-    p = tf.paragraphs[0]
-    p.alignment = PP_ALIGN.CENTER
-    run = p.add_run()
-    run.text = "お気軽にご相談ください"
-    run.font.name = FONT_JP
-    run.font.size = Pt(20)
-    run.font.color.rgb = COLOR_TEXT_GRAY
+    add_textbox(slide, Inches(0.7), Inches(5.5), Inches(11.9), Inches(1.0),
+                paragraph(TextStyle(FONT_JP, Pt(20), COLOR_TEXT_GRAY).run(plan.contact.closing), align=ALIGN_CENTER))
 
     return slide
 
+# デッキに追加する作成関数（名前はキャッシュキー・並列作成で使う）
+
+def create_cover_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, cover_slide_ir(plan), backend)
+
+def create_problem_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, problem_slide_ir(plan), backend)
+
+def create_why_fail_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, why_fail_slide_ir(plan), backend)
+
+def create_story_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, story_slide_ir(plan), backend)
+
+def create_concept_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, concept_slide_ir(plan), backend)
+
+def create_plan_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, plan_slide_ir(plan), backend)
+
+def create_comparison_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, comparison_slide_ir(plan), backend)
+
+def create_contract_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, contract_slide_ir(plan), backend)
+
+def create_qa_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, qa_slide_ir(plan), backend)
+
+def create_cta_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, cta_slide_ir(plan), backend)
+
+def create_contact_slide(prs, plan=DEFAULT_PLAN, backend=DEFAULT_BACKEND):
+    return render_slide(prs, contact_slide_ir(plan), backend)
+
 # =============================================================================
 # メイン処理
 # =============================================================================
 
-def main():
-    """プレゼンテーション作成"""
-    prs = Presentation()
-    prs.slide_width = SLIDE_WIDTH
-    prs.slide_height = SLIDE_HEIGHT
+# 表紙以降のスライド（進捗表示ラベル, 作成関数）
+CONTENT_SLIDES = [
+    ("お悩み", create_problem_slide),
+    ("AI導入失敗の理由", create_why_fail_slide),
+    ("原体験ストーリー", create_story_slide),
+    ("サービスコンセプト", create_concept_slide),
+    ("3つのプラン", create_plan_slide),
+    ("プラン比較表", create_comparison_slide),
+    ("契約条件・ご利用の流れ", create_contract_slide),
+    ("Q&A", create_qa_slide),
+    ("CTA", create_cta_slide),
+    ("お問い合わせ", create_contact_slide),
+]
+
+# スライドごとに参照するデッキ定義の項目（スライドキャッシュのキーに使う）
+SLIDE_INPUTS = {
+    "create_cover_slide": ("industry", "cover"),
+    "create_problem_slide": ("problems",),
+    "create_story_slide": ("industry", "story"),
+    "create_plan_slide": ("plans",),
+    "create_comparison_slide": ("comparison",),
+    "create_qa_slide": ("faq",),
+    "create_contact_slide": ("contact",),
+}
+
+def build_presentation(plan=DEFAULT_PLAN, use_template=True, verbose=False, on_slide=None,
+                       slide_cache=None, executor=None, backend=DEFAULT_BACKEND, instrumentation=None):
+    """全スライドを作成したPresentationを返す
+
+    on_slide を渡すと、スライドを1枚作るたびに on_slide(slide) を呼ぶ。
+    slide_cache（SlideCache）を渡すと、入力が変わっていないスライドは
+    キャッシュ済みのXMLから復元する。
+    executor（ProcessPoolExecutor 等）を渡すと、各スライドをワーカーで並列に
+    作成し、ページ順にデッキへ組み込む（結果は逐次作成とバイト単位で一致）。
+    backend は描画バックエンド（BACKENDS のいずれか）。
+    instrumentation（deck_metrics.Instrumentation）を渡すと、スライドごとの
+    経過時間・図形数などを計測する。
+    """
+    prs = new_presentation(use_template)
+    sequence = [("表紙", create_cover_slide)] + CONTENT_SLIDES
+
+    # 並列作成：キャッシュにないスライドを先にまとめて投入しておく
+    pending = {}
+    if executor is not None:
+        for index, (_, create_slide) in enumerate(sequence):
+            key = snapshot = None
+            if slide_cache is not None:
+                key = slide_cache_key(create_slide, plan, use_template, backend)
+                snapshot = slide_cache.get(key)
+            if snapshot is None:
+                snapshot = executor.submit(build_slide_snapshot, create_slide.__name__, plan, use_template, backend)
+            pending[index] = (key, snapshot)
+
+    def add_slide(index, create_slide):
+        if index not in pending:
+            return build_slide(prs, create_slide, plan, slide_cache, backend)
+        key, snapshot = pending.pop(index)
+        if not isinstance(snapshot, SlideSnapshot):
+            snapshot = snapshot.result()
+            if slide_cache is not None:
+                slide_cache.put(key, snapshot)
+        return restore_slide(prs, snapshot)
+
+    total = len(sequence)
+    for index, (label, create_slide) in enumerate(sequence):
+        if verbose:
+            print(f"  {index + 1}/{total}: {label}")
+        if instrumentation is None:
+            slide = add_slide(index, create_slide)
+        else:
+            slide = instrumentation.call(plan.name, create_slide.__name__, label, add_slide, index, create_slide,
+                                         counts=slide_counts)
+        if on_slide is not None:
+            on_slide(slide)
+
+    return prs
+
+def slide_counts(slide):
+    """スライドの (図形数, ラン数, XMLのバイト数)"""
+    element = slide.part._element
+    shapes = sum(1 for _ in slide.shapes._spTree.iter_shape_elms())
+    return shapes, len(element.findall(".//" + qn("a:r"))), len(serialize_part_xml(element))
+
+def deck_counts(prs, path):
+    """デッキ全体の (図形数, ラン数, ファイルサイズ)"""
+    shapes = runs = 0
+    for slide in prs.slides:
+        shapes += sum(1 for _ in slide.shapes._spTree.iter_shape_elms())
+        runs += len(slide.part._element.findall(".//" + qn("a:r")))
+    return shapes, runs, os.path.getsize(path)
+
+def temporary_path(path):
+    """path と同じディレクトリの一意な一時ファイル名（書き終えたら os.replace で置き換える）
+
+    同じ出力先への書き込みが重なっても（別プロセス・別スレッド）、互いの一時ファイルは混ざらない。
+    """
+    return f"{path}.{uuid.uuid4().hex}.tmp"
+
+def save_presentation(prs, path, instrumentation=None, deck="", options=None):
+    """デッキを保存する（instrumentation があれば保存を計測）
+
+    options（SaveOptions）を渡すと、圧縮レベル・メディアの格納方法を指定して保存する。
+    """
+    if options is None or options.is_default():
+        save = prs.save
+    else:
+        def save(path):
+            write_package(prs, path, options)
+    if instrumentation is None:
+        save(path)
+        return
+    instrumentation.call(deck, "save", "保存", save, path, counts=lambda _: deck_counts(prs, path))
+
+def build_slide(prs, create_slide, plan, slide_cache=None, backend=DEFAULT_BACKEND):
+    """スライドを1枚作成する（キャッシュにあれば復元）"""
+    if slide_cache is None:
+        return create_slide(prs, plan, backend)
+    key = slide_cache_key(create_slide, plan, get_content_layout(prs) is not None, backend)
+    snapshot = slide_cache.get(key)
+    if snapshot is not None:
+        return restore_slide(prs, snapshot)
+    slide = create_slide(prs, plan, backend)
+    snapshot = capture_slide(slide)
+    if snapshot is not None:
+        slide_cache.put(key, snapshot)
+    return slide
 
-    print("スライド作成開始...")
+# =============================================================================
+# ストリーミング保存
+# =============================================================================
 
-    # 各スライドを作成
-    print("  1/11: 表紙")
-    create_cover_slide(prs)
+# 書き出し済みスライドの代わりに残す空のXML
+_FLUSHED_SLIDE_XML = f"<p:sld {nsdecls('a', 'p', 'r')}><p:cSld><p:spTree/></p:cSld></p:sld>"
+
+class StreamingDeckWriter:
+    """スライドを作るたびにzipへ書き出し、そのスライドのXMLをメモリから解放する
+
+    スライド数が多いデッキでもメモリ使用量がほぼ一定になる。書き出した
+    スライドはそれ以降編集できない。レイアウト・画像・presentation.xml 等の
+    残りのパートは close() でまとめて書き出す。
+    """
+
+    def __init__(self, path, options=None):
+        options = options or SaveOptions()
+        self.path = path
+        self._zipf = deck_zip.ZipWriter(path, options.compression, options.store_media, options.store())
+        self._written = set()
+        self.slides_written = 0
+
+    def flush_slide(self, slide):
+        """スライド（とそのrels）を書き出し、XMLを空のものに置き換える"""
+        part = slide.part
+        self._zipf.write(part.partname.membername, serialize_part_xml(part._element))
+        if part._rels:
+            self._zipf.write(part.partname.rels_uri.membername, part.rels.xml)
+        self._written.add(part.partname)
+        part._element = parse_xml(_FLUSHED_SLIDE_XML)
+        # part.slide（lazyproperty）が古い要素を掴んだままにならないようにする
+        part.__dict__.pop("slide", None)
+        self.slides_written += 1
+
+    def close(self, prs):
+        """残りのパート・パッケージrels・[Content_Types].xml を書き出して閉じる"""
+        package = prs.part.package
+        parts = list(package.iter_parts())
+        for part in parts:
+            if part.partname in self._written:
+                continue
+            write_part(self._zipf, part)
+        self._zipf.write(PACKAGE_URI.rels_uri.membername, package._rels.xml)
+        self._zipf.write(
+            CONTENT_TYPES_URI.membername,
+            serialize_part_xml(_ContentTypesItem.xml_for(parts)),
+        )
+        self._zipf.close()
+
+    def abort(self):
+        """書きかけのファイルを閉じて削除する"""
+        self._zipf.abort()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def render_streaming(plan, output_path, use_template=True, verbose=False, slide_cache=None, executor=None,
+                     backend=DEFAULT_BACKEND, instrumentation=None, save_options=None):
+    """スライドを作成しながら順次書き出して保存する
+
+    instrumentation で計測する場合、スライドの書き出しは作成に含まれず、
+    保存（save）は残りのパートの書き出しだけになる。
+    """
+    writer = StreamingDeckWriter(output_path, save_options)
+    try:
+        prs = build_presentation(plan, use_template=use_template, verbose=verbose,
+                                 on_slide=writer.flush_slide, slide_cache=slide_cache,
+                                 executor=executor, backend=backend, instrumentation=instrumentation)
+        if instrumentation is None:
+            writer.close(prs)
+        else:
+            # 書き出し済みのスライドは空なので、図形数・ラン数は数えない
+            instrumentation.call(plan.name, "save", "保存", writer.close, prs,
+                                 counts=lambda _: (0, 0, os.path.getsize(output_path)))
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.slides_written
+
+# =============================================================================
+# 保存設定（圧縮レベル・メディア）
+# =============================================================================
+
+# デッキ間で内容が同じことが多く、圧縮結果を再利用する部品
+REUSABLE_PART_PREFIXES = ("/ppt/media/", "/ppt/theme/", "/ppt/slideMasters/", "/ppt/slideLayouts/",
+                          "/ppt/printerSettings/", "/ppt/fonts/")
+
+_media_store = None
+
+def shared_media_store():
+    """プロセス内で共有する MediaStore（圧縮結果は CACHE_DIR/media にも保存）"""
+    global _media_store
+    if _media_store is None:
+        _media_store = deck_zip.MediaStore(os.path.join(CACHE_DIR, "media"))
+    return _media_store
+
+@dataclass(frozen=True)
+class SaveOptions:
+    """保存時の zip の設定"""
+    compression: str = "default"  # deck_zip.COMPRESSION_LEVELS のキー
+    store_media: bool = False     # PNG 等の圧縮済みメディアを無圧縮で格納する
+    media_store: bool = False     # テーマ・画像等の圧縮結果をデッキ間で再利用する
+
+    def is_default(self):
+        return self == SaveOptions()
+
+    def store(self):
+        return shared_media_store() if self.media_store else None
+
+def job_save_options(job):
+    """ジョブの保存設定（compression / store_media / media_store）"""
+    return SaveOptions(job.get("compression", "default"), job.get("store_media", False),
+                       job.get("media_store", False))
+
+def write_part(writer, part):
+    """パート（とそのrels）を deck_zip.ZipWriter に書き出す"""
+    reuse = part.partname.startswith(REUSABLE_PART_PREFIXES)
+    writer.write(part.partname.membername, part.blob, reuse=reuse)
+    if part._rels:
+        writer.write(part.partname.rels_uri.membername, part.rels.xml, reuse=reuse)
+
+def write_package(prs, path, options):
+    """prs.save と同じ構成・順序で、options の zip 設定で保存する"""
+    package = prs.part.package
+    parts = list(package.iter_parts())
+    writer = deck_zip.ZipWriter(path, options.compression, options.store_media, options.store())
+    try:
+        writer.write(CONTENT_TYPES_URI.membername, serialize_part_xml(_ContentTypesItem.xml_for(parts)))
+        writer.write(PACKAGE_URI.rels_uri.membername, package._rels.xml)
+        for part in parts:
+            write_part(writer, part)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+# =============================================================================
+# スライドキャッシュ
+# =============================================================================
+
+@dataclass(frozen=True)
+class SlideSnapshot:
+    """作成済みスライドの直列化（XML・レイアウト名・画像の関係）"""
+    xml: bytes
+    layout: str
+    images: tuple  # (rId, 画像アセットのパス)
+
+def build_slide_snapshot(builder_name, plan, use_template=True, backend=DEFAULT_BACKEND):
+    """スライドを1枚だけ持つデッキで作成して直列化する（並列作成のワーカー処理）"""
+    prs = new_presentation(use_template)
+    slide = globals()[builder_name](prs, plan, backend)
+    snapshot = capture_slide(slide)
+    if snapshot is None:
+        raise ValueError(f"{builder_name}: 直列化できない関係を含むスライドです")
+    return snapshot
+
+def package_digests(prs):
+    """パート名 -> 内容のSHA1（デッキ同士の比較用）"""
+    return {
+        str(part.partname): hashlib.sha1(part.blob).hexdigest()
+        for part in prs.part.package.iter_parts()
+    }
+
+def verify_parallel_build(plan=DEFAULT_PLAN, use_template=True, workers=None):
+    """並列作成と逐次作成の結果を比較し、内容が異なるパート名の一覧を返す"""
+    serial = package_digests(build_presentation(plan, use_template=use_template))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parallel = package_digests(build_presentation(plan, use_template=use_template, executor=pool))
+    return sorted(name for name in serial.keys() | parallel.keys() if serial.get(name) != parallel.get(name))
+
+def compare_backends(plan=DEFAULT_PLAN, use_template=True):
+    """xml / pptx バックエンドで作ったデッキを比較し、{パート名: 違いの説明} を返す
+
+    XMLのパートは構造（要素・属性・テキスト）で、それ以外は内容のハッシュで比べる。
+    """
+    decks = {
+        backend: {str(part.partname): part.blob
+                  for part in build_presentation(plan, use_template=use_template, backend=backend).part.package.iter_parts()}
+        for backend in BACKENDS
+    }
+    xml_parts, pptx_parts = decks["xml"], decks["pptx"]
+    differences = {}
+    for name in sorted(xml_parts.keys() | pptx_parts.keys()):
+        a, b = xml_parts.get(name), pptx_parts.get(name)
+        if a == b:
+            continue
+        if a is None or b is None:
+            differences[name] = ["片方のデッキにしかありません"]
+        elif name.endswith(".xml") or name.endswith(".rels"):
+            found = deck_ir.xml_differences(a, b)
+            if found:
+                differences[name] = found
+        else:
+            differences[name] = ["内容が異なります"]
+    return differences
+
+@lru_cache(maxsize=1)
+def code_digest():
+    """このスクリプト・IR の直列化・テキスト計測・レイアウト処理のハッシュ（作成処理が変わったらキャッシュを無効化）"""
+    digest = hashlib.sha1()
+    for path in (__file__, deck_ir.__file__, deck_textfit.__file__, deck_layout.__file__):
+        with open(os.path.abspath(path), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def style_constants():
+    """スライドの見た目を決める定数（キャッシュキーに含める）"""
+    logo_stamp = None
+    if os.path.exists(LOGO_PATH):
+        stat = os.stat(LOGO_PATH)
+        logo_stamp = (stat.st_size, stat.st_mtime_ns)
+    return (
+        SLIDE_WIDTH, SLIDE_HEIGHT, HEADER_HEIGHT, PINK_BAR_WIDTH, MARGIN,
+        str(COLOR_PINK), str(COLOR_SUB_PINK), str(COLOR_BLACK), str(COLOR_WHITE),
+        str(COLOR_BG_GRAY), str(COLOR_TEXT_GRAY), str(COLOR_DARK_GRAY),
+        str(COLOR_SECTION_NUM), str(COLOR_TABLE_LINE),
+        FONT_EN, FONT_JP, LOGO_PATH, logo_stamp, CONTENT_LAYOUT_NAME,
+        deck_textfit.find_font_file(FONT_JP), deck_textfit.find_font_file(FONT_JP, bold=True),
+    )
+
+def slide_cache_key(create_slide, plan, use_template, backend=DEFAULT_BACKEND):
+    """スライドの入力データ・見た目の定数・作成処理からキャッシュキーを作る"""
+    inputs = tuple(
+        (name, getattr(plan, name))
+        for name in SLIDE_INPUTS.get(create_slide.__name__, ())
+    )
+    source = repr((
+        create_slide.__name__, inputs, use_template, backend,
+        style_constants(), code_digest(), SPEC_FORMAT_VERSION,
+    ))
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+def _asset_path_for(image_part):
+    """画像パートの元になった画像アセットのパスを返す（不明ならNone）"""
+    for path, image in _image_assets.items():
+        if image is not None and image.sha1 == image_part.sha1:
+            return path
+    return None
+
+def capture_slide(slide):
+    """スライドを直列化する（復元できない関係を持つ場合はNone）"""
+    part = slide.part
+    images = []
+    for rId, rel in part.rels.items():
+        if rel.reltype == RT.SLIDE_LAYOUT:
+            continue
+        if rel.reltype != RT.IMAGE or rel.is_external:
+            return None
+        path = _asset_path_for(rel.target_part)
+        if path is None:
+            return None
+        images.append((rId, path))
+    return SlideSnapshot(
+        xml=serialize_part_xml(part._element),
+        layout=slide.slide_layout.name,
+        images=tuple(sorted(images)),
+    )
+
+def restore_slide(prs, snapshot):
+    """直列化したスライドをデッキの末尾に追加する"""
+    layout = next(layout for layout in prs.slide_layouts if layout.name == snapshot.layout)
+    slide = prs.slides.add_slide(layout)
+    part = slide.part
+    element = parse_xml(snapshot.xml)
+    # 空文字のランは作成時と同じ <a:t></a:t> で書き出されるようにする
+    for t in element.iter(qn("a:t")):
+        if t.text is None:
+            t.text = ""
+
+    # 画像はこのデッキの画像パートに関係を張り直す（rId がずれたら付け替える）
+    rId_map = {}
+    for old_rId, path in snapshot.images:
+        image = load_image_asset(path)
+        if image is None:
+            raise FileNotFoundError(path)
+        rId_map[old_rId] = part.relate_to(get_image_part(part.package, image), RT.IMAGE)
+    if any(old != new for old, new in rId_map.items()):
+        for blip in element.iter(qn("a:blip")):
+            embed = blip.get(qn("r:embed"))
+            if embed in rId_map:
+                blip.set(qn("r:embed"), rId_map[embed])
+
+    part._element = element
+    part.__dict__.pop("slide", None)
+    return part.slide
+
+class SlideCache:
+    """スライドのXMLをディスクに保存するキャッシュ（容量・経過時間で削除）"""
+
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024, max_age=30 * 24 * 3600):
+        self.directory = directory or os.path.join(CACHE_DIR, "slides")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def get(self, key):
+        """キャッシュ済みのSlideSnapshotを返す（なければNone）"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            # 壊れたエントリは削除して作り直す
+            self.misses += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        # 最終利用時刻として更新時刻を進める（容量超過時は古いものから削除）
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return snapshot
+
+    def put(self, key, snapshot):
+        """SlideSnapshotを保存する"""
+        path = self._path(key)
+        # 一時ファイル名は呼び出しごとに変える（同じキーを別スレッドが同時に書いても混ざらない）
+        tmp_path = temporary_path(path)
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def evict(self):
+        """期限切れのエントリを削除し、容量超過なら最終利用が古い順に削除する
+
+        削除した件数を返す。
+        """
+        now = time.time()
+        entries = []
+        removed = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".pickle"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if self.max_age is not None and now - stat.st_mtime > self.max_age:
+                    removed += self._remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                removed += self._remove(path)
+                total -= size
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+class MemorySlideCache:
+    """プロセス内だけで使うスライドキャッシュ（業種別バリアントの一括作成用）
+
+    backing（SlideCache）を渡すと、見つからないスライドはディスクからも探し、
+    作成したスライドはディスクにも保存する。max_entries を渡すと、それを超えた分は
+    最も長く使われていないものから捨てる（差し込み生成で行ごとに変わるスライド用）。
+    """
+
+    def __init__(self, backing=None, max_entries=None):
+        self.backing = backing
+        self.max_entries = max_entries
+        self._snapshots = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            self._snapshots.move_to_end(key)
+        elif self.backing is not None:
+            snapshot = self.backing.get(key)
+            if snapshot is not None:
+                self._remember(key, snapshot)
+        if snapshot is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return snapshot
+
+    def put(self, key, snapshot):
+        self._remember(key, snapshot)
+        if self.backing is not None:
+            self.backing.put(key, snapshot)
+
+    def _remember(self, key, snapshot):
+        self._snapshots[key] = snapshot
+        self._snapshots.move_to_end(key)
+        if self.max_entries is not None and len(self._snapshots) > self.max_entries:
+            self._snapshots.popitem(last=False)
 
-    print("  2/11: お悩み")
-    create_problem_slide(prs)
+# =============================================================================
+# バッチ生成
+# =============================================================================
 
-    print("  3/11: AI導入失敗の理由")
-    create_why_fail_slide(prs)
+def load_batch_jobs(path, out_dir="."):
+    """バッチ定義（JSON配列）を読み込む
+
+    各要素は {"name": ..., "spec": ..., "industry": ..., "prospect": ..., "output": ...}。
+    name 以外は省略可（spec 省略時は既定のデッキ定義）。相対パスの spec は
+    バッチ定義ファイルからの相対パスとして解決する。出力先（out_dir から
+    解決したもの）が重なるジョブがあれば ValueError。
+    """
+    with open(path, encoding="utf-8") as f:
+        jobs = json.load(f)
+    if not isinstance(jobs, list):
+        raise ValueError(f"バッチ定義はJSON配列である必要があります: {path}")
+    for i, job in enumerate(jobs):
+        if not isinstance(job, dict) or not job.get("name"):
+            raise ValueError(f"{path}: {i}番目のジョブに name がありません")
+        spec = job.get("spec")
+        if spec and not os.path.isabs(spec):
+            job["spec"] = os.path.join(os.path.dirname(os.path.abspath(path)), spec)
+    check_unique_outputs(jobs, out_dir, path)
+    return jobs
+
+def check_unique_outputs(jobs, out_dir, source="バッチ"):
+    """出力先が重なるジョブがあれば ValueError（並列に同じファイルへ保存すると壊れる）
+
+    大文字・小文字だけが違うパスも、同じファイルになる環境があるので重複とみなす。
+    """
+    owners = {}
+    for job in jobs:
+        key = os.path.normcase(os.path.abspath(resolve_output_path(job, out_dir))).casefold()
+        if key in owners:
+            raise ValueError(f"{source}: ジョブ {owners[key]} と {job['name']} の出力先が同じです"
+                             f"（{resolve_output_path(job, out_dir)}）")
+        owners[key] = job["name"]
+
+def job_plan(job):
+    """ジョブのデッキ定義を読み込み、業種・宛名の上書きと差し込みデータ（fields）を反映する"""
+    plan = load_spec(job["spec"]) if job.get("spec") else DEFAULT_PLAN
+    if job.get("fields"):
+        plan = plan.bind(job["fields"])
+    return plan.with_overrides(industry=job.get("industry"), prospect=job.get("prospect"))
+
+def resolve_output_path(job, out_dir):
+    """ジョブの出力先を決める（output 未指定なら out_dir/<name>.pptx）"""
+    output = job.get("output")
+    if output:
+        return output if os.path.isabs(output) else os.path.join(out_dir, output)
+    return os.path.join(out_dir, f"{job['name']}.pptx")
+
+def render_job(job, output_path):
+    """1デッキを生成して保存する（ワーカープロセスで実行）
+
+    job["metrics"] が真なら、スライドごとの計測結果を結果の "metrics" に入れて返す。
+    """
+    started = time.perf_counter()
+    collected = []
+    instrumentation = None
+    if job.get("metrics"):
+        instrumentation = deck_metrics.Instrumentation([collected.append], trace_memory=job.get("trace_memory", False))
+    # 一時ファイルに書いてから置き換える（書きかけ・壊れたデッキを出力先に残さない）
+    tmp_path = temporary_path(output_path)
+    try:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        slide_cache = SlideCache() if job.get("slide_cache") else None
+        if job.get("shared_slides"):
+            slide_cache = worker_shared_slides(slide_cache)
+        plan = job_plan(job)
+        if job.get("stream"):
+            # 作成と保存が重なるため、作成時間に保存時間も含まれる
+            render_streaming(plan, tmp_path, use_template=job.get("use_template", True),
+                             slide_cache=slide_cache, backend=job.get("backend", DEFAULT_BACKEND),
+                             instrumentation=instrumentation, save_options=job_save_options(job))
+            built = saved = time.perf_counter()
+        else:
+            prs = build_presentation(
+                plan,
+                use_template=job.get("use_template", True),
+                slide_cache=slide_cache,
+                backend=job.get("backend", DEFAULT_BACKEND),
+                instrumentation=instrumentation,
+            )
+            built = time.perf_counter()
+            save_presentation(prs, tmp_path, instrumentation, plan.name, job_save_options(job))
+            saved = time.perf_counter()
+        os.replace(tmp_path, output_path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return {
+            "name": job["name"],
+            "output": output_path,
+            "ok": False,
+            "error": traceback.format_exc(),
+            "seconds": time.perf_counter() - started,
+        }
+    result = {
+        "name": job["name"],
+        "output": output_path,
+        "ok": True,
+        "build_seconds": built - started,
+        "save_seconds": saved - built,
+        "seconds": saved - started,
+    }
+    if instrumentation is not None:
+        result["metrics"] = [metrics.to_dict() for metrics in collected]
+    return result
+
+# ワーカー内で共有するスライド（差し込み生成で、行によらず同じスライドを1回だけ作る）
+WORKER_SHARED_SLIDES = 64
+_worker_shared_slides = None
+
+def worker_shared_slides(backing=None):
+    """ワーカープロセス内で共有する MemorySlideCache（件数に上限あり）"""
+    global _worker_shared_slides
+    if _worker_shared_slides is None:
+        _worker_shared_slides = MemorySlideCache(backing=backing, max_entries=WORKER_SHARED_SLIDES)
+    return _worker_shared_slides
+
+def render_batch(jobs, out_dir, workers=None, instrumentation=None, on_result=None):
+    """ジョブ一覧をプロセスプールで並列生成し、結果のサマリーを返す
+
+    instrumentation を渡すと、各ワーカーで計測したスライドごとの結果をそのフックに渡す。
+    on_result を渡すと、ジョブが終わるたびに on_result(結果) を呼ぶ（PDF書き出しの投入など）。
+    出力先が重なるジョブがあれば、生成を始める前に ValueError。
+    """
+    check_unique_outputs(jobs, out_dir)
+    if instrumentation is not None:
+        jobs = [dict(job, metrics=True, trace_memory=instrumentation.trace_memory) for job in jobs]
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_job, job, resolve_output_path(job, out_dir)): i
+            for i, job in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            job = jobs[futures[future]]
+            try:
+                result = future.result()
+            except Exception:
+                # ワーカープロセス自体が落ちた場合
+                result = {
+                    "name": job["name"],
+                    "output": resolve_output_path(job, out_dir),
+                    "ok": False,
+                    "error": traceback.format_exc(),
+                    "seconds": 0.0,
+                }
+            results.append((futures[future], result))
+            if instrumentation is not None:
+                for metrics in result.pop("metrics", ()):
+                    instrumentation.emit(deck_metrics.StepMetrics(**metrics))
+            status = "OK " if result["ok"] else "NG "
+            print(f"  {status}{result['name']} ({result['seconds']:.2f}s)")
+            if on_result is not None:
+                on_result(result)
+
+    results = [result for _, result in sorted(results, key=lambda item: item[0])]
+    seconds = [r["seconds"] for r in results if r["ok"]]
+    return {
+        "total": len(results),
+        "succeeded": len(seconds),
+        "failed": [r for r in results if not r["ok"]],
+        "wall_seconds": time.perf_counter() - started,
+        "mean_seconds": sum(seconds) / len(seconds) if seconds else 0.0,
+        "max_seconds": max(seconds) if seconds else 0.0,
+        "results": results,
+    }
+
+def print_batch_summary(summary):
+    """バッチ結果のサマリーを表示"""
+    print(f"\n完了: {summary['succeeded']}/{summary['total']} 件"
+          f"（経過 {summary['wall_seconds']:.2f}s、"
+          f"平均 {summary['mean_seconds']:.2f}s、最大 {summary['max_seconds']:.2f}s）")
+    for failure in summary["failed"]:
+        print(f"\n失敗: {failure['name']} -> {failure['output']}")
+        print(failure["error"].rstrip())
 
-    print("  4/11: 原体験ストーリー")
-    create_story_slide(prs)
+# =============================================================================
+# 差し込み生成（CSV / XLSX の1行ごとに1デッキ）
+# =============================================================================
 
-    print("  5/11: サービスコンセプト")
-    create_concept_slide(prs)
+# 失敗の詳細をサマリーに残す件数（件数自体はすべて数える）
+MAX_REPORTED_FAILURES = 100
+
+_UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+def safe_filename(name):
+    """name をファイル名に使える形にする（区切り文字等を _ に、前後の空白・ドットを除く。空なら空文字）"""
+    return _UNSAFE_FILENAME_CHARS.sub("_", str(name or "")).strip(" .")[:100]
+
+def row_deck_name(row, index, name_field="name"):
+    """行の出力ファイル名（拡張子なし）。名前の列が空なら行番号"""
+    return safe_filename(row.get(name_field)) or f"row-{index:06d}"
+
+def iter_row_jobs(rows, spec=None, name_field="name", **options):
+    """データの行をバッチ生成のジョブに変換する（ジェネレーター）
+
+    同じ名前の行が複数あれば、2件目以降の名前に行番号を付けて出力先を分ける
+    （大文字・小文字だけが違う名前も、同じファイルになる環境があるので重複とみなす）。
+    """
+    used = set()
+    for index, row in enumerate(rows, start=1):
+        name = row_deck_name(row, index, name_field)
+        if name.casefold() in used:
+            name = f"{name}-{index:06d}"
+            while name.casefold() in used:
+                name += "_"
+        used.add(name.casefold())
+        yield dict(options, name=name, spec=spec, fields=row, shared_slides=True)
+
+def render_rows(jobs, out_dir, workers=None, max_pending=None, instrumentation=None, on_result=None,
+                verbose=False):
+    """ジョブを少しずつプロセスプールに投入して生成し、サマリーを返す
+
+    jobs はジェネレーターでよい。投入済みで未完了のジョブは max_pending 件
+    （既定: ワーカー数の4倍）までに抑え、結果も件数と時間の集計だけを残すので、
+    行数が多くてもメモリ使用量は増えない。
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 4
+    summary = {"total": 0, "succeeded": 0, "failed": [], "failed_count": 0,
+               "total_seconds": 0.0, "max_seconds": 0.0}
+
+    def collect(future, job):
+        try:
+            result = future.result()
+        except Exception:
+            result = {"name": job["name"], "output": resolve_output_path(job, out_dir), "ok": False,
+                      "error": traceback.format_exc(), "seconds": 0.0}
+        summary["total"] += 1
+        if instrumentation is not None:
+            for metrics in result.pop("metrics", ()):
+                instrumentation.emit(deck_metrics.StepMetrics(**metrics))
+        if result["ok"]:
+            summary["succeeded"] += 1
+            summary["total_seconds"] += result["seconds"]
+            summary["max_seconds"] = max(summary["max_seconds"], result["seconds"])
+        else:
+            summary["failed_count"] += 1
+            if len(summary["failed"]) < MAX_REPORTED_FAILURES:
+                summary["failed"].append(result)
+            print(f"  NG {result['name']}")
+        if on_result is not None:
+            on_result(result)
+        if verbose and summary["total"] % 100 == 0:
+            print(f"  {summary['total']} 件完了（失敗 {summary['failed_count']} 件、"
+                  f"経過 {time.perf_counter() - started:.1f}s）")
+
+    pending = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for job in jobs:
+            if instrumentation is not None:
+                job = dict(job, metrics=True, trace_memory=instrumentation.trace_memory)
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future, pending.pop(future))
+            pending[pool.submit(render_job, job, resolve_output_path(job, out_dir))] = job
+        for future in as_completed(list(pending)):
+            collect(future, pending.pop(future))
+
+    summary["wall_seconds"] = time.perf_counter() - started
+    summary["mean_seconds"] = summary["total_seconds"] / summary["succeeded"] if summary["succeeded"] else 0.0
+    return summary
 
-    print("  6/11: 3つのプラン")
-    create_plan_slide(prs)
+# =============================================================================
+# 業種別バリアント
+# =============================================================================
 
-    print("  7/11: プラン比較表")
-    create_comparison_slide(prs)
+# 業種別のデッキ定義の置き場所
+SPECS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "specs")
 
-    print("  8/11: 契約条件・ご利用の流れ")
-    create_contract_slide(prs)
+def load_variant_plans(specs_dir=SPECS_DIR):
+    """ディレクトリ内のデッキ定義（JSON / YAML）をすべて読み込む（ファイル名順）"""
+    return [
+        load_spec(os.path.join(specs_dir, name))
+        for name in sorted(os.listdir(specs_dir))
+        if name.endswith((".json", ".yaml", ".yml"))
+    ]
 
-    print("  9/11: Q&A")
-    create_qa_slide(prs)
+def variant_output_paths(plans, out_dir):
+    """業種別デッキの出力先 out_dir/<name>.pptx の一覧
+
+    name はファイル名に使える形にしてから使う（out_dir の外には書かない）。
+    ファイル名にできない名前・重複する名前があれば ValueError。
+    """
+    paths = []
+    owners = {}
+    for plan in plans:
+        name = safe_filename(plan.name)
+        if not name:
+            raise ValueError(f"デッキ名をファイル名にできません: {plan.name!r}")
+        key = name.casefold()
+        if key in owners:
+            raise ValueError(f"デッキ名が重複しています: {owners[key]!r} と {plan.name!r}（出力先 {name}.pptx）")
+        owners[key] = plan.name
+        paths.append(os.path.join(out_dir, f"{name}.pptx"))
+    return paths
+
+def render_variants(plans, out_dir, use_template=True, slide_cache=None, verbose=False, backend=DEFAULT_BACKEND,
+                    instrumentation=None, on_result=None, save_options=None):
+    """業種別のデッキをまとめて作成して out_dir/<name>.pptx に保存する
+
+    どの業種でも入力が同じスライド（FAQ・契約・お問い合わせ等）は最初の1回だけ
+    作成し、以降のデッキにはそのXMLを復元する。業種ごとに内容が変わるスライド
+    （表紙・お悩み等）だけが作り直される。結果の一覧を返す。
+    on_result を渡すと、デッキを保存するたびに on_result(結果) を呼ぶ。
+    出力先にできない名前・重複する名前があれば、作成を始める前に ValueError。
+    """
+    outputs = variant_output_paths(plans, out_dir)
+    shared = MemorySlideCache(backing=slide_cache)
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    for plan, output_path in zip(plans, outputs):
+        started = time.perf_counter()
+        hits, misses = shared.hits, shared.misses
+        prs = build_presentation(plan, use_template=use_template, slide_cache=shared, backend=backend,
+                                 instrumentation=instrumentation)
+        save_presentation(prs, output_path, instrumentation, plan.name, save_options)
+        result = {
+            "name": plan.name,
+            "output": output_path,
+            "built": shared.misses - misses,
+            "shared": shared.hits - hits,
+            "seconds": time.perf_counter() - started,
+        }
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+        if verbose:
+            print(f"  {plan.name}: 作成 {result['built']} 枚・共有 {result['shared']} 枚"
+                  f"（{result['seconds']:.2f}s）-> {output_path}")
+    return results
+
+def report_validation(validation):
+    """レイアウト検証の結果を表示し、問題のあったデッキ数を返す"""
+    invalid = 0
+    for path, result in validation.items():
+        if result["error"]:
+            print(f"検証失敗: {path} ({result['error']})")
+        for issue in result["issues"]:
+            print(f"レイアウト警告: {path} slide {issue['slide']} {issue['kind']} "
+                  f"{' / '.join(issue['shapes'])}: {issue['detail']}")
+        invalid += bool(result["issues"] or result["error"])
+    if not invalid:
+        print(f"レイアウト検証: {len(validation)} 件すべて問題なし")
+    return invalid
+
+def open_export_pool(args):
+    """--export の指定があれば PDF / PNG の書き出しプールを起動する"""
+    if not args.export:
+        return None
+    if args.batch or args.data or args.variants:
+        base_dir = args.out_dir
+    else:
+        base_dir = os.path.dirname(args.output) or "."
+    return deck_export.ExportPool(
+        args.export_dir or base_dir, workers=args.export_workers, formats=deck_export.parse_formats(args.export),
+        timeout=args.export_timeout, retries=args.export_retries, base_dir=base_dir,
+    )
 
-    print("  10/11: CTA")
-    create_cta_slide(prs)
+def report_exports(futures):
+    """書き出しの完了を待って結果を表示し、失敗した件数を返す"""
+    if not futures:
+        return 0
+    print("\nPDF / PNG 書き出し...")
+    failed = 0
+    for future in as_completed(futures):
+        result = future.result()
+        deck_export.print_export_result(result)
+        failed += not result.ok
+    return failed
+
+def report_media_store(save_options):
+    """圧縮結果の再利用状況を表示"""
+    if save_options.media_store:
+        store = shared_media_store()
+        print(f"メディアストア: {store.hits} 件再利用 / {store.misses} 件圧縮")
+
+def evict_slide_cache(args):
+    """CLI引数の上限に従ってスライドキャッシュを整理"""
+    removed = SlideCache(
+        max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        max_age=args.cache_max_age_days * 24 * 3600,
+    ).evict()
+    if removed:
+        print(f"スライドキャッシュ: {removed} 件削除")
+
+def main(argv=None):
+    """プレゼンテーション作成"""
+    parser = argparse.ArgumentParser(description="NOVALIS AI顧問サービス資料を生成")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH, help="単体生成時の保存先")
+    parser.add_argument("--spec", help="単体生成・差し込み生成のデッキ定義（JSON / YAML）")
+    parser.add_argument("--batch", metavar="JOBS_JSON", help="バッチ定義（JSON配列）を指定して一括生成")
+    parser.add_argument("--workers", type=int, default=None, help="バッチ生成のワーカー数（既定: CPU数）")
+    parser.add_argument("--out-dir", default=".", help="バッチ生成・差し込み生成・業種別作成の出力ディレクトリ")
+    parser.add_argument("--summary", metavar="PATH", help="バッチ結果サマリーをJSONで保存")
+    parser.add_argument("--data", metavar="CSV_OR_XLSX",
+                        help="差し込み用データ（CSV / XLSX）の1行ごとに1デッキ作成（テキスト中の {列名} に値を差し込む、"
+                             "ひな形は --spec、出力先は --out-dir）")
+    parser.add_argument("--sheet", help="差し込み用XLSXのシート名（既定: 先頭のシート）")
+    parser.add_argument("--encoding", default=deck_data.DEFAULT_ENCODING,
+                        help=f"差し込み用CSVの文字コード（既定: {deck_data.DEFAULT_ENCODING}、Shift_JIS なら cp932）")
+    parser.add_argument("--name-field", default="name", help="出力ファイル名に使う列（既定: name、空なら行番号）")
+    parser.add_argument("--variants", nargs="?", const=SPECS_DIR, metavar="SPECS_DIR",
+                        help="業種別のデッキ定義をすべて作成（共通スライドは1回だけ作成、出力先は --out-dir）")
+    parser.add_argument("--no-template", action="store_true",
+                        help="キャッシュ済みテンプレートを使わず、ヘッダー類をスライドごとに作成")
+    parser.add_argument("--stream", action="store_true",
+                        help="スライドを作るたびにzipへ書き出す（大きなデッキのメモリ使用量を抑える）")
+    parser.add_argument("--parallel-slides", type=int, metavar="N",
+                        help="単体生成時に各スライドをN個のワーカーで並列に作成")
+    parser.add_argument("--verify-parallel", action="store_true",
+                        help="並列作成の結果が逐次作成とバイト単位で一致するか確認して終了")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="描画バックエンド（xml: XMLを直接組み立てる / pptx: python-pptx のオブジェクトAPI）")
+    parser.add_argument("--verify-backend", action="store_true",
+                        help="xml / pptx バックエンドの結果がXMLの構造で一致するか確認して終了")
+    parser.add_argument("--slide-cache", action="store_true",
+                        help="入力が変わっていないスライドをキャッシュ済みXMLから復元する")
+    parser.add_argument("--validate", action="store_true",
+                        help="保存後にテキストの重なり・スライド外へのはみ出しを検証（問題があれば終了コード1）")
+    parser.add_argument("--metrics", action="append", default=[], metavar="SINK",
+                        help="スライドごとの経過時間・図形数などを計測して出力（log / jsonl:PATH / prom:PATH、複数指定可）")
+    parser.add_argument("--metrics-memory", action="store_true",
+                        help="計測時にピークメモリも記録する（tracemalloc を使うため遅くなる）")
+    parser.add_argument("--compression", choices=list(deck_zip.COMPRESSION_LEVELS), default="default",
+                        help="保存時の圧縮レベル（fast: 速い / small: 小さい / default: python-pptx と同じ）")
+    parser.add_argument("--store-media", action="store_true",
+                        help="PNG 等の圧縮済みメディアを無圧縮で格納する（保存が速くなり、サイズはほぼ同じ）")
+    parser.add_argument("--media-store", action="store_true",
+                        help="テーマ・レイアウト・画像の圧縮結果をデッキ間で再利用する（バッチ向け）")
+    parser.add_argument("--export", metavar="FORMATS",
+                        help="保存後に LibreOffice で書き出す（pdf / png / pdf,png、生成と並行して変換）")
+    parser.add_argument("--export-dir", help="書き出し先（既定: デッキと同じディレクトリ）")
+    parser.add_argument("--export-workers", type=int, default=None, help="同時に動かす soffice の数（既定: CPU数）")
+    parser.add_argument("--export-timeout", type=float, default=120.0, help="1デッキの変換のタイムアウト（秒）")
+    parser.add_argument("--export-retries", type=int, default=1, help="変換失敗・タイムアウト時の再試行回数")
+    parser.add_argument("--cache-max-mb", type=float, default=256, help="スライドキャッシュの上限容量（MB）")
+    parser.add_argument("--cache-max-age-days", type=float, default=30, help="スライドキャッシュの保持期間（日）")
+    args = parser.parse_args(argv)
+
+    instrumentation = None
+    if args.metrics:
+        try:
+            hooks = [deck_metrics.exporter_from_spec(spec) for spec in args.metrics]
+        except ValueError as e:
+            parser.error(str(e))
+        if any(isinstance(hook, deck_metrics.LoggingExporter) for hook in hooks):
+            logging.basicConfig(level=logging.INFO, format="%(message)s")
+        instrumentation = deck_metrics.Instrumentation(hooks, trace_memory=args.metrics_memory)
+    try:
+        export_pool = open_export_pool(args)
+    except (deck_export.ExportError, ValueError) as e:
+        print(e)
+        return 2
+    try:
+        return run(args, instrumentation, export_pool)
+    finally:
+        if export_pool is not None:
+            export_pool.close()
+        if instrumentation is not None:
+            instrumentation.close()
+
+def run(args, instrumentation=None, export_pool=None):
+    """解析済みのCLI引数に従って生成する
+
+    export_pool（deck_export.ExportPool）を渡すと、保存したデッキから順に
+    PDF / PNG の書き出しを投入し、最後に完了を待つ。
+    """
+    save_options = SaveOptions(args.compression, args.store_media, args.media_store)
+    exports = []
+
+    def export(result):
+        if export_pool is not None and result.get("ok", True):
+            exports.append(export_pool.submit(result["output"]))
+
+    # バッチ・差し込み生成の各ジョブに渡すCLIの設定
+    options = {}
+    if args.no_template:
+        options["use_template"] = False
+    if args.stream:
+        options["stream"] = True
+    if args.slide_cache:
+        options["slide_cache"] = True
+    if args.backend != DEFAULT_BACKEND:
+        options["backend"] = args.backend
+    if not save_options.is_default():
+        options.update(compression=args.compression, store_media=args.store_media, media_store=args.media_store)
+
+    if args.batch:
+        try:
+            jobs = [dict(job, **options) for job in load_batch_jobs(args.batch, args.out_dir)]
+        except (OSError, ValueError) as e:
+            print(f"バッチ定義を読み込めません: {e}")
+            return 1
+        print(f"バッチ生成開始... {len(jobs)} 件")
+        summary = render_batch(jobs, args.out_dir, workers=args.workers, instrumentation=instrumentation,
+                               on_result=export)
+        print_batch_summary(summary)
+        failed_exports = report_exports(exports)
+        if args.slide_cache:
+            evict_slide_cache(args)
+        invalid = 0
+        if args.validate:
+            outputs = [r["output"] for r in summary["results"] if r["ok"]]
+            validation = deck_validate.validate_decks(outputs, workers=args.workers)
+            invalid = report_validation(validation)
+            summary["validation"] = validation
+        if args.summary:
+            with open(args.summary, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+        return 0 if not summary["failed"] and not invalid and not failed_exports else 1
+
+    if args.data:
+        spec = os.path.abspath(args.spec) if args.spec else None
+        jobs = iter_row_jobs(deck_data.iter_rows(args.data, args.sheet, args.encoding), spec, args.name_field, **options)
+        print(f"差し込み生成開始... {args.data}")
+        try:
+            summary = render_rows(jobs, args.out_dir, workers=args.workers, instrumentation=instrumentation,
+                                  on_result=export, verbose=True)
+        except (OSError, deck_data.DataError) as e:
+            print(f"差し込み用データを読み込めません: {e}")
+            return 1
+        print_batch_summary(summary)
+        if summary["failed_count"] > len(summary["failed"]):
+            print(f"（ほか {summary['failed_count'] - len(summary['failed'])} 件の失敗は省略）")
+        failed_exports = report_exports(exports)
+        if args.slide_cache:
+            evict_slide_cache(args)
+        if args.summary:
+            with open(args.summary, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+        return 0 if not summary["failed_count"] and not failed_exports else 1
+
+    if args.variants:
+        try:
+            plans = load_variant_plans(args.variants)
+            variant_output_paths(plans, args.out_dir)
+        except (OSError, ValueError) as e:
+            print(f"業種別のデッキ定義を読み込めません: {e}")
+            return 1
+        print(f"業種別デッキ作成開始... {len(plans)} 件")
+        slide_cache = SlideCache() if args.slide_cache else None
+        started = time.perf_counter()
+        results = render_variants(plans, args.out_dir, use_template=not args.no_template,
+                                  slide_cache=slide_cache, verbose=True, backend=args.backend,
+                                  instrumentation=instrumentation, on_result=export, save_options=save_options)
+        built = sum(r["built"] for r in results)
+        shared = sum(r["shared"] for r in results)
+        print(f"\n完了: {len(results)} 件（経過 {time.perf_counter() - started:.2f}s、"
+              f"スライド作成 {built} 枚・共有 {shared} 枚）")
+        if slide_cache is not None:
+            evict_slide_cache(args)
+        report_media_store(save_options)
+        failed_exports = report_exports(exports)
+        if args.validate:
+            validation = deck_validate.validate_decks([r["output"] for r in results], workers=args.workers)
+            if report_validation(validation):
+                return 1
+        return 1 if failed_exports else 0
+
+    plan = load_spec(args.spec) if args.spec else DEFAULT_PLAN
+    if args.verify_parallel:
+        diff = verify_parallel_build(plan, use_template=not args.no_template, workers=args.parallel_slides)
+        if diff:
+            print("並列作成の結果が逐次作成と一致しません: " + ", ".join(diff))
+            return 1
+        print("並列作成の結果は逐次作成と一致しました")
+        return 0
+    if args.verify_backend:
+        differences = compare_backends(plan, use_template=not args.no_template)
+        for name, found in differences.items():
+            print(f"{name}:")
+            for difference in found:
+                print(f"  {difference}")
+        if differences:
+            print("xml / pptx バックエンドの結果が一致しません")
+            return 1
+        print("xml / pptx バックエンドの結果は一致しました")
+        return 0
 
-    print("  11/11: お問い合わせ")
-    create_contact_slide(prs)
+    print("スライド作成開始...")
 
-    # 保存
-    output_path = "/Users/tanakashunsuke/Desktop/AI-Advisory-Service-Design/AI顧問サービス資料_NOVALIS.pptx"
-    prs.save(output_path)
+    # 各スライドを作成
+    output_path = args.output
+    slide_cache = SlideCache() if args.slide_cache else None
+    executor = ProcessPoolExecutor(max_workers=args.parallel_slides) if args.parallel_slides else None
+    try:
+        if args.stream:
+            render_streaming(plan, output_path, use_template=not args.no_template, verbose=True,
+                             slide_cache=slide_cache, executor=executor, backend=args.backend,
+                             instrumentation=instrumentation, save_options=save_options)
+        else:
+            prs = build_presentation(plan, use_template=not args.no_template, verbose=True,
+                                     slide_cache=slide_cache, executor=executor, backend=args.backend,
+                                     instrumentation=instrumentation)
+
+            # 保存
+            save_presentation(prs, output_path, instrumentation, plan.name, save_options)
+    finally:
+        if executor is not None:
+            executor.shutdown()
     print(f"\n完成！保存先: {output_path}")
+    export({"output": output_path})
+    if slide_cache is not None:
+        print(f"スライドキャッシュ: {slide_cache.hits} 件再利用 / {slide_cache.misses} 件作成")
+        evict_slide_cache(args)
+    report_media_store(save_options)
+    failed_exports = report_exports(exports)
+    if args.validate:
+        issues = [issue.to_dict() for issue in deck_validate.validate_deck(output_path)]
+        if report_validation({output_path: {"issues": issues, "error": None}}):
+            return 1
+    return 1 if failed_exports else 0
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+スライド生成の asyncio API
+イベントループを止めずにデッキを作成する
+
+スライド作成と保存（CPU処理）はワーカープロセスで、ファイルの読み書きは
+スレッドで実行する。同時に作成する件数は Semaphore で制限し、
+タイムアウト・キャンセルに対応する。
+
+    renderer = DeckRenderer(concurrency=4)
+    data = await renderer.render_deck("specs/介護.json", prospect="株式会社サンプル")
+    await renderer.render_deck({}, output_path="out/建設.pptx", timeout=30)
+    renderer.close()
+
+ワーカーで作成が始まったものはキャンセルしても途中で止められないため、
+同時実行枠はワーカーの処理が実際に終わった時点で返す。Semaphore は
+イベントループごとに作るので、asyncio.run を繰り返しても同じレンダラーを使える。
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import os
+import time
+import uuid
+import weakref
+
+from deck_server import render_bytes, warm_worker
+from deck_spec import DEFAULT_PLAN, RenderPlan, compile_spec, load_spec
+
+# =============================================================================
+# API
+# =============================================================================
+
+def _write_file(path, data):
+    """一時ファイルに書いてから置き換える（スレッドで実行）
+
+    一時ファイル名は呼び出しごとに変えるので、同じ出力先への書き込みが重なっても混ざらない。
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+async def resolve_plan(spec, industry=None, prospect=None):
+    """spec（RenderPlan / デッキ定義の dict / ファイルパス / None）をプランにする"""
+    if spec is None:
+        plan = DEFAULT_PLAN
+    elif isinstance(spec, RenderPlan):
+        plan = spec
+    elif isinstance(spec, dict):
+        plan = compile_spec(spec)
+    else:
+        plan = await asyncio.to_thread(load_spec, os.fspath(spec))
+    return plan.with_overrides(industry=industry, prospect=prospect)
+
+def _release_on(loop, semaphore):
+    """ワーカーの処理が終わったら、ループ上で同時実行枠を返す（ループが閉じていれば何もしない）"""
+    if loop.is_closed():
+        return
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # 確認の直後にループが閉じた（枠はそのループとともに捨てられる）
+        pass
+
+class DeckRenderer:
+    """ワーカープールと同時実行数の上限を持つ非同期レンダラー"""
+
+    def __init__(self, concurrency=None, workers=None, use_template=True, slide_cache=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency or self.workers
+        self.use_template = use_template
+        self._semaphores = weakref.WeakKeyDictionary()  # イベントループ -> Semaphore
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=warm_worker,
+            initargs=(use_template, slide_cache),
+        )
+
+    def _limit(self, loop):
+        # Semaphore は作ったイベントループでしか使えないので、ループごとに持つ
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    async def render_deck(self, spec=None, output_path=None, industry=None, prospect=None, timeout=None):
+        """デッキを作成して .pptx のバイト列を返す（output_path があれば保存もする）
+
+        timeout は作成・保存全体の秒数。超えると asyncio.TimeoutError。
+        """
+        async def render():
+            plan = await resolve_plan(spec, industry, prospect)
+            data = await self._render_plan(plan)
+            if output_path:
+                await asyncio.to_thread(_write_file, output_path, data)
+            return data
+
+        if timeout is None:
+            return await render()
+        return await asyncio.wait_for(render(), timeout)
+
+    async def _render_plan(self, plan):
+        loop = asyncio.get_running_loop()
+        semaphore = self._limit(loop)
+        await semaphore.acquire()
+        try:
+            future = self.executor.submit(render_bytes, plan, self.use_template)
+        except BaseException:
+            semaphore.release()
+            raise
+        future.add_done_callback(lambda _: _release_on(loop, semaphore))
+        try:
+            data, _ = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # まだ始まっていなければ取り消す（始まっていれば終わるまで枠を使う）
+            future.cancel()
+            raise
+        return data
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.to_thread(self.close)
+
+_default_renderer = None
+
+async def render_deck(spec=None, output_path=None, industry=None, prospect=None, timeout=None):
+    """既定のレンダラー（CPU数のワーカー）でデッキを作成する"""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = DeckRenderer()
+    return await _default_renderer.render_deck(spec, output_path, industry, prospect, timeout)
+
+# =============================================================================
+# コマンドライン（動作確認用）
+# =============================================================================
+
+async def render_many(specs, out_dir, concurrency, timeout, use_template):
+    """複数のデッキ定義を並行して作成し、(spec, 結果 or 例外, 秒数) のリストを返す"""
+    async with DeckRenderer(concurrency=concurrency, use_template=use_template) as renderer:
+        async def one(spec):
+            started = time.perf_counter()
+            name = os.path.splitext(os.path.basename(spec))[0]
+            try:
+                data = await renderer.render_deck(spec, os.path.join(out_dir, f"{name}.pptx"), timeout=timeout)
+            except asyncio.TimeoutError:
+                return spec, TimeoutError(f"{timeout}秒以内に作成できませんでした"), time.perf_counter() - started
+            except Exception as e:
+                return spec, e, time.perf_counter() - started
+            return spec, len(data), time.perf_counter() - started
+
+        return await asyncio.gather(*(one(spec) for spec in specs))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="asyncio API でデッキを並行作成")
+    parser.add_argument("specs", nargs="+", help="デッキ定義（JSON / YAML）")
+    parser.add_argument("--out-dir", default=".", help="出力ディレクトリ")
+    parser.add_argument("--concurrency", type=int, default=None, help="同時に作成する件数（既定: CPU数）")
+    parser.add_argument("--timeout", type=float, default=None, help="1件あたりのタイムアウト（秒）")
+    parser.add_argument("--no-template", action="store_true", help="テンプレートを使わずに作成")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = asyncio.run(render_many(args.specs, args.out_dir, args.concurrency, args.timeout,
+                                      use_template=not args.no_template))
+    failed = 0
+    for spec, result, seconds in results:
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"失敗: {spec} ({type(result).__name__}: {result})")
+        else:
+            print(f"{spec}: {result:,} bytes（{seconds:.2f}s）")
+    print(f"完了: {len(results) - failed}/{len(results)} 件（経過 {time.perf_counter() - started:.2f}s）")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+スライド生成のベンチマーク
+スライド作成関数ごと・デッキ全体の作成・prs.save() を個別に計測し、JSONで出力する
+
+実ロゴ・フォントがない環境でも動くよう、ロゴは仮の画像を生成して使う。
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+# =============================================================================
+# 集計
+# =============================================================================
+
+def percentile(values, q):
+    """線形補間のパーセンタイル（q は 0〜100）"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    pos = (len(ordered) - 1) * q / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+def summarize(values):
+    """計測値の要約（p50 / p95 / 平均 / 最小 / 最大）"""
+    return {
+        "n": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "min": min(values) if values else 0.0,
+        "max": max(values) if values else 0.0,
+    }
+
+# =============================================================================
+# 計測
+# =============================================================================
+
+def prepare_offline_assets(work_dir):
+    """仮のロゴ画像を作成し、キャッシュ先を作業ディレクトリに向ける"""
+    from PIL import Image as PILImage
+    import create_slides
+    import deck_spec
+
+    logo_path = os.path.join(work_dir, "logo.png")
+    PILImage.new("RGBA", (600, 180), (237, 30, 121, 255)).save(logo_path)
+    create_slides.LOGO_PATH = logo_path
+    create_slides.CACHE_DIR = deck_spec.CACHE_DIR = os.path.join(work_dir, "cache")
+
+def slide_builders():
+    """(名前, 作成関数) の一覧（表紙を含むページ順）"""
+    import create_slides
+    builders = [("cover", create_slides.create_cover_slide)]
+    for _, create_slide in create_slides.CONTENT_SLIDES:
+        builders.append((create_slide.__name__.replace("create_", "").replace("_slide", ""), create_slide))
+    return builders
+
+def bench_template():
+    """テンプレートの作成（キャッシュなし）を計測"""
+    import create_slides
+    started = time.perf_counter()
+    create_slides.template_path()
+    return time.perf_counter() - started
+
+def bench_slides(plan, iterations, use_template, backend="xml"):
+    """スライド作成関数ごとの所要時間と図形数を計測"""
+    import create_slides
+    timings = {name: [] for name, _ in slide_builders()}
+    shapes = {}
+    for _ in range(iterations):
+        prs = create_slides.new_presentation(use_template)
+        for name, create_slide in slide_builders():
+            started = time.perf_counter()
+            slide = create_slide(prs, plan, backend)
+            timings[name].append(time.perf_counter() - started)
+            shapes[name] = len(slide.shapes)
+    return {
+        name: dict(summarize(values), shapes=shapes[name])
+        for name, values in timings.items()
+    }
+
+def bench_decks(plan, decks, use_template, backend="xml"):
+    """デッキ全体の作成と保存を計測"""
+    import create_slides
+    build, save, sizes = [], [], []
+    shapes = 0
+    for _ in range(decks):
+        started = time.perf_counter()
+        prs = create_slides.build_presentation(plan, use_template=use_template, backend=backend)
+        built = time.perf_counter()
+        out = io.BytesIO()
+        prs.save(out)
+        saved = time.perf_counter()
+        build.append(built - started)
+        save.append(saved - built)
+        sizes.append(len(out.getvalue()))
+        shapes = sum(len(slide.shapes) for slide in prs.slides)
+    total_build = sum(build)
+    return {
+        "build": summarize(build),
+        "save": summarize(save),
+        "total": summarize([b + s for b, s in zip(build, save)]),
+        "output_bytes": summarize(sizes),
+        "shapes_per_deck": shapes,
+        "shapes_per_second": shapes * decks / total_build if total_build else 0.0,
+    }
+
+# 保存方法の比較（名前, SaveOptions の引数）
+SAVE_MODES = [
+    ("default", {}),
+    ("fast", {"compression": "fast"}),
+    ("small", {"compression": "small"}),
+    ("fast+store", {"compression": "fast", "store_media": True}),
+    ("small+store", {"compression": "small", "store_media": True}),
+    ("fast+store+media", {"compression": "fast", "store_media": True, "media_store": True}),
+]
+
+def bench_save_modes(plan, decks, use_template, backend="xml"):
+    """同じデッキを保存方法ごとに保存し、時間とファイルサイズを計測"""
+    import create_slides
+    prs = create_slides.build_presentation(plan, use_template=use_template, backend=backend)
+    results = {}
+    for name, kwargs in SAVE_MODES:
+        options = create_slides.SaveOptions(**kwargs)
+        timings = []
+        for _ in range(decks):
+            out = io.BytesIO()
+            started = time.perf_counter()
+            create_slides.save_presentation(prs, out, options=options)
+            timings.append(time.perf_counter() - started)
+        results[name] = dict(summarize(timings), output_bytes=len(out.getvalue()))
+    return results
+
+def run_benchmark(iterations=20, decks=20, spec=None, use_template=True, backend="xml"):
+    """ベンチマーク一式を実行して結果の dict を返す"""
+    import pptx
+    import deck_spec
+
+    with tempfile.TemporaryDirectory(prefix="novalis-bench-") as work_dir:
+        prepare_offline_assets(work_dir)
+        plan = deck_spec.load_spec(spec, use_cache=False) if spec else deck_spec.DEFAULT_PLAN
+        template_seconds = bench_template() if use_template else None
+        slides = bench_slides(plan, iterations, use_template, backend)
+        deck = bench_decks(plan, decks, use_template, backend)
+        save_modes = bench_save_modes(plan, decks, use_template, backend)
+
+    return {
+        "format": 1,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "python_pptx": pptx.__version__,
+            "platform": platform.platform(),
+        },
+        "params": {
+            "iterations": iterations,
+            "decks": decks,
+            "spec": spec,
+            "use_template": use_template,
+            "backend": backend,
+        },
+        "template_build_seconds": template_seconds,
+        "slides": slides,
+        "deck": deck,
+        "save_modes": save_modes,
+    }
+
+# =============================================================================
+# 表示・比較
+# =============================================================================
+
+def print_report(result, baseline=None):
+    """結果を表形式で表示（baseline があれば p50 の比も表示）"""
+    def ratio(current, previous):
+        if not previous:
+            return ""
+        return f"  x{current / previous:5.2f}"
+
+    base_slides = baseline["slides"] if baseline else {}
+    print(f"{'slide':<12} {'p50 ms':>8} {'p95 ms':>8} {'shapes':>7}")
+    for name, stats in result["slides"].items():
+        previous = base_slides.get(name, {}).get("p50")
+        print(f"{name:<12} {stats['p50'] * 1000:8.2f} {stats['p95'] * 1000:8.2f} {stats['shapes']:7d}"
+              f"{ratio(stats['p50'], previous)}")
+
+    deck = result["deck"]
+    base_deck = baseline["deck"] if baseline else {}
+    print()
+    for key in ("build", "save", "total"):
+        previous = base_deck.get(key, {}).get("p50")
+        print(f"deck {key:<7} p50 {deck[key]['p50'] * 1000:8.2f} ms  p95 {deck[key]['p95'] * 1000:8.2f} ms"
+              f"{ratio(deck[key]['p50'], previous)}")
+    previous = base_deck.get("output_bytes", {}).get("p50")
+    print(f"output       {deck['output_bytes']['p50']:,.0f} bytes{ratio(deck['output_bytes']['p50'], previous)}")
+    print(f"throughput   {deck['shapes_per_second']:,.0f} shapes/s（{deck['shapes_per_deck']} shapes/deck）")
+    if result.get("save_modes"):
+        base_modes = baseline.get("save_modes", {}) if baseline else {}
+        print(f"\n{'save mode':<18} {'p50 ms':>8} {'bytes':>9}")
+        for name, stats in result["save_modes"].items():
+            previous = base_modes.get(name, {}).get("p50")
+            print(f"{name:<18} {stats['p50'] * 1000:8.2f} {stats['output_bytes']:9,d}{ratio(stats['p50'], previous)}")
+    if result["template_build_seconds"] is not None:
+        print(f"template     {result['template_build_seconds'] * 1000:.2f} ms（初回作成）")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="スライド生成のベンチマーク")
+    parser.add_argument("--iterations", type=int, default=20, help="スライド作成関数ごとの計測回数")
+    parser.add_argument("--decks", type=int, default=20, help="デッキ全体の作成・保存の計測回数")
+    parser.add_argument("--spec", help="計測に使うデッキ定義（JSON / YAML）")
+    parser.add_argument("--no-template", action="store_true", help="テンプレートを使わずに計測")
+    parser.add_argument("--backend", choices=("xml", "pptx"), default="xml", help="描画バックエンド")
+    parser.add_argument("--json", metavar="PATH", help="結果をJSONで保存（- なら標準出力）")
+    parser.add_argument("--compare", metavar="PATH", help="以前の結果JSONと比較して表示")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.iterations, args.decks, args.spec, use_template=not args.no_template,
+                           backend=args.backend)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.json == "-":
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    print_report(result, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+スライド生成のコマンドライン
+サブコマンド: render / batch / merge / variants / watch / validate / diff / export / bench / list / startup
+
+起動を速くするため、python-pptx を使う create_slides は render / batch / merge / variants / watch を
+実行するときだけ import する。validate（デッキ定義・生成済みデッキの検証）と
+diff（生成済みデッキの差分）・export（PDF / PNG 書き出し）・list は python-pptx を読み込まない。
+"""
+
+import argparse
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SPECS_DIR = os.path.join(HERE, "specs")
+
+SPEC_SUFFIXES = (".json", ".yaml", ".yml")
+
+HELP_FLAGS = ("-h", "--help")
+
+# サブコマンドごとに import するモジュール（startup の計測用、cli は deck_cli のみ）
+COMMAND_MODULES = {
+    "render": ["create_slides"],
+    "batch": ["create_slides"],
+    "merge": ["create_slides"],
+    "variants": ["create_slides"],
+    "watch": ["deck_watch"],
+    "validate": ["deck_spec", "deck_validate"],
+    "diff": ["deck_diff"],
+    "export": ["deck_export"],
+    "bench": ["deck_bench"],
+    "list": ["deck_spec"],
+}
+
+# =============================================================================
+# サブコマンド
+# =============================================================================
+
+def help_or_error(args, rest, main, message):
+    """委譲するサブコマンドの位置引数が省略されたとき：-h なら委譲先のヘルプを表示し、それ以外はエラー"""
+    if any(arg in HELP_FLAGS for arg in rest):
+        return main(rest)
+    args.parser.error(message)
+
+def cmd_render(args, rest):
+    """1件生成（オプションは create_slides にそのまま渡す）"""
+    import create_slides
+    return create_slides.main(rest)
+
+def cmd_batch(args, rest):
+    """バッチ生成（オプションは create_slides にそのまま渡す）"""
+    import create_slides
+    if args.jobs is None:
+        return help_or_error(args, rest, create_slides.main, "バッチ定義（JSON配列）を指定してください")
+    return create_slides.main(["--batch", args.jobs] + rest)
+
+def cmd_merge(args, rest):
+    """差し込み生成（オプションは create_slides にそのまま渡す）"""
+    import create_slides
+    if args.data is None:
+        return help_or_error(args, rest, create_slides.main, "差し込み用データ（CSV / XLSX）を指定してください")
+    return create_slides.main(["--data", args.data] + rest)
+
+def cmd_variants(args, rest):
+    """業種別デッキの一括作成（オプションは create_slides にそのまま渡す）"""
+    import create_slides
+    return create_slides.main(["--variants", args.specs_dir] + rest)
+
+def cmd_watch(args, rest):
+    """デッキ定義の変更を監視して作り直す（オプションは deck_watch にそのまま渡す）"""
+    import deck_watch
+    return deck_watch.main(rest)
+
+def cmd_diff(args, rest):
+    """生成済みデッキの差分（オプションは deck_diff にそのまま渡す）"""
+    import deck_diff
+    return deck_diff.main(rest)
+
+def cmd_export(args, rest):
+    """生成済みデッキの PDF / PNG 書き出し（オプションは deck_export にそのまま渡す）"""
+    import deck_export
+    return deck_export.main(rest)
+
+def cmd_bench(args, rest):
+    """ベンチマーク（オプションは deck_bench にそのまま渡す）"""
+    import deck_bench
+    return deck_bench.main(rest)
+
+def cmd_validate(args, rest):
+    """デッキ定義（JSON / YAML）と生成済みデッキ（.pptx）を検証"""
+    import deck_spec
+    import deck_validate
+
+    spec_paths, deck_paths = [], []
+    for path in args.paths:
+        (spec_paths if path.endswith(SPEC_SUFFIXES) else deck_paths).append(path)
+
+    failed = 0
+    for path in spec_paths:
+        try:
+            deck_spec.load_spec(path, use_cache=False)
+        except (OSError, deck_spec.SpecError) as e:
+            print(e)
+            failed += 1
+        else:
+            print(f"{path}: OK")
+
+    if deck_paths:
+        argv = deck_validate.expand_paths(deck_paths)
+        if args.workers:
+            argv += ["--workers", str(args.workers)]
+        if deck_validate.main(argv):
+            failed += 1
+    return 1 if failed else 0
+
+def cmd_list(args, rest):
+    """specs/ のデッキ定義を一覧表示"""
+    import deck_spec
+
+    for name in sorted(os.listdir(args.specs_dir)):
+        if not name.endswith(SPEC_SUFFIXES):
+            continue
+        path = os.path.join(args.specs_dir, name)
+        try:
+            plan = deck_spec.load_spec(path)
+        except (OSError, deck_spec.SpecError) as e:
+            print(f"{name:<16} （読み込み失敗: {e}）")
+            continue
+        print(f"{name:<16} {plan.name:<8} {plan.industry}")
+    return 0
+
+# =============================================================================
+# 起動時間の計測
+# =============================================================================
+
+def parse_importtime(stderr):
+    """-X importtime の出力を [(モジュール, 自身の時間us, 累積us, 深さ)] に変換"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+def measure_startup(modules, repeat=5):
+    """モジュールの import にかかる時間を別プロセスで計測（最良値）"""
+    import subprocess
+    import time
+
+    code = "; ".join(f"import {module}" for module in ["deck_cli"] + modules)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=HERE, capture_output=True, text=True, check=True,
+        )
+        wall = time.perf_counter() - started
+        entries = parse_importtime(proc.stderr)
+        result = {
+            "wall_ms": wall * 1000,
+            "import_ms": sum(self_us for _, self_us, _, _ in entries) / 1000,
+            "top": sorted(
+                ((name, cumulative_us / 1000) for name, _, cumulative_us, depth in entries if depth <= 1),
+                key=lambda item: -item[1],
+            )[:5],
+        }
+        if best is None or result["wall_ms"] < best["wall_ms"]:
+            best = result
+    return best
+
+def cmd_startup(args, rest):
+    """サブコマンドごとの起動時間（-X importtime）を表示"""
+    import json
+
+    unknown = [command for command in args.commands if command not in COMMAND_MODULES]
+    if unknown:
+        print(f"不明なサブコマンド: {', '.join(unknown)}")
+        return 2
+    report = {"cli": measure_startup([], args.repeat)}
+    for command in args.commands or list(COMMAND_MODULES):
+        report[command] = measure_startup(COMMAND_MODULES[command], args.repeat)
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    print(f"{'command':<10} {'wall ms':>8} {'import ms':>10}  主な import（累積 ms）")
+    for command, result in report.items():
+        top = ", ".join(f"{name} {ms:.1f}" for name, ms in result["top"][:3])
+        print(f"{command:<10} {result['wall_ms']:8.1f} {result['import_ms']:10.1f}  {top}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+# =============================================================================
+# エントリポイント
+# =============================================================================
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="NOVALIS スライド生成")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # render / batch / merge / variants / watch / diff / export / bench の -h は委譲先のヘルプを表示する
+    # （batch / merge の位置引数は、-h だけを渡せるよう省略可にして cmd_* で確認する）
+    p = sub.add_parser("render", add_help=False, help="1件生成（create_slides のオプションを指定）")
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("batch", add_help=False, help="バッチ定義から一括生成")
+    p.add_argument("jobs", nargs="?", help="バッチ定義（JSON配列）")
+    p.set_defaults(func=cmd_batch, parser=p)
+
+    p = sub.add_parser("merge", add_help=False, help="CSV / XLSX の1行ごとに1デッキ作成（{列名} に差し込み）")
+    p.add_argument("data", nargs="?", help="差し込み用データ（CSV / XLSX）")
+    p.set_defaults(func=cmd_merge, parser=p)
+
+    p = sub.add_parser("variants", add_help=False, help="specs/ の業種別デッキをまとめて作成（共通スライドは共有）")
+    p.add_argument("--specs-dir", default=SPECS_DIR, help="デッキ定義のディレクトリ")
+    p.set_defaults(func=cmd_variants)
+
+    p = sub.add_parser("watch", add_help=False, help="デッキ定義・ロゴの変更を監視し、影響するデッキだけを作り直す（deck_watch のオプションを指定）")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("diff", add_help=False, help="生成済みデッキ（.pptx・ディレクトリ）の差分（deck_diff のオプションを指定）")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("export", add_help=False, help="生成済みデッキを LibreOffice で PDF / PNG に書き出す（deck_export のオプションを指定）")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("bench", add_help=False, help="ベンチマーク（deck_bench のオプションを指定）")
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("validate", help="デッキ定義（JSON / YAML）・生成済みデッキ（.pptx）を検証")
+    p.add_argument("paths", nargs="+", help="デッキ定義・.pptx ファイル、または .pptx のあるディレクトリ")
+    p.add_argument("--workers", type=int, default=None, help=".pptx 検証の並列数")
+    p.set_defaults(func=cmd_validate, passthrough=False)
+
+    p = sub.add_parser("list", help="specs/ のデッキ定義を一覧表示")
+    p.add_argument("--specs-dir", default=SPECS_DIR, help="デッキ定義のディレクトリ")
+    p.set_defaults(func=cmd_list, passthrough=False)
+
+    p = sub.add_parser("startup", help="サブコマンドごとの起動時間（-X importtime）を計測")
+    p.add_argument("commands", nargs="*", metavar="COMMAND",
+                   help=f"計測するサブコマンド（{' / '.join(COMMAND_MODULES)}、既定: すべて）")
+    p.add_argument("--repeat", type=int, default=5, help="計測回数（最良値を採用）")
+    p.add_argument("--json", metavar="PATH", help="結果をJSONで保存（- なら標準出力）")
+    p.set_defaults(func=cmd_startup, passthrough=False)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if rest and not getattr(args, "passthrough", True):
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    return args.func(args, rest)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
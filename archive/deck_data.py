@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+差し込み用データ（CSV / XLSX）の読み込み
+見込み客リストを1行ずつ {列名: 値} の dict として返すジェネレーター
+
+シート全体をメモリに載せないよう、CSV は csv モジュールで、XLSX は
+zipfile + ElementTree.iterparse で1行ずつ読み、読み終えた行の要素は捨てる
+（XLSX の共有文字列テーブルだけは先に読み込む）。openpyxl 等は使わない。
+
+1行目を見出し（列名）とし、空の行は飛ばす。値はすべて文字列。
+CSV の文字コードは既定で UTF-8（BOM 付き可）。Excel・CRM の Shift_JIS
+出力は encoding="cp932" で読む。
+
+    python deck_data.py prospects.csv --limit 5
+    python deck_data.py prospects.csv --encoding cp932
+"""
+
+import argparse
+import codecs
+import csv
+import json
+import posixpath
+import re
+import sys
+import xml.etree.ElementTree as ET
+import zipfile
+
+NS = {
+    "m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+
+DATA_SUFFIXES = (".csv", ".xlsx")
+
+DEFAULT_ENCODING = "utf-8-sig"
+
+class DataError(ValueError):
+    """差し込み用データの形式エラー"""
+
+def _tag(prefix, name):
+    return f"{{{NS[prefix]}}}{name}"
+
+# =============================================================================
+# CSV
+# =============================================================================
+
+def _decoded_lines(f, path, encoding):
+    """バイナリの f を1行ずつ文字列にする（読めない行は DataError、行番号はファイル上の行）"""
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)()
+    except LookupError:
+        raise DataError(f"文字コードが分かりません: {encoding}") from None
+    number = 0
+    try:
+        for number, line in enumerate(f, 1):
+            yield decoder.decode(line)
+        # ファイル末尾で途切れたマルチバイト文字も、読めない行として扱う
+        rest = decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise DataError(f"{path}: {max(number, 1)}行目を {encoding} として読めません"
+                        f"（--encoding を確認してください。Shift_JIS なら cp932）: {e.reason}") from e
+    if rest:
+        yield rest
+
+def iter_csv_rows(path, encoding=DEFAULT_ENCODING):
+    """CSV を1行ずつ dict で返す（Excel の BOM 付き UTF-8 にも対応）"""
+    with open(path, "rb") as f:
+        reader = csv.reader(_decoded_lines(f, path, encoding))
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [name.strip() for name in header]
+        for values in reader:
+            if not any(value.strip() for value in values):
+                continue
+            yield {name: value for name, value in zip(header, values) if name}
+
+# =============================================================================
+# XLSX
+# =============================================================================
+
+_CELL_REF = re.compile(r"([A-Z]+)")
+
+def column_index(ref):
+    """セル参照（"C12"）の列番号（0始まり）"""
+    index = 0
+    for char in _CELL_REF.match(ref).group(1):
+        index = index * 26 + ord(char) - ord("A") + 1
+    return index - 1
+
+def _sheet_part(zf, sheet=None):
+    """シート名（省略時は先頭のシート）から、シートXMLのパート名を返す"""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    sheets = workbook.findall("m:sheets/m:sheet", NS)
+    if not sheets:
+        raise DataError("ブックにシートがありません")
+    if sheet is None:
+        target = sheets[0]
+    else:
+        target = next((s for s in sheets if s.get("name") == sheet), None)
+        if target is None:
+            names = ", ".join(s.get("name") for s in sheets)
+            raise DataError(f"シートが見つかりません: {sheet}（あるシート: {names}）")
+    rel_id = target.get(_tag("r", "id"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iterfind("rel:Relationship", NS):
+        if rel.get("Id") == rel_id:
+            part = rel.get("Target")
+            return part.lstrip("/") if part.startswith("/") else posixpath.normpath(posixpath.join("xl", part))
+    raise DataError(f"シートのパートが見つかりません: {target.get('name')}")
+
+def _string_item(elem):
+    """文字列要素（si / is）の文字列。リッチテキストはランを連結し、ふりがな（rPh）は除く"""
+    return "".join(t.text or "" for t in elem.iterfind("m:t", NS)) + \
+        "".join(t.text or "" for t in elem.iterfind("m:r/m:t", NS))
+
+def _shared_strings(zf):
+    """共有文字列テーブル"""
+    try:
+        stream = zf.open("xl/sharedStrings.xml")
+    except KeyError:
+        return []
+    strings = []
+    with stream:
+        for _, elem in ET.iterparse(stream):
+            if elem.tag == _tag("m", "si"):
+                strings.append(_string_item(elem))
+                elem.clear()
+    return strings
+
+def _cell_value(cell, shared):
+    kind = cell.get("t")
+    if kind == "inlineStr":
+        inline = cell.find("m:is", NS)
+        return _string_item(inline) if inline is not None else ""
+    value = cell.findtext("m:v", None, NS)
+    if value is None:
+        return ""
+    if kind == "s":
+        return shared[int(value)]
+    if kind == "b":
+        return "TRUE" if value == "1" else "FALSE"
+    if kind is None or kind == "n":
+        # 整数として入力された数値は "12.0" ではなく "12" にする
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        return str(int(number)) if number.is_integer() and abs(number) < 1e15 else value
+    return value
+
+def iter_xlsx_rows(path, sheet=None):
+    """XLSX のシートを1行ずつ dict で返す"""
+    with zipfile.ZipFile(path) as zf:
+        shared = _shared_strings(zf)
+        header = None
+        sheet_data = None
+        with zf.open(_sheet_part(zf, sheet)) as stream:
+            for event, elem in ET.iterparse(stream, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == _tag("m", "sheetData"):
+                        sheet_data = elem
+                    continue
+                if elem.tag != _tag("m", "row"):
+                    continue
+                values = {}
+                for position, cell in enumerate(elem.iterfind("m:c", NS)):
+                    ref = cell.get("r")
+                    values[column_index(ref) if ref else position] = _cell_value(cell, shared)
+                # 読み終えた行は sheetData から外し、行数によらずメモリを一定に保つ
+                sheet_data.remove(elem)
+                if not any(value.strip() for value in values.values()):
+                    continue
+                if header is None:
+                    header = {index: value.strip() for index, value in values.items() if value.strip()}
+                    continue
+                yield {name: values.get(index, "") for index, name in header.items()}
+
+# =============================================================================
+# 入口
+# =============================================================================
+
+def iter_rows(path, sheet=None, encoding=DEFAULT_ENCODING):
+    """拡張子に応じて CSV / XLSX を1行ずつ dict で返す（encoding は CSV のみ）"""
+    if path.lower().endswith(".xlsx"):
+        try:
+            yield from iter_xlsx_rows(path, sheet)
+        except (KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+            raise DataError(f"{path}: XLSX を読み込めません（{e}）") from e
+    elif path.lower().endswith(".csv"):
+        yield from iter_csv_rows(path, encoding)
+    else:
+        raise DataError(f"{path}: 差し込み用データは {' / '.join(DATA_SUFFIXES)} のいずれかです")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="差し込み用データ（CSV / XLSX）の行を JSON Lines で表示")
+    parser.add_argument("path", help="CSV / XLSX ファイル")
+    parser.add_argument("--sheet", help="XLSX のシート名（既定: 先頭のシート）")
+    parser.add_argument("--encoding", default=DEFAULT_ENCODING,
+                        help=f"CSV の文字コード（既定: {DEFAULT_ENCODING}、Shift_JIS なら cp932）")
+    parser.add_argument("--limit", type=int, default=None, help="表示する行数")
+    args = parser.parse_args(argv)
+
+    try:
+        for i, row in enumerate(iter_rows(args.path, args.sheet, args.encoding)):
+            if args.limit is not None and i >= args.limit:
+                break
+            print(json.dumps(row, ensure_ascii=False))
+    except (OSError, DataError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
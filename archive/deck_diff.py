@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+生成済みデッキの差分
+2つの .pptx（またはディレクトリ内の同名の .pptx 同士）を比べ、
+スライド・図形単位でテキスト・位置・書式の違いを表示する
+
+python-pptx は使わず、zipfile と ElementTree.iterparse でスライドXMLを
+図形ごとに読み、読み終えた要素はすぐに捨てる。zip の CRC32 とサイズが同じ
+スライドは展開せずに飛ばすので、変更の少ない夜間バッチの出力を速く比較できる。
+
+    python deck_diff.py old/建設.pptx new/建設.pptx
+    python deck_diff.py out_yesterday/ out_today/ --json diff.json
+"""
+
+from dataclasses import dataclass
+import argparse
+import difflib
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+import zipfile
+
+from deck_validate import NS, expand_paths, slide_part_names
+
+# 図形として扱う spTree 直下の要素
+SHAPE_KINDS = ("sp", "pic", "cxnSp", "graphicFrame", "grpSp")
+
+EMU_PER_INCH = 914400
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+# =============================================================================
+# スライドの読み込み
+# =============================================================================
+
+@dataclass(frozen=True)
+class ShapeInfo:
+    """比較用の図形の要約"""
+    kind: str
+    name: str
+    left: int
+    top: int
+    width: int
+    height: int
+    text: str
+    fill: str     # 図形の塗りつぶし色（なければ空）
+    styles: tuple  # ランの書式 (書体, サイズ, 色, 太字) の並び（連続する同じ書式は1つにまとめる）
+
+    def label(self):
+        text = self.text.replace("\n", " ")
+        return f"{self.name}（{text[:24]}{'…' if len(text) > 24 else ''}）" if text else self.name
+
+    def match_key(self):
+        """対応付けのキー（テキストがあればテキスト、なければ種類と位置）"""
+        return (self.kind, self.text) if self.text else (self.kind, self.left, self.top)
+
+def _summarize_shape(shape):
+    """spTree 直下の図形要素を ShapeInfo にまとめる"""
+    kind = _local(shape.tag)
+    c_nv_pr = shape.find("*/p:cNvPr", NS)
+    xfrm = shape.find("p:xfrm", NS) if kind == "graphicFrame" else shape.find("*/a:xfrm", NS)
+    left = top = width = height = 0
+    if xfrm is not None and xfrm.find("a:off", NS) is not None:
+        off, ext = xfrm.find("a:off", NS), xfrm.find("a:ext", NS)
+        left, top = int(off.get("x")), int(off.get("y"))
+        width, height = int(ext.get("cx")), int(ext.get("cy"))
+
+    paragraphs = []
+    styles = []
+    for paragraph in shape.iter(f"{{{NS['a']}}}p"):
+        texts = []
+        for run in paragraph.iterfind("a:r", NS):
+            texts.append(run.findtext("a:t", "", NS))
+            rpr = run.find("a:rPr", NS)
+            style = ("", "", "", "")
+            if rpr is not None:
+                latin = rpr.find("a:latin", NS)
+                color = rpr.find("a:solidFill/a:srgbClr", NS)
+                style = (
+                    latin.get("typeface", "") if latin is not None else "",
+                    rpr.get("sz", ""),
+                    color.get("val", "") if color is not None else "",
+                    rpr.get("b", ""),
+                )
+            if not styles or styles[-1] != style:
+                styles.append(style)
+        paragraphs.append("".join(texts))
+
+    fill = shape.find("p:spPr/a:solidFill/a:srgbClr", NS)
+    return ShapeInfo(
+        kind=kind,
+        name=c_nv_pr.get("name", kind) if c_nv_pr is not None else kind,
+        left=left, top=top, width=width, height=height,
+        text="\n".join(paragraphs).strip(),
+        fill=fill.get("val", "") if fill is not None else "",
+        styles=tuple(styles),
+    )
+
+def iter_shapes(stream):
+    """スライドXMLを少しずつ読み、spTree 直下の図形を ShapeInfo にして順に返す
+
+    図形を読み終えるたびに要素を spTree から外すので、メモリには図形1つ分しか残らない。
+    """
+    depth = 0
+    tree_depth = None
+    sp_tree = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if tree_depth is None and _local(elem.tag) == "spTree":
+                tree_depth = depth
+                sp_tree = elem
+            continue
+        if tree_depth is not None and depth == tree_depth + 1 and _local(elem.tag) in SHAPE_KINDS:
+            yield _summarize_shape(elem)
+            sp_tree.remove(elem)
+        elif depth == tree_depth:
+            tree_depth = None
+        depth -= 1
+
+# =============================================================================
+# 比較
+# =============================================================================
+
+@dataclass(frozen=True)
+class Change:
+    """見つかった違い"""
+    slide: int
+    kind: str     # slide_added / slide_removed / added / removed / text / position / style
+    shape: str
+    before: str = ""
+    after: str = ""
+
+    def to_dict(self):
+        return {"slide": self.slide, "kind": self.kind, "shape": self.shape,
+                "before": self.before, "after": self.after}
+
+def _inches(emu):
+    return f"{emu / EMU_PER_INCH:.2f}in"
+
+def _box(shape):
+    return f"({_inches(shape.left)}, {_inches(shape.top)}) {_inches(shape.width)} x {_inches(shape.height)}"
+
+def _style(shape):
+    parts = [f"{font or '-'} {int(size) / 100 if size else '-'}pt #{color or '-'}{' 太字' if bold == '1' else ''}"
+             for font, size, color, bold in shape.styles]
+    if shape.fill:
+        parts.insert(0, f"塗り #{shape.fill}")
+    return " / ".join(parts)
+
+def compare_shapes(slide, old, new):
+    """対応する2つの図形の違いを返す"""
+    changes = []
+    label = new.label() if new.text else old.label()
+    if old.text != new.text:
+        changes.append(Change(slide, "text", label, old.text, new.text))
+    if (old.left, old.top, old.width, old.height) != (new.left, new.top, new.width, new.height):
+        changes.append(Change(slide, "position", label, _box(old), _box(new)))
+    if old.styles != new.styles or old.fill != new.fill:
+        changes.append(Change(slide, "style", label, _style(old), _style(new)))
+    return changes
+
+def diff_slide(slide, old_shapes, new_shapes):
+    """1枚のスライドの図形の並びを対応付けて違いを返す
+
+    テキスト（テキストのない図形は種類と位置）が一致する図形を対応付け、
+    残った図形は同じ区間の中で順に対にして、余りを追加・削除とする。
+    """
+    changes = []
+    matcher = difflib.SequenceMatcher(
+        a=[shape.match_key() for shape in old_shapes],
+        b=[shape.match_key() for shape in new_shapes],
+        autojunk=False,
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        old_block, new_block = old_shapes[i1:i2], new_shapes[j1:j2]
+        paired = min(len(old_block), len(new_block)) if tag != "equal" else len(old_block)
+        if tag in ("equal", "replace"):
+            for old, new in zip(old_block[:paired], new_block[:paired]):
+                changes.extend(compare_shapes(slide, old, new))
+        for old in old_block[paired:]:
+            changes.append(Change(slide, "removed", old.label(), _box(old), ""))
+        for new in new_block[paired:]:
+            changes.append(Change(slide, "added", new.label(), "", _box(new)))
+    return changes
+
+def diff_decks(old_path, new_path):
+    """2つのデッキを比較して Change のリストを返す"""
+    changes = []
+    with zipfile.ZipFile(old_path) as old_zip, zipfile.ZipFile(new_path) as new_zip:
+        old_names, new_names = slide_part_names(old_zip), slide_part_names(new_zip)
+        for number, (old_name, new_name) in enumerate(zip(old_names, new_names), start=1):
+            old_info, new_info = old_zip.getinfo(old_name), new_zip.getinfo(new_name)
+            if (old_info.CRC, old_info.file_size) == (new_info.CRC, new_info.file_size):
+                continue  # 内容が同じスライドは展開しない
+            with old_zip.open(old_name) as old_stream, new_zip.open(new_name) as new_stream:
+                changes.extend(diff_slide(number, list(iter_shapes(old_stream)), list(iter_shapes(new_stream))))
+        for number in range(len(new_names) + 1, len(old_names) + 1):
+            changes.append(Change(number, "slide_removed", old_names[number - 1]))
+        for number in range(len(old_names) + 1, len(new_names) + 1):
+            changes.append(Change(number, "slide_added", new_names[number - 1]))
+    return changes
+
+def _diff_job(old_path, new_path):
+    try:
+        return [change.to_dict() for change in diff_decks(old_path, new_path)], None
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+        return [], f"{type(e).__name__}: {e}"
+
+def pair_paths(old, new):
+    """比較する (旧, 新) の組み合わせ。ディレクトリ同士なら相対パスが同じ .pptx を対にする"""
+    if not (os.path.isdir(old) and os.path.isdir(new)):
+        return [(old, new)], [], []
+    old_files = {os.path.relpath(path, old): path for path in expand_paths([old])}
+    new_files = {os.path.relpath(path, new): path for path in expand_paths([new])}
+    pairs = [(old_files[name], new_files[name]) for name in sorted(old_files.keys() & new_files.keys())]
+    removed = sorted(old_files.keys() - new_files.keys())
+    added = sorted(new_files.keys() - old_files.keys())
+    return pairs, removed, added
+
+def diff_many(pairs, workers=None):
+    """複数の組を並列に比較し、{新しいデッキのパス: {"old", "changes", "error"}} を返す（入力順）"""
+    olds, news = [old for old, _ in pairs], [new for _, new in pairs]
+    if workers == 1 or len(pairs) <= 1:
+        results = [_diff_job(old, new) for old, new in pairs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_diff_job, olds, news, chunksize=16))
+    return {
+        new: {"old": old, "changes": changes, "error": error}
+        for (old, new), (changes, error) in zip(pairs, results)
+    }
+
+# =============================================================================
+# 表示
+# =============================================================================
+
+CHANGE_LABELS = {
+    "slide_added": "スライド追加",
+    "slide_removed": "スライド削除",
+    "added": "図形追加",
+    "removed": "図形削除",
+    "text": "テキスト",
+    "position": "位置",
+    "style": "書式",
+}
+
+def format_change(change):
+    """1件の違いを表示用の文字列にする"""
+    head = f"slide {change['slide']} {CHANGE_LABELS[change['kind']]}: {change['shape']}"
+    if change["kind"] == "text":
+        lines = difflib.unified_diff(change["before"].splitlines(), change["after"].splitlines(), lineterm="", n=0)
+        body = [f"      {line}" for line in list(lines)[2:] if not line.startswith("@@")]
+        return "\n".join([head] + body)
+    if change["before"] and change["after"]:
+        return f"{head}\n      - {change['before']}\n      + {change['after']}"
+    return head
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成済みデッキの差分（テキスト・位置・書式）")
+    parser.add_argument("old", help="比較元の .pptx またはディレクトリ")
+    parser.add_argument("new", help="比較先の .pptx またはディレクトリ")
+    parser.add_argument("--workers", type=int, default=None, help="並列数（既定: CPU数）")
+    parser.add_argument("--json", metavar="PATH", help="結果をJSONで保存（- なら標準出力）")
+    parser.add_argument("--quiet", action="store_true", help="違いの詳細を表示せず件数だけ表示")
+    args = parser.parse_args(argv)
+
+    pairs, removed, added = pair_paths(args.old, args.new)
+    results = diff_many(pairs, args.workers)
+    changed = sum(1 for result in results.values() if result["changes"] or result["error"])
+
+    if args.json == "-":
+        json.dump({"results": results, "removed": removed, "added": added}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for path, result in results.items():
+            if result["error"]:
+                print(f"{path}: 読み込み失敗 {result['error']}")
+            elif result["changes"]:
+                print(f"{result['old']} -> {path}: {len(result['changes'])} 件の違い")
+                if not args.quiet:
+                    for change in result["changes"]:
+                        print("  " + format_change(change).replace("\n", "\n  "))
+        for name in removed:
+            print(f"削除されたデッキ: {name}")
+        for name in added:
+            print(f"追加されたデッキ: {name}")
+        print(f"{len(pairs)} 件中 {changed} 件に違いがあります" if changed else f"{len(pairs)} 件すべて同じです")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"results": results, "removed": removed, "added": added}, f, ensure_ascii=False, indent=2)
+    return 1 if changed or removed or added else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+生成済みデッキの PDF / PNG 書き出し
+ローカルの LibreOffice（soffice --headless）で .pptx を PDF に変換し、
+pdftoppm（poppler）でスライドごとのサムネイルPNGを作る
+
+ワーカーごとに専用のユーザープロファイルを持たせるので、複数の soffice を
+同時に動かせる。プロファイルは起動時に作成・初期化（--terminate_after_init）して
+おくため、初回起動の重い初期化がジョブの時間に入らない。各ジョブには
+タイムアウトがあり、超えたら soffice をプロセスグループごと止めて
+プロファイルを作り直し、指定回数まで再試行する。できたファイルは
+ジョブが終わった順に出力先へ移す。base_dir を渡すと、その配下のデッキは
+相対的なサブディレクトリを保ったまま出力先に置く（別ディレクトリの同名の
+デッキが上書きし合わない）。それでも出力先が重なるデッキは失敗として扱う。
+
+ネットワークには一切アクセスしない（プロファイルで更新確認を無効にし、
+変換はローカルのファイルだけで行う）。
+
+    python deck_export.py out/*.pptx --out-dir exports --formats pdf,png --workers 4
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+import argparse
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+FORMATS = ("pdf", "png")
+
+# サムネイルの幅（px、高さは縦横比から決まる）
+THUMBNAIL_WIDTH = 640
+
+SOFFICE_NAMES = ("soffice", "libreoffice")
+SOFFICE_ARGS = ("--headless", "--invisible", "--norestore", "--nologo", "--nodefault", "--nolockcheck")
+
+# 新しいプロファイルに書いておく設定（更新確認などのネットワークアクセスを止める）
+PROFILE_SETTINGS = """<?xml version="1.0" encoding="UTF-8"?>
+<oor:items xmlns:oor="http://openoffice.org/2001/registry" xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+<item oor:path="/org.openoffice.Office.Jobs/Jobs/org.openoffice.Office.Jobs:Job['UpdateCheck']/Arguments"><prop oor:name="AutoCheckEnabled" oor:op="fuse"><value>false</value></prop></item>
+<item oor:path="/org.openoffice.Office.Common/Misc"><prop oor:name="FirstRun" oor:op="fuse"><value>false</value></prop></item>
+<item oor:path="/org.openoffice.Office.Common/Misc"><prop oor:name="ShowTipOfTheDay" oor:op="fuse"><value>false</value></prop></item>
+<item oor:path="/org.openoffice.Office.Common/Help"><prop oor:name="HelpRootURL" oor:op="fuse"><value></value></prop></item>
+<item oor:path="/org.openoffice.Office.Common/Save/Document"><prop oor:name="CreateBackup" oor:op="fuse"><value>false</value></prop></item>
+</oor:items>
+"""
+
+class ExportError(RuntimeError):
+    """変換に失敗した（soffice / pdftoppm がない、出力がない等）"""
+
+class ExportTimeout(ExportError):
+    """変換がタイムアウトした"""
+
+def find_executable(names, override=None):
+    """実行ファイルのパスを返す（見つからなければ ExportError）"""
+    if override:
+        if shutil.which(override):
+            return shutil.which(override)
+        raise ExportError(f"実行ファイルが見つかりません: {override}")
+    for name in names:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise ExportError(f"実行ファイルが見つかりません: {' / '.join(names)}")
+
+# =============================================================================
+# ワーカー（専用プロファイルを持つ soffice）
+# =============================================================================
+
+def _run(command, timeout, env=None):
+    """コマンドを実行する。タイムアウトしたらプロセスグループごと止める"""
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            env=env, start_new_session=True)
+    try:
+        output, _ = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        # soffice は子プロセス（oosplash → soffice.bin）を作るのでグループごと止める
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.communicate()
+        raise ExportTimeout(f"{timeout:.0f}秒でタイムアウトしました: {os.path.basename(command[0])}")
+    if proc.returncode != 0:
+        message = output.decode("utf-8", "replace").strip().splitlines()
+        raise ExportError(f"{os.path.basename(command[0])} が終了コード {proc.returncode} で失敗しました"
+                          + (f": {message[-1]}" if message else ""))
+    return output
+
+class OfficeWorker:
+    """専用のプロファイルと作業ディレクトリを持つ soffice の実行単位"""
+
+    def __init__(self, soffice, root, index, timeout):
+        self.soffice = soffice
+        self.profile_dir = os.path.join(root, f"profile-{index}")
+        self.work_dir = os.path.join(root, f"work-{index}")
+        self.timeout = timeout
+        # 一時ディレクトリやフォントキャッシュもワーカーごとに分け、外部のHOMEを使わない
+        self.env = dict(os.environ, HOME=self.profile_dir, TMPDIR=self.work_dir, SAL_USE_VCLPLUGIN="svp")
+
+    def command(self, *args):
+        profile_url = "file://" + os.path.abspath(self.profile_dir)
+        return [self.soffice, f"-env:UserInstallation={profile_url}", *SOFFICE_ARGS, *args]
+
+    def warm_up(self):
+        """プロファイルを作り直して初期化する（起動時とタイムアウト後）"""
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+        os.makedirs(os.path.join(self.profile_dir, "user"))
+        os.makedirs(self.work_dir, exist_ok=True)
+        with open(os.path.join(self.profile_dir, "user", "registrymodifications.xcu"), "w", encoding="utf-8") as f:
+            f.write(PROFILE_SETTINGS)
+        _run(self.command("--terminate_after_init"), self.timeout, self.env)
+
+    def convert_pdf(self, deck_path, out_dir):
+        """deck_path を PDF に変換して out_dir に置き、そのパスを返す"""
+        _run(self.command("--convert-to", "pdf", "--outdir", out_dir, os.path.abspath(deck_path)),
+             self.timeout, self.env)
+        pdf_path = os.path.join(out_dir, os.path.splitext(os.path.basename(deck_path))[0] + ".pdf")
+        if not os.path.exists(pdf_path):
+            raise ExportError(f"PDF が作成されませんでした: {deck_path}")
+        return pdf_path
+
+def render_thumbnails(pdftoppm, pdf_path, out_dir, stem, width=THUMBNAIL_WIDTH, timeout=60.0):
+    """PDF の各ページをPNGにして、ページ順のパスのリストを返す"""
+    _run([pdftoppm, "-png", "-scale-to-x", str(width), "-scale-to-y", "-1",
+          pdf_path, os.path.join(out_dir, stem)], timeout)
+    return sorted(
+        os.path.join(out_dir, name) for name in os.listdir(out_dir)
+        if name.startswith(stem + "-") and name.endswith(".png")
+    )
+
+# =============================================================================
+# 書き出しプール
+# =============================================================================
+
+@dataclass(frozen=True)
+class ExportResult:
+    """1デッキ分の書き出し結果"""
+    deck: str
+    pdf: str = None         # 出力先に置いた PDF（formats に pdf がなければ None）
+    pngs: tuple = ()        # 出力先に置いたPNG（ページ順）
+    seconds: float = 0.0
+    attempts: int = 0
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def to_dict(self):
+        return {"deck": self.deck, "pdf": self.pdf, "pngs": list(self.pngs), "seconds": self.seconds,
+                "attempts": self.attempts, "error": self.error}
+
+class ExportPool:
+    """温めた soffice ワーカーで .pptx を並列に PDF / PNG へ書き出す
+
+    with ExportPool(out_dir, workers=4) as pool:
+        futures = [pool.submit(path) for path in decks]
+    """
+
+    def __init__(self, out_dir, workers=None, formats=FORMATS, timeout=120.0, retries=1,
+                 thumbnail_width=THUMBNAIL_WIDTH, soffice=None, pdftoppm=None, base_dir=None):
+        unknown = set(formats) - set(FORMATS)
+        if unknown or not formats:
+            raise ValueError(f"書き出し形式は {' / '.join(FORMATS)} から指定してください: {','.join(formats)}")
+        self.out_dir = out_dir
+        self.base_dir = os.path.abspath(base_dir) if base_dir else None
+        self.formats = tuple(formats)
+        self.timeout = timeout
+        self.workers = workers or os.cpu_count() or 1
+        self.retries = retries
+        self.thumbnail_width = thumbnail_width
+        self.soffice = find_executable(SOFFICE_NAMES, soffice)
+        self.pdftoppm = find_executable(("pdftoppm",), pdftoppm) if "png" in self.formats else None
+        self._root = tempfile.mkdtemp(prefix="novalis-export-")
+        self._idle = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export")
+        self._lock = threading.Lock()
+        self._claimed = {}  # 出力先（拡張子なし）-> そこへ書き出すデッキ
+        self.exported = 0
+        self.failed = 0
+
+        os.makedirs(out_dir, exist_ok=True)
+        office_workers = [OfficeWorker(self.soffice, self._root, i, timeout) for i in range(self.workers)]
+        try:
+            for future in [self._executor.submit(worker.warm_up) for worker in office_workers]:
+                future.result()
+        except BaseException:
+            self.close()
+            raise
+        for worker in office_workers:
+            self._idle.put(worker)
+
+    def submit(self, deck_path):
+        """書き出しを投入して Future（結果は ExportResult）を返す"""
+        return self._executor.submit(self._export, deck_path)
+
+    def map(self, deck_paths):
+        """全デッキを書き出し、終わった順に ExportResult を返す"""
+        for future in as_completed([self.submit(path) for path in deck_paths]):
+            yield future.result()
+
+    def target_dir(self, deck_path):
+        """deck_path の書き出し先ディレクトリ（base_dir 配下ならサブディレクトリを保つ）"""
+        if self.base_dir:
+            relative = os.path.relpath(os.path.dirname(os.path.abspath(deck_path)), self.base_dir)
+            if relative != os.curdir and not relative.startswith(os.pardir):
+                return os.path.join(self.out_dir, relative)
+        return self.out_dir
+
+    def _claim(self, deck_path, target_dir, stem):
+        """出力先を予約する（別のデッキが同じ出力先を使っていれば ExportError）"""
+        key = os.path.abspath(os.path.join(target_dir, stem))
+        with self._lock:
+            owner = self._claimed.setdefault(key, os.path.abspath(deck_path))
+        if owner != os.path.abspath(deck_path):
+            raise ExportError(f"出力先が {owner} の書き出しと重なります: {key}")
+
+    def _export(self, deck_path):
+        started = time.perf_counter()
+        stem = os.path.splitext(os.path.basename(deck_path))[0]
+        target_dir = self.target_dir(deck_path)
+        try:
+            self._claim(deck_path, target_dir, stem)
+        except ExportError as e:
+            with self._lock:
+                self.failed += 1
+            return ExportResult(deck_path, error=str(e))
+        worker = self._idle.get()
+        try:
+            error = None
+            for attempt in range(1, self.retries + 2):
+                job_dir = tempfile.mkdtemp(dir=worker.work_dir)
+                try:
+                    pdf, pngs = self._convert(worker, deck_path, job_dir, target_dir, stem)
+                except ExportTimeout as e:
+                    # 止めた soffice がプロファイルを壊していることがあるので作り直す
+                    error = str(e)
+                    try:
+                        worker.warm_up()
+                    except ExportError:
+                        pass
+                    continue
+                except ExportError as e:
+                    error = str(e)
+                    continue
+                finally:
+                    shutil.rmtree(job_dir, ignore_errors=True)
+                with self._lock:
+                    self.exported += 1
+                return ExportResult(deck_path, pdf, pngs, time.perf_counter() - started, attempt)
+        finally:
+            self._idle.put(worker)
+        with self._lock:
+            self.failed += 1
+        return ExportResult(deck_path, seconds=time.perf_counter() - started, attempts=self.retries + 1, error=error)
+
+    def _convert(self, worker, deck_path, job_dir, target_dir, stem):
+        """作業ディレクトリで変換し、できたファイルを target_dir へ移す"""
+        pdf_path = worker.convert_pdf(deck_path, job_dir)
+        pngs = ()
+        if "png" in self.formats:
+            pngs = tuple(
+                self._publish(path, target_dir)
+                for path in render_thumbnails(self.pdftoppm, pdf_path, job_dir, stem, self.thumbnail_width, self.timeout)
+            )
+        pdf = self._publish(pdf_path, target_dir) if "pdf" in self.formats else None
+        return pdf, pngs
+
+    def _publish(self, path, target_dir):
+        """できたファイルを target_dir へ移す（ディスクの空き・権限の問題も ExportError にする）"""
+        target = os.path.join(target_dir, os.path.basename(path))
+        try:
+            os.makedirs(target_dir, exist_ok=True)
+            shutil.move(path, target)
+        except OSError as e:
+            raise ExportError(f"出力先に書き込めません: {target}（{e}）") from e
+        return target
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self._root, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def print_export_result(result):
+    """1デッキ分の書き出し結果を表示"""
+    if result.ok:
+        outputs = ([result.pdf] if result.pdf else []) + ([f"PNG {len(result.pngs)} 枚"] if result.pngs else [])
+        retried = f"、{result.attempts} 回目で成功" if result.attempts > 1 else ""
+        print(f"  書き出し OK  {result.deck} -> {', '.join(outputs)}（{result.seconds:.2f}s{retried}）")
+    else:
+        print(f"  書き出し NG  {result.deck}: {result.error}")
+
+def parse_formats(value):
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成済みデッキを PDF / PNG に書き出す（LibreOffice）")
+    parser.add_argument("paths", nargs="+", help=".pptx ファイル、または .pptx のあるディレクトリ")
+    parser.add_argument("--out-dir", default=".", help="出力ディレクトリ")
+    parser.add_argument("--formats", type=parse_formats, default=FORMATS, help="書き出し形式（pdf,png）")
+    parser.add_argument("--workers", type=int, default=None, help="同時に動かす soffice の数（既定: CPU数）")
+    parser.add_argument("--timeout", type=float, default=120.0, help="1回の変換のタイムアウト（秒）")
+    parser.add_argument("--retries", type=int, default=1, help="失敗・タイムアウト時の再試行回数")
+    parser.add_argument("--thumbnail-width", type=int, default=THUMBNAIL_WIDTH, help="サムネイルの幅（px）")
+    parser.add_argument("--soffice", help="soffice のパス（既定: PATH から探す）")
+    args = parser.parse_args(argv)
+
+    from deck_validate import expand_paths
+
+    paths = expand_paths(args.paths)
+    # 入力のサブディレクトリを出力先でも保つ（別ディレクトリの同名デッキを上書きしない）
+    base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths]) if paths else None
+    try:
+        pool = ExportPool(args.out_dir, workers=min(args.workers or os.cpu_count() or 1, len(paths) or 1),
+                          formats=args.formats, timeout=args.timeout, retries=args.retries,
+                          thumbnail_width=args.thumbnail_width, soffice=args.soffice, base_dir=base_dir)
+    except (ExportError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    started = time.perf_counter()
+    with pool:
+        for result in pool.map(paths):
+            print_export_result(result)
+    print(f"完了: {pool.exported}/{len(paths)} 件（経過 {time.perf_counter() - started:.2f}s）")
+    return 1 if pool.failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
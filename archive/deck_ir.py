@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+スライドの中間表現（IR）と DrawingML への直列化
+スライド作成関数は python-pptx のオブジェクトを作らずに IR を組み立て、
+serialize_slide() でスライドのXMLに変換する
+
+IR は __slots__ の dataclass（Rect / TextBox / Paragraph / Run / Picture / Table）で、
+長さはEMUの整数、色は "RRGGBB"（RGBColor も可）で持つ。python-pptx には依存しない。
+出力するXMLは python-pptx の add_shape / add_textbox / add_picture / add_table で
+作った場合とバイト単位で同じになるようにしている（図形ID・名前・要素順・属性順）。
+xml_differences() は2つのスライドXMLを構造で比較する（バックエンドの検証・差分表示用）。
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+import os
+import re
+import xml.etree.ElementTree as ET
+
+NSDECLS = (
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+)
+
+XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+
+TABLE_STYLE_ID = "{5C22544A-7EE6-4342-B048-85BDC9FD1C3A}"
+
+# 段落の配置
+ALIGN_LEFT = "l"
+ALIGN_CENTER = "ctr"
+ALIGN_RIGHT = "r"
+
+# 表セルの罫線を消す指定（Cell.border）
+NO_LINE = "none"
+
+# 図形の形状 -> 名前の接頭辞（python-pptx の命名規則）
+GEOMETRY_NAMES = {
+    "rect": "Rectangle",
+    "roundRect": "Rounded Rectangle",
+    "ellipse": "Oval",
+}
+
+# =============================================================================
+# IR
+# =============================================================================
+
+@dataclass(slots=True)
+class Run:
+    """書式付きのテキスト（size はEMU、bold=None なら b 属性なし）"""
+    text: str
+    font: str
+    size: int
+    color: str
+    bold: bool = None
+
+@dataclass(slots=True)
+class Paragraph:
+    """段落（align は "l" / "ctr" / "r"、間隔はEMU。None なら指定なし）"""
+    runs: list
+    align: str = None
+    space_before: int = None
+    space_after: int = None
+
+@dataclass(slots=True)
+class TextBox:
+    """テキストボックス（wrap: False=折り返さない / True=折り返す）"""
+    left: int
+    top: int
+    width: int
+    height: int
+    paragraphs: list
+    wrap: bool = False
+
+@dataclass(slots=True)
+class Rect:
+    """塗りつぶし図形（geometry は "rect" / "roundRect" / "ellipse"）
+
+    line=None なら線なし。adjust は角丸などの調整値（0〜1）。
+    """
+    left: int
+    top: int
+    width: int
+    height: int
+    geometry: str = "rect"
+    fill: str = None
+    line: str = None
+    line_width: int = None
+    adjust: float = None
+
+@dataclass(slots=True)
+class Picture:
+    """画像（path の画像を width x height で配置）"""
+    left: int
+    top: int
+    width: int
+    height: int
+    path: str
+
+@dataclass(slots=True)
+class Cell:
+    """表のセル（border は罫線の色。NO_LINE なら線なし、None なら指定なし）"""
+    paragraph: Paragraph
+    fill: str = None
+    border: str = None
+    border_width: int = None
+    anchor: str = None
+    margin_left: int = None
+    margin_right: int = None
+
+@dataclass(slots=True)
+class Table:
+    """表（rows はセルのリストのリスト）"""
+    left: int
+    top: int
+    col_widths: list
+    row_height: int
+    rows: list
+
+@dataclass(slots=True)
+class SlideIR:
+    """1枚のスライド（layout はレイアウト名、background は背景色）"""
+    layout: str
+    shapes: list = field(default_factory=list)
+    background: str = None
+
+    def add(self, shape):
+        """図形を追加して返す"""
+        self.shapes.append(shape)
+        return shape
+
+# =============================================================================
+# DrawingML への直列化
+# =============================================================================
+
+# タブ・改行以外の制御文字（python-pptx と同じく _xHHHH_ に置き換える）
+_CONTROL_CHARS = re.compile(r"([\x00-\x08\x0B-\x1F])")
+
+def _escape_xml(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def _escape_text(text):
+    text = _CONTROL_CHARS.sub(lambda match: "_x%04X_" % ord(match.group(1)), text)
+    return _escape_xml(text)
+
+def _escape_attr(text):
+    return (_escape_xml(text).replace('"', "&quot;").replace("\r", "&#13;")
+            .replace("\n", "&#10;").replace("\t", "&#9;"))
+
+def _xfrm(left, top, width, height, tag="a:xfrm"):
+    return (f'<{tag}><a:off x="{int(left)}" y="{int(top)}"/>'
+            f'<a:ext cx="{int(width)}" cy="{int(height)}"/></{tag}>')
+
+def _solid_fill(color):
+    return f'<a:solidFill><a:srgbClr val="{color}"/></a:solidFill>'
+
+# 図形の種類ごとのXMLテンプレート。固定部分は import 時に1回だけ組み立て、
+# 書式ごとの部分（塗り・線・角丸など）は初回に埋めてキャッシュし、
+# 図形ごとには ID・位置・テキストだけを埋める。
+
+_TEXTBOX_XML = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="{id}" name="TextBox {n}"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr>{xfrm}<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+    '<p:txBody><a:bodyPr{wrap}><a:spAutoFit/></a:bodyPr><a:lstStyle/>{paragraphs}</p:txBody></p:sp>'
+).format
+
+_WRAP_ATTRS = {True: ' wrap="square"', False: ' wrap="none"', None: ""}
+
+_RECT_XML = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="{{id}}" name="{name} {{n}}"/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr>{{xfrm}}<a:prstGeom prst="{geometry}">{av}</a:prstGeom>{fill}{line}</p:spPr>'
+    '<p:style><a:lnRef idx="1"><a:schemeClr val="accent1"/></a:lnRef>'
+    '<a:fillRef idx="3"><a:schemeClr val="accent1"/></a:fillRef>'
+    '<a:effectRef idx="2"><a:schemeClr val="accent1"/></a:effectRef>'
+    '<a:fontRef idx="minor"><a:schemeClr val="lt1"/></a:fontRef></p:style>'
+    '<p:txBody><a:bodyPr rtlCol="0" anchor="ctr"/><a:lstStyle/><a:p><a:pPr algn="ctr"/></a:p></p:txBody></p:sp>'
+)
+
+_PICTURE_XML = (
+    '<p:pic><p:nvPicPr><p:cNvPr id="{id}" name="Picture {n}" descr="{descr}"/>'
+    '<p:cNvPicPr><a:picLocks noChangeAspect="1"/></p:cNvPicPr><p:nvPr/></p:nvPicPr>'
+    '<p:blipFill><a:blip r:embed="{rId}"/><a:stretch><a:fillRect/></a:stretch></p:blipFill>'
+    '<p:spPr>{xfrm}<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr></p:pic>'
+).format
+
+_TABLE_XML = (
+    '<p:graphicFrame><p:nvGraphicFramePr><p:cNvPr id="{id}" name="Table {n}"/>'
+    '<p:cNvGraphicFramePr><a:graphicFrameLocks noGrp="1"/></p:cNvGraphicFramePr><p:nvPr/>'
+    '</p:nvGraphicFramePr>{xfrm}'
+    '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/table">'
+    '<a:tbl><a:tblPr><a:tableStyleId>' + TABLE_STYLE_ID.replace("{", "{{").replace("}", "}}")
+    + '</a:tableStyleId></a:tblPr><a:tblGrid>{grid}</a:tblGrid>{rows}</a:tbl></a:graphicData></a:graphic></p:graphicFrame>'
+).format
+
+_CELL_XML = "<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>{paragraph}</a:txBody>{tc_pr}</a:tc>".format
+
+_SLIDE_XML = (
+    XML_DECLARATION
+    + f"<p:sld {NSDECLS}><p:cSld>{{background}}<p:spTree>"
+    '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+    "{shapes}</p:spTree></p:cSld>"
+    "<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>"
+).format
+
+@lru_cache(maxsize=None)
+def _rpr(font, size, color, bold):
+    """rPr 要素（同じ書式は1回だけ組み立てる）"""
+    bold_attr = "" if bold is None else f' b="{1 if bold else 0}"'
+    return (f'<a:rPr sz="{int(size) // 127}"{bold_attr}>{_solid_fill(color)}'
+            f'<a:latin typeface="{_escape_attr(font)}"/></a:rPr>')
+
+@lru_cache(maxsize=None)
+def _ppr(align, space_before, space_after):
+    """pPr 要素（配置・間隔の組み合わせごとに1回だけ組み立てる）"""
+    align = f' algn="{align}"' if align else ""
+    spacing = ""
+    if space_before is not None:
+        spacing += f'<a:spcBef><a:spcPts val="{int(space_before) // 127}"/></a:spcBef>'
+    if space_after is not None:
+        spacing += f'<a:spcAft><a:spcPts val="{int(space_after) // 127}"/></a:spcAft>'
+    if spacing:
+        return f"<a:pPr{align}>{spacing}</a:pPr>"
+    return f"<a:pPr{align}/>" if align else ""
+
+@lru_cache(maxsize=None)
+def _rect_template(geometry, adjust, fill, line, line_width):
+    """塗り・線・角丸を埋めた図形テンプレート（書式の組み合わせごとに1回だけ作る）"""
+    if adjust is None:
+        av = "<a:avLst/>"
+    else:
+        av = f'<a:avLst><a:gd name="adj" fmla="val {int(adjust * 100000.0)}"/></a:avLst>'
+    if line is None:
+        line_xml = "<a:ln><a:noFill/></a:ln>"
+    else:
+        width = f' w="{int(line_width)}"' if line_width is not None else ""
+        line_xml = f"<a:ln{width}>{_solid_fill(line)}</a:ln>"
+    return _RECT_XML.format(
+        name=GEOMETRY_NAMES[geometry], geometry=geometry, av=av,
+        fill=_solid_fill(fill) if fill is not None else "", line=line_xml,
+    ).format
+
+@lru_cache(maxsize=None)
+def _tc_pr(anchor, margin_left, margin_right, border, border_width, fill):
+    """tcPr 要素（セルの書式の組み合わせごとに1回だけ組み立てる）"""
+    attrs = ""
+    if anchor:
+        attrs += f' anchor="{anchor}"'
+    if margin_left is not None:
+        attrs += f' marL="{int(margin_left)}"'
+    if margin_right is not None:
+        attrs += f' marR="{int(margin_right)}"'
+    borders = ""
+    if border is not None:
+        if border == NO_LINE:
+            line, width = "<a:noFill/>", ""
+        else:
+            line, width = _solid_fill(border), f' w="{int(border_width)}"'
+        borders = "".join(f"<a:{tag}{width}>{line}</a:{tag}>" for tag in ("lnL", "lnR", "lnT", "lnB"))
+    fill = _solid_fill(fill) if fill is not None else ""
+    return f"<a:tcPr{attrs}>{borders}{fill}</a:tcPr>" if borders or fill else f"<a:tcPr{attrs}/>"
+
+def _color_key(color):
+    return None if color is None else str(color)
+
+def _paragraph(paragraph):
+    ppr = _ppr(paragraph.align, paragraph.space_before, paragraph.space_after)
+    runs = "".join(
+        f"<a:r>{_rpr(run.font, run.size, str(run.color), run.bold)}<a:t>{_escape_text(run.text)}</a:t></a:r>"
+        for run in paragraph.runs
+    )
+    if not ppr and not runs:
+        return "<a:p/>"
+    return f"<a:p>{ppr}{runs}</a:p>"
+
+def _textbox(shape, shape_id):
+    return _TEXTBOX_XML(
+        id=shape_id, n=shape_id - 1,
+        xfrm=_xfrm(shape.left, shape.top, shape.width, shape.height),
+        wrap=_WRAP_ATTRS[shape.wrap],
+        paragraphs="".join(_paragraph(p) for p in shape.paragraphs) or "<a:p/>",
+    )
+
+def _rect(shape, shape_id):
+    template = _rect_template(shape.geometry, shape.adjust, _color_key(shape.fill),
+                              _color_key(shape.line), shape.line_width)
+    return template(id=shape_id, n=shape_id - 1, xfrm=_xfrm(shape.left, shape.top, shape.width, shape.height))
+
+def _picture(shape, shape_id, rId, descr):
+    return _PICTURE_XML(
+        id=shape_id, n=shape_id - 1, descr=_escape_attr(descr), rId=rId,
+        xfrm=_xfrm(shape.left, shape.top, shape.width, shape.height),
+    )
+
+def _cell(cell):
+    tc_pr = _tc_pr(cell.anchor, cell.margin_left, cell.margin_right,
+                   _color_key(cell.border), cell.border_width, _color_key(cell.fill))
+    return _CELL_XML(paragraph=_paragraph(cell.paragraph), tc_pr=tc_pr)
+
+def _table(shape, shape_id):
+    width = sum(shape.col_widths)
+    height = shape.row_height * len(shape.rows)
+    return _TABLE_XML(
+        id=shape_id, n=shape_id - 1,
+        xfrm=_xfrm(shape.left, shape.top, width, height, "p:xfrm"),
+        grid="".join(f'<a:gridCol w="{int(w)}"/>' for w in shape.col_widths),
+        rows="".join(
+            f'<a:tr h="{int(shape.row_height)}">{"".join(_cell(cell) for cell in row)}</a:tr>'
+            for row in shape.rows
+        ),
+    )
+
+_SERIALIZERS = {TextBox: _textbox, Rect: _rect, Table: _table}
+
+def serialize_slide(slide, describe=os.path.basename):
+    """SlideIR をスライドのXMLに変換し、(XMLのバイト列, ((rId, 画像パス), ...)) を返す
+
+    画像の関係は rId1 をレイアウトとして rId2 から順に割り当てる（同じ画像は同じ rId）。
+    画像の説明（descr）は describe(画像パス) で決める。
+    """
+    parts = []
+    images = {}
+    for shape_id, shape in enumerate(slide.shapes, start=2):
+        kind = type(shape)
+        if kind is Picture:
+            rId = images.setdefault(shape.path, f"rId{len(images) + 2}")
+            parts.append(_picture(shape, shape_id, rId, describe(shape.path)))
+            continue
+        try:
+            serialize = _SERIALIZERS[kind]
+        except KeyError:
+            raise TypeError(f"未対応の図形です: {kind.__name__}") from None
+        parts.append(serialize(shape, shape_id))
+
+    background = ""
+    if slide.background is not None:
+        background = f"<p:bg><p:bgPr>{_solid_fill(slide.background)}<a:effectLst/></p:bgPr></p:bg>"
+    xml = _SLIDE_XML(background=background, shapes="".join(parts))
+    return xml.encode("utf-8"), tuple(sorted((rId, path) for path, rId in images.items()))
+
+# =============================================================================
+# 構造比較
+# =============================================================================
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+def xml_differences(a, b, limit=20):
+    """2つのXMLを構造で比較し、違いの説明のリストを返す（同じなら空）
+
+    要素名・属性（順序は問わない）・テキスト・子要素の並びを比べる。
+    直列化の違い（属性の順序・空要素の書き方・名前空間の接頭辞）は無視する。
+    """
+    differences = []
+
+    def walk(x, y, path):
+        if len(differences) >= limit:
+            return
+        if x.tag != y.tag:
+            differences.append(f"{path}: 要素 {_local_name(x.tag)} != {_local_name(y.tag)}")
+            return
+        if x.attrib != y.attrib:
+            keys = sorted(x.attrib.keys() | y.attrib.keys())
+            changed = [f"{k}={x.attrib.get(k)!r}/{y.attrib.get(k)!r}" for k in keys if x.attrib.get(k) != y.attrib.get(k)]
+            differences.append(f"{path}: 属性 {', '.join(changed)}")
+        if (x.text or "") != (y.text or ""):
+            differences.append(f"{path}: テキスト {x.text!r} != {y.text!r}")
+        if len(x) != len(y):
+            differences.append(f"{path}: 子要素の数 {len(x)} != {len(y)}")
+        counts = {}
+        for cx, cy in zip(x, y):
+            name = _local_name(cx.tag)
+            counts[name] = counts.get(name, 0) + 1
+            walk(cx, cy, f"{path}/{name}[{counts[name]}]")
+
+    root_a, root_b = ET.fromstring(a), ET.fromstring(b)
+    walk(root_a, root_b, _local_name(root_a.tag))
+    return differences
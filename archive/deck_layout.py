@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+レイアウトのグリッド
+スライド上の領域を N 列・N 行に分けた矩形（EMU の整数）を計算する
+
+    columns(area, 3, gap)      area を横に3等分（間隔 gap）
+    rows(area, 5, gap)         area を縦に5等分
+    grid(area, 3, 2, gx, gy)   3列×2行（左上から行優先）
+    repeat(first, 5, gap)      first と同じ大きさの矩形を縦に5つ並べる
+
+weights を渡すと幅（高さ）をその比で分ける。割り切れない端数は先頭の
+セルから1EMUずつ配り、最後のセルの端が area の端にそろうようにする。
+
+結果は (領域, 数, 間隔, 比) ごとに LRU キャッシュするので、スライドの
+図形ごとのループで毎回計算しなくてよい。python-pptx には依存しない。
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+@dataclass(frozen=True)
+class Box:
+    """矩形（EMU）"""
+    left: int
+    top: int
+    width: int
+    height: int
+
+    def __iter__(self):
+        # add_textbox(slide, *box) のように (left, top, width, height) として展開できる
+        return iter((self.left, self.top, self.width, self.height))
+
+    @property
+    def right(self):
+        return self.left + self.width
+
+    @property
+    def bottom(self):
+        return self.top + self.height
+
+    def inset(self, x, y=0):
+        """左右を x、上下を y ずつ内側に縮めた矩形"""
+        return Box(self.left + x, self.top + y, self.width - 2 * x, self.height - 2 * y)
+
+    def band(self, top, height, left=0, right=None):
+        """上端から top の位置にある高さ height の帯（左を left、右を right（既定は left と同じ）だけ縮める）"""
+        right = left if right is None else right
+        return Box(self.left + left, self.top + top, self.width - left - right, height)
+
+def _split(start, length, count, gap, weights):
+    """start から長さ length を count 個に分けた (位置, 長さ) のタプル"""
+    if count < 1:
+        raise ValueError(f"分割数は1以上です: {count}")
+    weights = weights or (1,) * count
+    if len(weights) != count:
+        raise ValueError(f"比の数（{len(weights)}）が分割数（{count}）と合いません")
+    available = length - gap * (count - 1)
+    total = sum(weights)
+    sizes = [available * w // total for w in weights]
+    for i in range(available - sum(sizes)):
+        sizes[i] += 1
+    spans = []
+    position = start
+    for size in sizes:
+        spans.append((position, size))
+        position += size + gap
+    return tuple(spans)
+
+@lru_cache(maxsize=1024)
+def columns(area, count, gap=0, weights=None):
+    """area を横に count 列に分けた Box のタプル"""
+    return tuple(Box(left, area.top, width, area.height)
+                 for left, width in _split(area.left, area.width, count, gap, weights))
+
+@lru_cache(maxsize=1024)
+def rows(area, count, gap=0, weights=None):
+    """area を縦に count 行に分けた Box のタプル"""
+    return tuple(Box(area.left, top, area.width, height)
+                 for top, height in _split(area.top, area.height, count, gap, weights))
+
+@lru_cache(maxsize=1024)
+def grid(area, column_count, row_count, gap_x=0, gap_y=0):
+    """area を column_count 列 × row_count 行に分けた Box のタプル（行優先）"""
+    return tuple(cell for row in rows(area, row_count, gap_y)
+                 for cell in columns(row, column_count, gap_x))
+
+@lru_cache(maxsize=1024)
+def repeat(first, count, gap=0, horizontal=False):
+    """first と同じ大きさの Box を間隔 gap で count 個並べたタプル（既定は縦）"""
+    if horizontal:
+        step = first.width + gap
+        return tuple(Box(first.left + i * step, first.top, first.width, first.height) for i in range(count))
+    step = first.height + gap
+    return tuple(Box(first.left, first.top + i * step, first.width, first.height) for i in range(count))
+
+def cache_info():
+    """グリッドのキャッシュの統計"""
+    return {func.__name__: func.cache_info()._asdict() for func in (columns, rows, grid, repeat)}
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+スライド作成の計測
+create_*_slide と保存（prs.save）の1回ごとに、経過時間・図形数・ラン数・
+XMLのバイト数・ピークメモリを記録し、フック（出力先）に渡す
+
+フックは StepMetrics を1つ受け取る呼び出し可能オブジェクト。close() があれば
+Instrumentation.close() で呼ばれる。標準の出力先は次の3つ（--metrics で指定）。
+
+    log         logging（ロガー名 deck_metrics）に1行ずつ出力
+    jsonl:PATH  JSON Lines で PATH に追記
+    prom:PATH   Prometheus の textfile collector 形式で PATH に集計を書き出す
+
+python-pptx には依存しない（図形数などの数え方は呼び出し側が渡す）。
+"""
+
+from dataclasses import asdict, dataclass
+import json
+import logging
+import os
+import time
+import tracemalloc
+
+# =============================================================================
+# 計測結果
+# =============================================================================
+
+@dataclass(frozen=True)
+class StepMetrics:
+    """1回分の計測結果"""
+    deck: str          # デッキ名（デッキ定義の name）
+    step: str          # create_problem_slide / save など
+    label: str         # 表示用の名前（お悩み / 保存 など）
+    seconds: float
+    shapes: int        # 作成した図形の数（保存ならデッキ全体）
+    runs: int          # 作成したランの数（保存ならデッキ全体）
+    xml_bytes: int     # スライドXMLのバイト数（保存ならファイルサイズ）
+    peak_bytes: int = None  # ピークメモリの増分（trace_memory のときだけ）
+
+    def to_dict(self):
+        return asdict(self)
+
+class Instrumentation:
+    """処理を計測してフックに渡す
+
+    trace_memory=True なら tracemalloc でピークメモリも計測する
+    （tracemalloc の分だけ処理が遅くなるので既定では無効）。
+    """
+
+    def __init__(self, hooks=(), trace_memory=False):
+        self.hooks = list(hooks)
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def call(self, deck, step, label, func, *args, counts=None, **kwargs):
+        """func(*args, **kwargs) を計測して結果を返す
+
+        counts(結果) は (図形数, ラン数, XMLバイト数) を返す関数（計測時間には含めない）。
+        """
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] - baseline if self.trace_memory else None
+        shapes, runs, xml_bytes = counts(result) if counts is not None else (0, 0, 0)
+        self.emit(StepMetrics(deck, step, label, seconds, shapes, runs, xml_bytes, peak))
+        return result
+
+    def emit(self, metrics):
+        """計測結果をすべてのフックに渡す（ワーカーで計測した結果の転送にも使う）"""
+        for hook in self.hooks:
+            hook(metrics)
+
+    def close(self):
+        for hook in self.hooks:
+            close = getattr(hook, "close", None)
+            if close is not None:
+                close()
+
+# =============================================================================
+# 出力先
+# =============================================================================
+
+class LoggingExporter:
+    """logging に1行ずつ出力する"""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("deck_metrics")
+        self.level = level
+
+    def __call__(self, metrics):
+        peak = f" peak={metrics.peak_bytes / 1024:.0f}KB" if metrics.peak_bytes is not None else ""
+        self.logger.log(
+            self.level, "%s %s（%s）%.1fms shapes=%d runs=%d xml=%dB%s",
+            metrics.deck, metrics.step, metrics.label, metrics.seconds * 1000,
+            metrics.shapes, metrics.runs, metrics.xml_bytes, peak,
+        )
+
+class JsonLinesExporter:
+    """JSON Lines でファイルに追記する"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, metrics):
+        self._file.write(json.dumps(metrics.to_dict(), ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class PrometheusTextfileExporter:
+    """step ごとに集計し、Prometheus の textfile collector 形式で書き出す
+
+    node_exporter が書きかけのファイルを読まないよう、一時ファイルに書いてから置き換える。
+    """
+
+    PREFIX = "novalis_deck_step"
+
+    def __init__(self, path):
+        self.path = path
+        self._totals = {}
+
+    def __call__(self, metrics):
+        totals = self._totals.setdefault(metrics.step, {
+            "calls": 0, "seconds": 0.0, "shapes": 0, "runs": 0, "xml_bytes": 0, "peak_bytes": None,
+        })
+        totals["calls"] += 1
+        totals["seconds"] += metrics.seconds
+        totals["shapes"] += metrics.shapes
+        totals["runs"] += metrics.runs
+        totals["xml_bytes"] += metrics.xml_bytes
+        if metrics.peak_bytes is not None:
+            totals["peak_bytes"] = max(totals["peak_bytes"] or 0, metrics.peak_bytes)
+
+    def render(self):
+        """textfile の内容を返す"""
+        series = [
+            ("calls_total", "counter", "計測した回数", "calls"),
+            ("seconds_total", "counter", "経過時間の合計（秒）", "seconds"),
+            ("shapes_total", "counter", "作成した図形の数", "shapes"),
+            ("runs_total", "counter", "作成したランの数", "runs"),
+            ("xml_bytes_total", "counter", "XMLのバイト数（保存はファイルサイズ）", "xml_bytes"),
+            ("peak_memory_bytes", "gauge", "ピークメモリの増分の最大値", "peak_bytes"),
+        ]
+        lines = []
+        for suffix, kind, help_text, key in series:
+            values = [(step, totals[key]) for step, totals in sorted(self._totals.items())
+                      if totals[key] is not None]
+            if not values:
+                continue
+            name = f"{self.PREFIX}_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for step, value in values:
+                lines.append(f'{name}{{step="{step}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.path)
+
+def exporter_from_spec(spec):
+    """--metrics の値（log / jsonl:PATH / prom:PATH）から出力先を作る"""
+    kind, _, path = spec.partition(":")
+    if kind == "log" and not path:
+        return LoggingExporter()
+    if kind == "jsonl" and path:
+        return JsonLinesExporter(path)
+    if kind == "prom" and path:
+        return PrometheusTextfileExporter(path)
+    raise ValueError(f"計測の出力先は log / jsonl:PATH / prom:PATH のいずれかです: {spec}")
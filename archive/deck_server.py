@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+スライド生成サーバー
+デッキ定義（JSON）を POST すると .pptx を返すローカルHTTPサービス
+
+ワーカープロセスは起動時に python-pptx・テンプレート・ロゴを読み込み、
+1デッキ作成して温めておくので、リクエストごとのプロセス起動や import がない。
+同時に受け付けるのは「ワーカー数 + 待ち行列の長さ」までで、
+それを超えたリクエストは 503（Retry-After 付き）で即座に断る。
+ワーカーが異常終了して（メモリ不足など）プールが壊れたら、そのリクエストは
+503 で返し、プールを作り直して温め直す。
+
+    python deck_server.py --port 8765 --workers 4
+    curl --data-binary @specs/介護.json \\
+        'http://127.0.0.1:8765/render?prospect=株式会社サンプル' -o deck.pptx
+
+POST /render   本文はデッキ定義（{} なら既定）。クエリで industry / prospect を上書き
+GET  /healthz  稼働状況（ワーカー数・処理中の件数・累計件数など）をJSONで返す
+               （プールが壊れたまま作り直せていなければ 503）
+"""
+
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import parse_qs, quote, urlsplit
+import argparse
+import io
+import json
+import os
+import signal
+import threading
+import time
+
+from deck_spec import compile_spec
+
+# 受け付けるリクエスト本文の上限
+MAX_BODY_BYTES = 1024 * 1024
+
+PPTX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# =============================================================================
+# ワーカープロセス
+# =============================================================================
+
+_worker_slide_cache = None
+
+def warm_worker(use_template, slide_cache):
+    """ワーカーの初期化：テンプレート（の内容）・ロゴ・書式を読み込み、1デッキ作って温める"""
+    global _worker_slide_cache
+    import create_slides
+
+    if slide_cache:
+        _worker_slide_cache = create_slides.SlideCache()
+    if use_template:
+        create_slides.template_bytes()
+    create_slides.load_image_asset(create_slides.LOGO_PATH)
+    create_slides.build_presentation(use_template=use_template).save(io.BytesIO())
+
+def render_bytes(plan, use_template):
+    """デッキを作成して .pptx のバイト列を返す（ワーカーで実行）"""
+    import create_slides
+
+    started = time.perf_counter()
+    prs = create_slides.build_presentation(plan, use_template=use_template, slide_cache=_worker_slide_cache)
+    out = io.BytesIO()
+    prs.save(out)
+    return out.getvalue(), time.perf_counter() - started
+
+def _ready():
+    return os.getpid()
+
+# =============================================================================
+# サービス本体
+# =============================================================================
+
+class RenderService:
+    """ワーカープールと受付枠（同時実行 + 待ち行列）を管理する"""
+
+    def __init__(self, workers=None, queue_size=8, timeout=30.0, use_template=True, slide_cache=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = self.workers + queue_size
+        self.timeout = timeout
+        self.use_template = use_template
+        self.slide_cache = slide_cache
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self.in_flight = 0
+        self.served = 0
+        self.rejected = 0
+        self.failed = 0
+        self.broken = False
+        self.restarts = 0
+        self.started = time.time()
+        self.executor = self._new_executor()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=warm_worker,
+            initargs=(self.use_template, self.slide_cache),
+        )
+
+    def warm_up(self):
+        """全ワーカーを起動して初期化が終わるまで待つ"""
+        futures = [self.executor.submit(_ready) for _ in range(self.workers)]
+        return sorted({future.result() for future in futures})
+
+    def restart(self, broken_executor):
+        """壊れたプールを作り直して温め直す（別のリクエストが作り直し済みなら何もしない）"""
+        with self._restart_lock:
+            if self.executor is not broken_executor:
+                return
+            with self._lock:
+                self.broken = True
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._new_executor()
+            try:
+                self.warm_up()
+            except BrokenProcessPool:
+                # 温め直しでも落ちた場合は、壊れたまま次のリクエストで再び作り直す
+                return
+            with self._lock:
+                self.broken = False
+                self.restarts += 1
+
+    def try_acquire(self):
+        """受付枠を確保する（空きがなければ False）"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def _release(self, _future=None):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def render(self, plan):
+        """受付枠を確保済みのリクエストを処理して (バイト列, 作成秒数) を返す
+
+        タイムアウトしてもワーカーの処理は止められないため、
+        受付枠は処理が実際に終わった時点で返す。ワーカーが落ちてプールが
+        壊れていたら、プールを作り直してから BrokenProcessPool を送出する。
+        """
+        executor = self.executor
+        try:
+            future = executor.submit(render_bytes, plan, self.use_template)
+        except BaseException as e:
+            self._release()
+            with self._lock:
+                self.failed += 1
+            if isinstance(e, BrokenProcessPool):
+                self.restart(executor)
+            raise
+        future.add_done_callback(self._release)
+        try:
+            result = future.result(timeout=self.timeout)
+        except BaseException as e:
+            with self._lock:
+                self.failed += 1
+            if isinstance(e, BrokenProcessPool):
+                self.restart(executor)
+            raise
+        with self._lock:
+            self.served += 1
+        return result
+
+    def status(self):
+        # 落ちたワーカーはプールが検知して _broken にする（次のリクエストを待たずに報告する）
+        broken = self.broken or bool(getattr(self.executor, "_broken", False))
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "served": self.served,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "broken": broken,
+                "restarts": self.restarts,
+                "uptime_seconds": round(time.time() - self.started, 1),
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+class RenderHandler(BaseHTTPRequestHandler):
+    server_version = "NovalisRender/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def address_string(self):
+        # Unixソケットでは client_address が空文字になる
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def send_json(self, status, body, headers=()):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/healthz":
+            status = self.server.service.status()
+            self.send_json(503 if status["broken"] else 200, status)
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/render":
+            self.send_json(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers["Content-Length"])
+        except (TypeError, ValueError):
+            length = -1
+        if length < 0:
+            # 長さが分からないまま読むと、クライアントが切断するまで待ってしまう
+            self.close_connection = True
+            self.send_json(400, {"error": "Content-Length（0以上の整数）が必要です"})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self.send_json(413, {"error": f"本文が大きすぎます（上限 {MAX_BODY_BYTES} バイト）"})
+            return
+        try:
+            raw = json.loads(self.rfile.read(length) or b"{}")
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            plan = compile_spec(raw).with_overrides(industry=query.get("industry"), prospect=query.get("prospect"))
+        except ValueError as e:
+            # json.JSONDecodeError / SpecError はどちらも ValueError
+            self.send_json(400, {"error": str(e)})
+            return
+
+        service = self.server.service
+        if not service.try_acquire():
+            self.send_json(503, {"error": "混雑しています。しばらくしてから再試行してください"},
+                           headers=[("Retry-After", "1")])
+            return
+        started = time.perf_counter()
+        try:
+            data, render_seconds = service.render(plan)
+        except FutureTimeoutError:
+            self.send_json(504, {"error": f"{service.timeout:.0f}秒以内に作成できませんでした"})
+            return
+        except BrokenProcessPool:
+            self.send_json(503, {"error": "ワーカーが異常終了しました。しばらくしてから再試行してください"},
+                           headers=[("Retry-After", "1")])
+            return
+        except Exception as e:
+            self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        filename = f"{plan.name}.pptx"
+        self.send_response(200)
+        self.send_header("Content-Type", PPTX_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(filename)}")
+        self.send_header("X-Render-Seconds", f"{render_seconds:.3f}")
+        self.send_header("X-Total-Seconds", f"{time.perf_counter() - started:.3f}")
+        self.end_headers()
+        self.wfile.write(data)
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+def make_server(service, host="127.0.0.1", port=8765, unix_path=None, quiet=False):
+    """HTTPサーバーを作る（unix_path を指定するとUnixソケットで待ち受け）"""
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        server = ThreadingUnixHTTPServer(unix_path, RenderHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), RenderHandler)
+    server.service = service
+    server.quiet = quiet
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="スライド生成サーバー（デッキ定義JSON → .pptx）")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けアドレス")
+    parser.add_argument("--port", type=int, default=8765, help="待ち受けポート")
+    parser.add_argument("--unix", metavar="PATH", help="TCPの代わりにUnixソケットで待ち受け")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（既定: CPU数）")
+    parser.add_argument("--queue", type=int, default=8, help="ワーカーが埋まっているときに待たせる件数")
+    parser.add_argument("--timeout", type=float, default=30.0, help="1件あたりの作成タイムアウト（秒）")
+    parser.add_argument("--no-template", action="store_true", help="テンプレートを使わずに作成")
+    parser.add_argument("--slide-cache", action="store_true", help="変更のないスライドをキャッシュから再利用")
+    parser.add_argument("--quiet", action="store_true", help="アクセスログを出さない")
+    args = parser.parse_args(argv)
+
+    service = RenderService(args.workers, args.queue, args.timeout,
+                            use_template=not args.no_template, slide_cache=args.slide_cache)
+    print(f"ワーカー起動中... {service.workers} プロセス")
+    service.warm_up()
+    server = make_server(service, args.host, args.port, args.unix, args.quiet)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"待ち受け開始: {where}（同時 {service.workers} 件 + 待ち {args.queue} 件）")
+    # SIGTERM でも後片付けしてから終了する（ワーカー起動後に設定）
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+スライド資料のデッキ定義（JSON / YAML）
+読み込み・検証して不変のレンダリングプランに変換する
+
+python-pptx に依存しない（一覧表示や検証だけのときに重い import を避けるため）
+"""
+
+from dataclasses import dataclass, fields, is_dataclass, replace
+import copy
+import hashlib
+import json
+import os
+import pickle
+import re
+
+# キャッシュ（テンプレート・パース済みデッキ定義など）
+CACHE_DIR = os.environ.get("NOVALIS_CACHE_DIR", os.path.expanduser("~/.cache/novalis-slides"))
+
+# デッキ定義の形式・compile_spec の検証が変わったら上げる（パース済みキャッシュを無効化し、
+# 古いキャッシュのプランが新しい検証を素通りしないようにする）
+SPEC_FORMAT_VERSION = 3
+
+# 料金プランのスライドに並べられるプランの数（列が狭くなりすぎない範囲）
+MAX_PLAN_ITEMS = 6
+# Q&A のスライドに並べられる質問の数（2列・最小のフォントサイズで収まる範囲）
+MAX_FAQ_ITEMS = 12
+# 比較表の列数（項目の列 + 比較する列。列幅は列数から決める）
+MIN_COMPARISON_COLUMNS = 2
+MAX_COMPARISON_COLUMNS = 1 + MAX_PLAN_ITEMS
+
+# =============================================================================
+# 既定のデッキ定義（建設業向け）
+# =============================================================================
+
+DEFAULT_SPEC = {
+    "name": "建設",
+    "industry": "建設業",
+    "cover": {
+        "catch": "「AIを使いたいけど、何から始めれば...」",
+        "title": "AI ADVISORY SERVICE",
+        "subtitle": "{industry}専門のAI顧問が、月10万円で御社に",
+        "credentials": "複数回全国トップセールス獲得・5年連続で個人年間売上2億円維持\n建設業の現場を知り尽くしたAI専門家が、御社のAI活用を0から伴走支援",
+        "prospect": None,
+    },
+    "problems": {
+        "title": "こんなお悩みありませんか？",
+        "items": [
+            "□ 日中は現場、定時後に事務処理。気づけば毎月35時間以上の残業",
+            "□ 見積もり作成に2時間以上。原価表を見ながら電卓を叩く日々",
+            "□ 日報・写真整理・報告書作成。この『ちょっとした作業』の積み重ねが残業に",
+            "□ 提案資料がいつも似たようなものになり、差別化できず契約率が上がらない",
+            "□ チラシ制作を外注すると約20万円。自分で作りたいがデザインスキルも時間もない",
+            "□ AIを使いたいが、何から始めればいいかわからない。高額な投資のイメージもある",
+            "□ AI人材を採用したいが年収も高額。でも若手に教えられるほど自分も詳しくない",
+        ],
+        "closing": "「AIを導入したいけど、どこから手をつければ...」\nその悩み、建設業で毎日0時残業から定時帰りを実現した私が、0から一緒に解決します。",
+    },
+    "story": {
+        "title": "なぜ私が建設業に特化するのか",
+        "heading": "私がこのサービスを作った理由",
+        "body": (
+            "リフォーム営業として入社した頃、毎日0時を超える残業が当たり前でした。\n\n"
+            "見積もり作成に2時間以上。原価表すらなく、FAXを指で照らし合わせて原価を調べる。日中は現場、帰社してから事務作業。どれだけ頑張っても、12時を切ることがない。\n\n"
+            "ある時、気づきました。\n"
+            "「こんな環境で、新しい社員が定着するわけがない。」\n\n"
+            "だから私は、効率化を始めました。\n\n"
+            "提案資料のテンプレートを作り直し、原価表を自分で更新し、見積もりシステムを自作。社内に数え切れないほどあった報告書式。目につくものを片っ端から直していきました。\n\n"
+            "身の回りのすべてを、端から端まで効率化しました。"
+        ),
+        "results_title": "その結果",
+        "results": [
+            {"label": "見積もり作成", "value": "2時間 → 10分"},
+            {"label": "毎日0時残業", "value": "→ 定時帰り"},
+            {"label": "全国トップセールス", "value": "複数回獲得"},
+            {"label": "5年連続", "value": "年間売上2億円"},
+            {"label": "創業40年で", "value": "過去最高売上達成"},
+        ],
+    },
+    "plans": {
+        "title": "3つのプランからお選びいただけます",
+        "items": [
+            {
+                "name": "伴走プラン",
+                "price": "月額 15万円",
+                "catch": "「AI専門家が、御社のそばに」",
+                "features": ["チャット無制限", "キックオフMTG", "振り返りMTG", "月次レポート"],
+                "for": "まずはAI活用を始めたい方向け",
+                "highlight": False,
+            },
+            {
+                "name": "自走プラン",
+                "price": "月額 40万円",
+                "catch": "「社内にAI人材を育てる」",
+                "features": ["伴走プラン全内容", "社員研修（4名まで）", "内製化支援"],
+                "for": "社員にAIスキルを身につけさせたい方向け",
+                "highlight": True,
+            },
+            {
+                "name": "エージェント開発プラン",
+                "price": "月額 60万円",
+                "catch": "「御社専用のAIツールを開発」",
+                "features": ["要件整理MTG", "月1開発MTG", "オーダーメイド開発"],
+                "for": "「これを作ってほしい」がある方向け",
+                "highlight": False,
+            },
+        ],
+    },
+    "comparison": {
+        "title": "プラン比較表",
+        # "shapes"（セルごとに図形）または "table"（ネイティブの表1つ）
+        "render": "shapes",
+        "headers": ["項目", "伴走プラン", "自走プラン", "エージェント開発"],
+        "rows": [
+            ["月額", "15万円", "40万円", "60万円"],
+            ["チャット相談", "◎ 無制限", "◎ 無制限", "○ 開発関連"],
+            ["キックオフMTG", "◎", "◎", "◎"],
+            ["振り返りMTG（3ヶ月後）", "◎", "◎", "◎"],
+            ["月次レポート", "◎", "◎", "○"],
+            ["月1開発MTG", "−", "−", "◎"],
+            ["社員研修（4名まで）", "−", "◎", "−"],
+            ["内製化支援", "−", "◎", "−"],
+            ["オーダーメイド開発", "−", "−", "◎"],
+        ],
+    },
+    "faq": {
+        "title": "よくある質問",
+        "items": [
+            {"q": "Q. なぜ「3ヶ月」なのですか？", "a": "慣れる。習慣化する。日常に溶け込ませる。そこまで伴走して、初めて「効果が出た」と実感できます。"},
+            {"q": "Q. 試用期間とは何ですか？", "a": "最初の1ヶ月で相性を確認。万が一「合わない」と感じた場合は、1ヶ月で終了可能です。"},
+            {"q": "Q. 途中でプラン変更はできますか？", "a": "はい。アップグレード・ダウングレードどちらも対応しています。"},
+            {"q": "Q. チャット相談はどのくらいで返信がありますか？", "a": "24時間以内に返信いたします。"},
+            {"q": "Q. どんな相談ができますか？", "a": "AIに関することなら、どんな相談でも可能です。「こんなこと聞いていいのかな？」もお気軽に。"},
+        ],
+    },
+    "contact": {
+        "title": "お問い合わせ",
+        "items": [
+            {"label": "WEB", "value": "https://novalisgroup.jp/"},
+            {"label": "Email", "value": "shunsuke.tanaka@novalisgroup.biz"},
+            {"label": "住所", "value": "〒152-0004 東京都目黒区鷹番2丁目20番20号\nイニッゾ学芸大学5-17"},
+        ],
+        "closing": "お気軽にご相談ください",
+    },
+}
+
+# =============================================================================
+# レンダリングプラン（不変）
+# =============================================================================
+
+@dataclass(frozen=True)
+class CoverPlan:
+    catch: str
+    title: str
+    subtitle: str
+    credentials: str
+    prospect: str = None
+
+@dataclass(frozen=True)
+class ProblemsPlan:
+    title: str
+    items: tuple
+    closing: str
+
+@dataclass(frozen=True)
+class StoryPlan:
+    title: str          # {industry} は業種に置き換わる
+    heading: str
+    body: str
+    results_title: str
+    results: tuple      # (ラベル, 値)
+
+@dataclass(frozen=True)
+class PricingPlan:
+    name: str
+    price: str
+    catch: str
+    features: tuple
+    target: str
+    highlight: bool = False
+
+@dataclass(frozen=True)
+class PlansPlan:
+    title: str
+    items: tuple  # PricingPlan
+
+@dataclass(frozen=True)
+class ComparisonPlan:
+    title: str
+    headers: tuple
+    rows: tuple  # tuple of tuple
+    render: str = "shapes"
+
+@dataclass(frozen=True)
+class FaqPlan:
+    title: str
+    items: tuple  # (質問, 回答)
+
+@dataclass(frozen=True)
+class ContactPlan:
+    title: str
+    items: tuple  # (ラベル, 値)
+    closing: str
+
+@dataclass(frozen=True)
+class RenderPlan:
+    """スライド作成関数が参照するデッキ全体の内容"""
+    name: str
+    industry: str
+    cover: CoverPlan
+    problems: ProblemsPlan
+    story: StoryPlan
+    plans: PlansPlan
+    comparison: ComparisonPlan
+    faq: FaqPlan
+    contact: ContactPlan
+
+    def with_overrides(self, industry=None, prospect=None):
+        """業種・宛名だけを差し替えたプランを返す"""
+        plan = self
+        if industry:
+            plan = replace(plan, industry=industry)
+        if prospect:
+            plan = replace(plan, cover=replace(plan.cover, prospect=prospect))
+        return plan
+
+    def bind(self, values):
+        """差し込みデータ（{列名: 値}）をテキスト中の {列名} に差し込んだプランを返す
+
+        列 industry / prospect は業種・宛名の上書きにも使う。データにない {列名} はそのまま残す
+        （{industry} は作成時に業種で置き換わる）。差し込みのないセクションは元のものを共有する。
+        """
+        values = {key: value for key, value in values.items() if value is not None}
+        plan = _bind(self, values)
+        return plan.with_overrides(industry=values.get("industry"), prospect=values.get("prospect"))
+
+PLACEHOLDER = re.compile(r"\{([^{}\s]+)\}")
+
+def _bind(value, values):
+    """文字列・タプル・dataclass をたどって {列名} を置き換える（変化がなければ同じオブジェクト）"""
+    if isinstance(value, str):
+        if "{" not in value:
+            return value
+        return PLACEHOLDER.sub(lambda m: str(values.get(m.group(1), m.group(0))), value)
+    if isinstance(value, tuple):
+        bound = tuple(_bind(item, values) for item in value)
+        return value if all(a is b for a, b in zip(bound, value)) else bound
+    if is_dataclass(value):
+        changes = {}
+        for field in fields(value):
+            current = getattr(value, field.name)
+            bound = _bind(current, values)
+            if bound is not current:
+                changes[field.name] = bound
+        return replace(value, **changes) if changes else value
+    return value
+
+# =============================================================================
+# 検証・変換
+# =============================================================================
+
+COMPARISON_RENDER_MODES = ("shapes", "table")
+
+class SpecError(ValueError):
+    """デッキ定義の形式エラー"""
+
+def _require(value, kind, where):
+    if not isinstance(value, kind):
+        names = {str: "文字列", list: "配列", dict: "オブジェクト", bool: "真偽値"}
+        raise SpecError(f"{where}: {names.get(kind, kind.__name__)}が必要です（実際: {type(value).__name__}）")
+    return value
+
+def _text(section, key, where):
+    return _require(section.get(key), str, f"{where}.{key}")
+
+def _text_list(value, where):
+    return tuple(_require(item, str, f"{where}[{i}]") for i, item in enumerate(_require(value, list, where)))
+
+def merge_spec(base, override):
+    """セクション単位で上書きマージする（配列は丸ごと置き換え）"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_spec(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+def compile_spec(raw, base=DEFAULT_SPEC):
+    """デッキ定義（dict）を検証してRenderPlanに変換する
+
+    raw に含まれないセクションは base の内容を使う。
+    """
+    spec = merge_spec(base, _require(raw, dict, "spec"))
+
+    cover = _require(spec.get("cover"), dict, "cover")
+    prospect = cover.get("prospect")
+    if prospect is not None:
+        _require(prospect, str, "cover.prospect")
+
+    problems = _require(spec.get("problems"), dict, "problems")
+
+    story = _require(spec.get("story"), dict, "story")
+    results = []
+    for i, item in enumerate(_require(story.get("results"), list, "story.results")):
+        where = f"story.results[{i}]"
+        _require(item, dict, where)
+        results.append((_text(item, "label", where), _text(item, "value", where)))
+
+    plans = _require(spec.get("plans"), dict, "plans")
+    plan_items = []
+    for i, item in enumerate(_require(plans.get("items"), list, "plans.items")):
+        where = f"plans.items[{i}]"
+        _require(item, dict, where)
+        plan_items.append(PricingPlan(
+            name=_text(item, "name", where),
+            price=_text(item, "price", where),
+            catch=_text(item, "catch", where),
+            features=_text_list(item.get("features"), f"{where}.features"),
+            target=_text(item, "for", where),
+            highlight=_require(item.get("highlight", False), bool, f"{where}.highlight"),
+        ))
+    if not plan_items:
+        raise SpecError("plans.items: プランが1つ以上必要です")
+    if len(plan_items) > MAX_PLAN_ITEMS:
+        raise SpecError(f"plans.items: プランは{MAX_PLAN_ITEMS}つまでです（{len(plan_items)}つあります）")
+
+    comparison = _require(spec.get("comparison"), dict, "comparison")
+    headers = _text_list(comparison.get("headers"), "comparison.headers")
+    if not MIN_COMPARISON_COLUMNS <= len(headers) <= MAX_COMPARISON_COLUMNS:
+        raise SpecError(f"comparison.headers: 列は{MIN_COMPARISON_COLUMNS}〜{MAX_COMPARISON_COLUMNS}列です"
+                        f"（{len(headers)}列あります）")
+    rows = []
+    for i, row in enumerate(_require(comparison.get("rows"), list, "comparison.rows")):
+        cells = _text_list(row, f"comparison.rows[{i}]")
+        if len(cells) != len(headers):
+            raise SpecError(f"comparison.rows[{i}]: 列数が headers と一致しません（{len(cells)} != {len(headers)}）")
+        rows.append(cells)
+
+    render = _text(comparison, "render", "comparison")
+    if render not in COMPARISON_RENDER_MODES:
+        raise SpecError(f"comparison.render: {' / '.join(COMPARISON_RENDER_MODES)} のいずれかを指定してください（実際: {render}）")
+
+    faq = _require(spec.get("faq"), dict, "faq")
+    qas = []
+    for i, item in enumerate(_require(faq.get("items"), list, "faq.items")):
+        where = f"faq.items[{i}]"
+        _require(item, dict, where)
+        qas.append((_text(item, "q", where), _text(item, "a", where)))
+    if len(qas) > MAX_FAQ_ITEMS:
+        raise SpecError(f"faq.items: 質問は{MAX_FAQ_ITEMS}件までです（{len(qas)}件あります）")
+
+    contact = _require(spec.get("contact"), dict, "contact")
+    contact_items = []
+    for i, item in enumerate(_require(contact.get("items"), list, "contact.items")):
+        where = f"contact.items[{i}]"
+        _require(item, dict, where)
+        contact_items.append((_text(item, "label", where), _text(item, "value", where)))
+
+    return RenderPlan(
+        name=_text(spec, "name", "spec"),
+        industry=_text(spec, "industry", "spec"),
+        cover=CoverPlan(
+            catch=_text(cover, "catch", "cover"),
+            title=_text(cover, "title", "cover"),
+            subtitle=_text(cover, "subtitle", "cover"),
+            credentials=_text(cover, "credentials", "cover"),
+            prospect=prospect,
+        ),
+        problems=ProblemsPlan(
+            title=_text(problems, "title", "problems"),
+            items=_text_list(problems.get("items"), "problems.items"),
+            closing=_text(problems, "closing", "problems"),
+        ),
+        story=StoryPlan(
+            title=_text(story, "title", "story"),
+            heading=_text(story, "heading", "story"),
+            body=_text(story, "body", "story"),
+            results_title=_text(story, "results_title", "story"),
+            results=tuple(results),
+        ),
+        plans=PlansPlan(title=_text(plans, "title", "plans"), items=tuple(plan_items)),
+        comparison=ComparisonPlan(
+            title=_text(comparison, "title", "comparison"),
+            headers=headers,
+            rows=tuple(rows),
+            render=render,
+        ),
+        faq=FaqPlan(title=_text(faq, "title", "faq"), items=tuple(qas)),
+        contact=ContactPlan(
+            title=_text(contact, "title", "contact"),
+            items=tuple(contact_items),
+            closing=_text(contact, "closing", "contact"),
+        ),
+    )
+
+DEFAULT_PLAN = compile_spec({})
+
+# =============================================================================
+# 読み込み・キャッシュ
+# =============================================================================
+
+# (絶対パス, サイズ, 更新時刻) -> RenderPlan
+_loaded_specs = {}
+
+def parse_spec_text(text, path):
+    """拡張子に応じてJSON / YAMLを解析する"""
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise SpecError(f"{path}: YAMLの読み込みには PyYAML が必要です（pip install pyyaml）")
+        try:
+            return yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise SpecError(f"{path}: {e}") from e
+    return json.loads(text)
+
+def spec_cache_key(data):
+    """定義ファイルの内容・形式バージョン・既定値からキャッシュキーを作る"""
+    digest = hashlib.sha1()
+    digest.update(f"v{SPEC_FORMAT_VERSION}\0".encode("utf-8"))
+    digest.update(json.dumps(DEFAULT_SPEC, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    digest.update(data)
+    return digest.hexdigest()
+
+def load_spec(path, use_cache=True):
+    """デッキ定義ファイルを読み込んでRenderPlanを返す
+
+    同一プロセス内ではメモリ上に、プロセス間では CACHE_DIR/specs に
+    パース済みのプランをキャッシュする。
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    memo_key = (path, stat.st_size, stat.st_mtime_ns)
+    if use_cache and memo_key in _loaded_specs:
+        return _loaded_specs[memo_key]
+
+    with open(path, "rb") as f:
+        data = f.read()
+    cache_path = os.path.join(CACHE_DIR, "specs", f"{spec_cache_key(data)}.pickle")
+
+    plan = None
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                plan = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            plan = None
+
+    if plan is None:
+        try:
+            raw = parse_spec_text(data.decode("utf-8"), path)
+        except SpecError:
+            raise
+        except ValueError as e:
+            raise SpecError(f"{path}: {e}") from e
+        try:
+            plan = compile_spec(raw)
+        except SpecError as e:
+            raise SpecError(f"{path}: {e}") from e
+        if use_cache:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(plan, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+
+    _loaded_specs[memo_key] = plan
+    return plan
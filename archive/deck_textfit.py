@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+テキストの自動フィット
+フォントのメトリクスから文字列の幅・折り返し行数・高さを計測し、
+ボックスの高さやフォントサイズを決める
+
+フォントファイル（Noto Sans JP / Oswald）が見つかれば Pillow で実測し、
+見つからなければ全角1em・半角0.55em（Oswaldは0.45em）の近似値を使う。
+計測結果は (フォント, サイズ, 太字, 文字列) ごとに LRU キャッシュする。
+python-pptx には依存しない（長さはEMUの整数で扱う）。
+"""
+
+from functools import lru_cache
+import glob
+import os
+import unicodedata
+
+EMU_PER_INCH = 914400
+EMU_PER_PT = 12700
+
+# テキストボックスの既定の内側余白（bodyPr の lIns/rIns/tIns/bIns）
+INSET_X = 91440
+INSET_Y = 45720
+
+# 行の高さ（フォントサイズに対する倍率）
+LINE_SPACING = 1.2
+
+# フォントファイルの探索先（NOVALIS_FONT_DIR があれば最優先）
+FONT_DIRS = [
+    os.environ.get("NOVALIS_FONT_DIR", ""),
+    os.path.expanduser("~/Library/Fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+]
+
+# フォント名 -> (通常, 太字) のファイル名パターン
+FONT_FILE_PATTERNS = {
+    "Noto Sans JP": (("NotoSansJP-Regular.*", "NotoSansJP-VariableFont*", "NotoSansCJKjp-Regular.*"),
+                     ("NotoSansJP-Bold.*", "NotoSansJP-VariableFont*", "NotoSansCJKjp-Bold.*")),
+    "Oswald": (("Oswald-Regular.*", "Oswald-VariableFont*"),
+               ("Oswald-Bold.*", "Oswald-VariableFont*")),
+}
+
+# フォントファイルがない場合の半角文字の幅（em）
+FALLBACK_NARROW_EM = {"Oswald": 0.45}
+DEFAULT_NARROW_EM = 0.55
+FALLBACK_BOLD_FACTOR = 1.05
+
+# =============================================================================
+# フォント
+# =============================================================================
+
+@lru_cache(maxsize=None)
+def find_font_file(font_name, bold=False):
+    """フォントファイルのパスを返す（見つからなければNone）"""
+    patterns = FONT_FILE_PATTERNS.get(font_name)
+    if patterns is None:
+        return None
+    for directory in FONT_DIRS:
+        if not directory or not os.path.isdir(directory):
+            continue
+        for pattern in patterns[1 if bold else 0]:
+            matches = sorted(glob.glob(os.path.join(directory, "**", pattern), recursive=True))
+            if matches:
+                return matches[0]
+    return None
+
+@lru_cache(maxsize=64)
+def _truetype(path, size_px):
+    from PIL import ImageFont
+    return ImageFont.truetype(path, size_px)
+
+# 実測時のピクセルサイズ（1pt あたりの解像度を上げて丸め誤差を減らす）
+_MEASURE_PX_PER_PT = 8
+
+# =============================================================================
+# 計測
+# =============================================================================
+
+@lru_cache(maxsize=65536)
+def measure_width(text, font_name, size_pt, bold=False):
+    """1行の文字列の幅（EMU）"""
+    path = find_font_file(font_name, bold)
+    if path is not None:
+        try:
+            font = _truetype(path, int(size_pt * _MEASURE_PX_PER_PT))
+            return int(font.getlength(text) / _MEASURE_PX_PER_PT * EMU_PER_PT)
+        except (OSError, ImportError):
+            pass
+    narrow = FALLBACK_NARROW_EM.get(font_name, DEFAULT_NARROW_EM)
+    em = 0.0
+    for ch in text:
+        if unicodedata.east_asian_width(ch) in ("W", "F"):
+            em += 1.0
+        elif ch == " ":
+            em += 0.25
+        else:
+            em += narrow
+    if bold:
+        em *= FALLBACK_BOLD_FACTOR
+    return int(em * size_pt * EMU_PER_PT)
+
+def _break_points(line):
+    """折り返し候補の位置（半角の単語は途中で切らない）"""
+    points = []
+    for i, ch in enumerate(line[1:], start=1):
+        prev = line[i - 1]
+        if ch == " " or prev == " ":
+            points.append(i)
+        elif not (prev.isascii() and prev.isalnum() and ch.isascii() and ch.isalnum()):
+            points.append(i)
+    return points
+
+@lru_cache(maxsize=65536)
+def wrap_lines(text, font_name, size_pt, bold, max_width):
+    """max_width（EMU）で折り返したときの行のタプル（改行文字でも改行する）"""
+    lines = []
+    for paragraph in text.split("\n"):
+        rest = paragraph
+        while rest and measure_width(rest, font_name, size_pt, bold) > max_width:
+            cut = None
+            for point in _break_points(rest):
+                if measure_width(rest[:point], font_name, size_pt, bold) > max_width:
+                    break
+                cut = point
+            if cut is None:
+                # 1語でも収まらない場合は文字単位で切る
+                cut = 1
+                while cut < len(rest) and measure_width(rest[:cut + 1], font_name, size_pt, bold) <= max_width:
+                    cut += 1
+            lines.append(rest[:cut].rstrip())
+            rest = rest[cut:].lstrip(" ")
+        lines.append(rest)
+    return tuple(lines)
+
+def count_lines(text, font_name, size_pt, box_width, bold=False):
+    """テキストボックス（幅 box_width EMU）に入れたときの行数"""
+    return len(wrap_lines(text, font_name, size_pt, bold, box_width - 2 * INSET_X))
+
+def line_height(size_pt):
+    """1行の高さ（EMU）"""
+    return int(size_pt * LINE_SPACING * EMU_PER_PT)
+
+def text_height(text, font_name, size_pt, box_width, bold=False):
+    """テキストボックスに入れたときに必要な高さ（内側余白を含む、EMU）"""
+    return count_lines(text, font_name, size_pt, box_width, bold) * line_height(size_pt) + 2 * INSET_Y
+
+def fit_font_size(text, font_name, box_width, box_height, max_size, min_size, bold=False, step=0.5):
+    """ボックスに収まる最大のフォントサイズ（pt）。min_size でも溢れる場合は min_size"""
+    size = max_size
+    while size > min_size:
+        if text_height(text, font_name, size, box_width, bold) <= box_height:
+            return size
+        size -= step
+    return min_size
+
+def fit_line_size(text, font_name, box_width, max_size, min_size, bold=False, step=0.5):
+    """折り返さずに1行で収まる最大のフォントサイズ（pt）。min_size でも溢れる場合は min_size"""
+    size = max_size
+    while size > min_size:
+        if count_lines(text, font_name, size, box_width, bold) <= 1:
+            return size
+        size -= step
+    return min_size
+
+def cache_info():
+    """計測キャッシュの統計"""
+    return {
+        "measure_width": measure_width.cache_info()._asdict(),
+        "wrap_lines": wrap_lines.cache_info()._asdict(),
+    }
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+生成済みデッキのレイアウト検証
+テキストボックス同士の重なりと、スライドからはみ出した図形を検出する
+
+.pptx を zipfile と ElementTree で直接読むため python-pptx には依存しない。
+自動サイズ調整（spAutoFit）のテキストボックスは、deck_textfit で計測した
+実際のテキストの大きさで判定する。重なりの検出はスライドごとに
+左端でソートした平面走査（sweep line）で行い、走査中の図形は y 方向の
+バケットに分けて持つ。縦に同じ高さで重なりうる図形だけを調べるので、縦に
+積み重なった図形が多くても O(n log n + 重なりの数) に近い時間で済む。
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+import argparse
+import heapq
+import json
+import os
+import posixpath
+import sys
+import xml.etree.ElementTree as ET
+import zipfile
+
+import deck_textfit
+
+NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+
+# 重なり・はみ出しとみなす最小の幅（0.05インチ、これ以下は誤差として無視）
+TOLERANCE = 45720
+
+# rPr に sz がない場合のフォントサイズ（pt、PowerPoint の既定値）
+DEFAULT_FONT_SIZE = 18
+
+# 重なりの検出で走査中の図形を分ける y 方向のバケットの高さ（0.25インチ）
+BUCKET_HEIGHT = 228600
+
+# 書体の指定がない場合に計測に使うフォント
+BODY_FONT = "Noto Sans JP"
+
+def _tag(prefix, name):
+    return f"{{{NS[prefix]}}}{name}"
+
+# =============================================================================
+# 図形の読み込み
+# =============================================================================
+
+@dataclass(frozen=True)
+class ShapeBox:
+    """スライド上の図形の外接矩形（EMU）"""
+    slide: int
+    shape_id: str
+    name: str
+    left: int
+    top: int
+    width: int
+    height: int
+    text: str = ""
+
+    @property
+    def right(self):
+        return self.left + self.width
+
+    @property
+    def bottom(self):
+        return self.top + self.height
+
+@dataclass(frozen=True)
+class Issue:
+    """検証で見つかった問題"""
+    kind: str       # "collision" / "out_of_bounds"
+    slide: int
+    shapes: tuple   # 図形名のタプル
+    detail: str
+
+    def to_dict(self):
+        return {"kind": self.kind, "slide": self.slide, "shapes": list(self.shapes), "detail": self.detail}
+
+def _paragraph_font(paragraph, font_size):
+    """段落のフォント名・サイズ（pt）・太字（最初のランの書式を使う）"""
+    rpr = paragraph.find("a:r/a:rPr", NS)
+    if rpr is None:
+        rpr = paragraph.find("a:endParaRPr", NS)
+    if rpr is None:
+        return BODY_FONT, font_size, False
+    size = rpr.get("sz")
+    font_size = int(size) / 100 if size else font_size
+    latin = rpr.find("a:latin", NS)
+    font_name = latin.get("typeface") if latin is not None else None
+    return font_name or BODY_FONT, font_size, rpr.get("b") in ("1", "true")
+
+def _spacing_emu(paragraph, name):
+    """段落前後の間隔（spcBef / spcAft の spcPts、EMU）"""
+    pts = paragraph.find(f"a:pPr/a:{name}/a:spcPts", NS)
+    return int(pts.get("val")) * deck_textfit.EMU_PER_PT // 100 if pts is not None else 0
+
+def text_extent(tx_body, box_width):
+    """テキスト本体の (幅, 高さ) を計測（EMU、内側余白を含む）"""
+    body_pr = tx_body.find("a:bodyPr", NS)
+    wrap = body_pr is None or body_pr.get("wrap") != "none"
+    width = height = 0
+    font_size = DEFAULT_FONT_SIZE
+    for paragraph in tx_body.findall("a:p", NS):
+        text = "".join(t.text or "" for t in paragraph.iter(_tag("a", "t")))
+        font_name, font_size, bold = _paragraph_font(paragraph, font_size)
+        if wrap:
+            lines = deck_textfit.count_lines(text, font_name, font_size, box_width, bold)
+        else:
+            lines = text.count("\n") + 1
+            for line in text.split("\n"):
+                width = max(width, deck_textfit.measure_width(line, font_name, font_size, bold))
+        height += (lines * deck_textfit.line_height(font_size)
+                   + _spacing_emu(paragraph, "spcBef") + _spacing_emu(paragraph, "spcAft"))
+    return width + 2 * deck_textfit.INSET_X, height + 2 * deck_textfit.INSET_Y
+
+def _shape_boxes(tree, slide_number, transform=None):
+    """spTree（またはグループ）の図形を ShapeBox にして返す"""
+    boxes = []
+    for shape in tree:
+        kind = shape.tag.rsplit("}", 1)[-1]
+        if kind not in ("sp", "pic", "cxnSp", "graphicFrame", "grpSp"):
+            continue
+        c_nv_pr = shape.find("*/p:cNvPr", NS)
+        xfrm = shape.find("*/a:xfrm", NS) if kind != "graphicFrame" else shape.find("p:xfrm", NS)
+        if xfrm is None or xfrm.find("a:off", NS) is None:
+            continue
+        off, ext = xfrm.find("a:off", NS), xfrm.find("a:ext", NS)
+        left, top = int(off.get("x")), int(off.get("y"))
+        width, height = int(ext.get("cx")), int(ext.get("cy"))
+        if transform is not None:
+            left, top, width, height = transform(left, top, width, height)
+
+        if kind == "grpSp":
+            boxes.extend(_shape_boxes(shape, slide_number, _group_transform(xfrm, left, top, width, height)))
+            continue
+
+        text = ""
+        tx_body = shape.find("p:txBody", NS)
+        if tx_body is not None:
+            text = "\n".join(
+                "".join(t.text or "" for t in p.iter(_tag("a", "t"))) for p in tx_body.findall("a:p", NS)
+            ).strip()
+        if text and tx_body.find("a:bodyPr/a:spAutoFit", NS) is not None:
+            # 自動サイズ調整のボックスはテキストに合わせて伸縮する
+            text_width, text_height = text_extent(tx_body, width)
+            width = max(width, text_width)
+            height = text_height
+
+        boxes.append(ShapeBox(
+            slide=slide_number,
+            shape_id=c_nv_pr.get("id") if c_nv_pr is not None else "",
+            name=c_nv_pr.get("name") if c_nv_pr is not None else kind,
+            left=left, top=top, width=width, height=height, text=text,
+        ))
+    return boxes
+
+def _group_transform(xfrm, left, top, width, height):
+    """グループ内の子座標をスライド座標に変換する関数"""
+    ch_off, ch_ext = xfrm.find("a:chOff", NS), xfrm.find("a:chExt", NS)
+    if ch_off is None or ch_ext is None:
+        return None
+    cx, cy = int(ch_off.get("x")), int(ch_off.get("y"))
+    sx = width / int(ch_ext.get("cx")) if int(ch_ext.get("cx")) else 1.0
+    sy = height / int(ch_ext.get("cy")) if int(ch_ext.get("cy")) else 1.0
+
+    def transform(l, t, w, h):
+        return (int(left + (l - cx) * sx), int(top + (t - cy) * sy), int(w * sx), int(h * sy))
+    return transform
+
+def slide_part_names(zf):
+    """スライドのパート名（表示順）"""
+    presentation = ET.fromstring(zf.read("ppt/presentation.xml"))
+    rels = ET.fromstring(zf.read("ppt/_rels/presentation.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.findall("rel:Relationship", NS)}
+    names = []
+    for sld_id in presentation.findall("p:sldIdLst/p:sldId", NS):
+        target = targets[sld_id.get(_tag("r", "id"))]
+        names.append(posixpath.normpath(posixpath.join("ppt", target)).lstrip("/"))
+    return names
+
+def slide_size(zf):
+    """スライドの (幅, 高さ)（EMU）"""
+    sld_sz = ET.fromstring(zf.read("ppt/presentation.xml")).find("p:sldSz", NS)
+    return int(sld_sz.get("cx")), int(sld_sz.get("cy"))
+
+def read_deck(path):
+    """デッキを読み込み、(スライドの幅, 高さ, スライドごとの ShapeBox のリスト) を返す"""
+    with zipfile.ZipFile(path) as zf:
+        width, height = slide_size(zf)
+        slides = []
+        for number, name in enumerate(slide_part_names(zf), start=1):
+            slides.append(list(slide_boxes(zf.read(name), number)))
+    return width, height, slides
+
+@lru_cache(maxsize=4096)
+def slide_boxes(xml, slide_number):
+    """スライドXMLの図形一覧（同じXMLのスライドが多いバッチ出力向けにキャッシュ）"""
+    sp_tree = ET.fromstring(xml).find("p:cSld/p:spTree", NS)
+    return tuple(_shape_boxes(sp_tree, slide_number)) if sp_tree is not None else ()
+
+# =============================================================================
+# 検証
+# =============================================================================
+
+def _buckets(box):
+    """図形が縦にまたがる y 方向のバケットの番号"""
+    first = box.top // BUCKET_HEIGHT
+    return range(first, max(first, (box.bottom - 1) // BUCKET_HEIGHT) + 1)
+
+def find_collisions(boxes, tolerance=TOLERANCE):
+    """テキストを持つ図形同士の重なりを平面走査で検出し、(図形, 図形, 重なり幅, 重なり高さ) を返す"""
+    texts = sorted((box for box in boxes if box.text), key=lambda box: box.left)
+    active = []    # (右端, 通し番号, 図形) のヒープ
+    buckets = {}   # y 方向のバケット -> {通し番号: 図形}（走査中の図形のみ）
+    collisions = []
+    for index, box in enumerate(texts):
+        # 左端より手前で終わっている図形は以降も重ならない
+        while active and active[0][0] <= box.left + tolerance:
+            _, old_index, old = heapq.heappop(active)
+            for bucket in _buckets(old):
+                members = buckets[bucket]
+                del members[old_index]
+                if not members:
+                    del buckets[bucket]
+        # 縦の範囲が同じバケットにかかる図形だけを調べる
+        candidates = {}
+        for bucket in _buckets(box):
+            candidates.update(buckets.get(bucket, {}))
+        for _, other in sorted(candidates.items()):
+            overlap_x = min(other.right, box.right) - box.left
+            overlap_y = min(other.bottom, box.bottom) - max(other.top, box.top)
+            if overlap_x > tolerance and overlap_y > tolerance:
+                collisions.append((other, box, overlap_x, overlap_y))
+        heapq.heappush(active, (box.right, index, box))
+        for bucket in _buckets(box):
+            buckets.setdefault(bucket, {})[index] = box
+    return collisions
+
+def find_out_of_bounds(boxes, slide_width, slide_height, tolerance=TOLERANCE):
+    """スライドからはみ出した図形を返す"""
+    return [
+        box for box in boxes
+        if box.left < -tolerance or box.top < -tolerance
+        or box.right > slide_width + tolerance or box.bottom > slide_height + tolerance
+    ]
+
+def _inches(emu):
+    return f"{emu / deck_textfit.EMU_PER_INCH:.2f}in"
+
+def validate_deck(path, tolerance=TOLERANCE):
+    """デッキを検証して Issue のリストを返す（path はファイルパスまたはファイルオブジェクト）"""
+    slide_width, slide_height, slides = read_deck(path)
+    issues = []
+    for number, boxes in enumerate(slides, start=1):
+        for a, b, overlap_x, overlap_y in find_collisions(boxes, tolerance):
+            issues.append(Issue(
+                "collision", number, (a.name, b.name),
+                f"{_inches(overlap_x)} x {_inches(overlap_y)} 重なっています（{a.text[:20]!r} / {b.text[:20]!r}）",
+            ))
+        for box in find_out_of_bounds(boxes, slide_width, slide_height, tolerance):
+            issues.append(Issue(
+                "out_of_bounds", number, (box.name,),
+                f"({_inches(box.left)}, {_inches(box.top)})-({_inches(box.right)}, {_inches(box.bottom)}) が"
+                f"スライド {_inches(slide_width)} x {_inches(slide_height)} の外に出ています",
+            ))
+    return issues
+
+def _validate_job(path, tolerance):
+    try:
+        return path, [issue.to_dict() for issue in validate_deck(path, tolerance)], None
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+        return path, [], f"{type(e).__name__}: {e}"
+
+def validate_decks(paths, tolerance=TOLERANCE, workers=None):
+    """複数のデッキを並列に検証し、{パス: {"issues": [...], "error": ...}} を返す（入力順）"""
+    if workers == 1 or len(paths) <= 1:
+        results = [_validate_job(path, tolerance) for path in paths]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_validate_job, paths, [tolerance] * len(paths), chunksize=16))
+    return {path: {"issues": issues, "error": error} for path, issues, error in results}
+
+def expand_paths(paths):
+    """ディレクトリは配下の .pptx に展開する"""
+    expanded = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                expanded.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".pptx"))
+        else:
+            expanded.append(path)
+    return expanded
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成済みデッキのレイアウト検証（重なり・はみ出し）")
+    parser.add_argument("paths", nargs="+", help=".pptx ファイルまたはディレクトリ")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE / deck_textfit.EMU_PER_INCH,
+                        help="無視する重なり・はみ出しの幅（インチ）")
+    parser.add_argument("--workers", type=int, default=None, help="並列数（既定: CPU数）")
+    parser.add_argument("--json", metavar="PATH", help="結果をJSONで保存（- なら標準出力）")
+    args = parser.parse_args(argv)
+
+    paths = expand_paths(args.paths)
+    results = validate_decks(paths, int(args.tolerance * deck_textfit.EMU_PER_INCH), args.workers)
+    failed = sum(1 for result in results.values() if result["issues"] or result["error"])
+
+    if args.json == "-":
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for path, result in results.items():
+            if result["error"]:
+                print(f"{path}: 読み込み失敗 {result['error']}")
+            for issue in result["issues"]:
+                print(f"{path}: slide {issue['slide']} {issue['kind']} {' / '.join(issue['shapes'])}: {issue['detail']}")
+        print(f"{len(paths)} 件中 {failed} 件に問題があります" if failed else f"{len(paths)} 件すべて問題なし")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
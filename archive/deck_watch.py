@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+ウォッチモード
+デッキ定義（JSON / YAML）・バッチ定義・ロゴを監視し、変更されたファイルに
+依存するデッキだけを作り直す
+
+    python deck_watch.py specs --out-dir out
+    python deck_watch.py --batch jobs.json --out-dir out --validate
+
+依存関係は2段で追う。
+
+    ファイル → デッキ    どのデッキがどのデッキ定義・バッチ定義を読むか（ロゴは全デッキ）
+    デッキ → スライド    スライドごとのキャッシュキー（SLIDE_INPUTS の項目から作る）
+
+変更されたファイルに依存するデッキだけを読み直し、スライドのキーが1つでも
+変わっていれば作り直す。作り直すときも、キーが変わっていないスライドは
+メモリ上のキャッシュから復元するので、1か所の修正なら作成は1〜2枚で済む。
+
+監視はポーリング（既定 0.2 秒ごとに mtime とサイズを比較）。inotify は標準
+ライブラリにないため使わない。作成処理（*.py）の変更は反映しない（再起動が必要）。
+"""
+
+from dataclasses import dataclass
+import argparse
+import os
+import time
+
+import create_slides
+import deck_validate
+import deck_zip
+from deck_spec import SpecError
+
+SPEC_SUFFIXES = (".json", ".yaml", ".yml")
+
+WATCH_INTERVAL = 0.2
+
+# メモリに残すスライドの数（業種別デッキが数百件あっても全スライドが収まる程度）
+WATCH_SLIDE_CACHE_ENTRIES = 4096
+
+def file_stamp(path):
+    """変更の検出に使う (mtime_ns, サイズ)。ファイルがなければ None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def list_specs(directory):
+    """ディレクトリ内のデッキ定義のパス（ファイル名順）"""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return [os.path.join(directory, name) for name in sorted(names) if name.endswith(SPEC_SUFFIXES)]
+
+def slide_sequence():
+    """デッキのスライドの (表示名, 作成関数) の一覧（build_presentation と同じ順）"""
+    return [("表紙", create_slides.create_cover_slide)] + create_slides.CONTENT_SLIDES
+
+def slide_keys(plan, use_template, backend):
+    """作成関数名 -> スライドのキャッシュキー"""
+    return {
+        create_slide.__name__: create_slides.slide_cache_key(create_slide, plan, use_template, backend)
+        for _, create_slide in slide_sequence()
+    }
+
+# =============================================================================
+# 作り直しの結果
+# =============================================================================
+
+@dataclass(frozen=True)
+class WatchResult:
+    """1デッキ分の作り直しの結果"""
+    deck: str            # デッキID（デッキ定義のパス、バッチなら "バッチ定義#name"）
+    name: str
+    output: str
+    ok: bool
+    changed: tuple = None  # 入力が変わったスライドの表示名（初回の作成なら None）
+    built: int = 0       # 作成したスライドの数
+    reused: int = 0      # キャッシュから復元したスライドの数
+    seconds: float = 0.0
+    error: str = None
+    issues: tuple = ()   # レイアウト検証の結果（validate のときだけ）
+
+def print_watch_result(result):
+    stamp = time.strftime("%H:%M:%S")
+    if not result.ok:
+        print(f"[{stamp}] NG {result.name}: {result.error}", flush=True)
+        return
+    if result.changed is None:
+        changed = "初回"
+    else:
+        changed = "変更: " + ("、".join(result.changed) if result.changed else "なし")
+    print(f"[{stamp}] OK {result.name}（{changed}、作成 {result.built} 枚・再利用 {result.reused} 枚、"
+          f"{result.seconds:.2f}s）-> {result.output}", flush=True)
+    for issue in result.issues:
+        print(f"  レイアウト警告: slide {issue['slide']} {issue['kind']} "
+              f"{' / '.join(issue['shapes'])}: {issue['detail']}", flush=True)
+
+# =============================================================================
+# 監視
+# =============================================================================
+
+class DeckWatcher:
+    """監視するファイルとデッキの依存関係を持ち、変更された分だけ作り直す
+
+    paths はデッキ定義のファイルかディレクトリ（ディレクトリなら中のデッキ定義を
+    すべて、追加・削除も追う）、batches はバッチ定義（JSON配列）のパス。
+    デッキ定義は out_dir/<name>.pptx に、バッチのジョブは output（なければ
+    out_dir/<name>.pptx）に保存する。
+    """
+
+    def __init__(self, paths=(), batches=(), out_dir=".", use_template=True,
+                 backend=create_slides.DEFAULT_BACKEND, save_options=None, validate=False):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.batches = [os.path.abspath(path) for path in batches]
+        self.out_dir = out_dir
+        self.use_template = use_template
+        self.backend = backend
+        self.save_options = save_options
+        self.validate = validate
+        self.slide_cache = create_slides.MemorySlideCache(max_entries=WATCH_SLIDE_CACHE_ENTRIES)
+        self._stamps = {}      # 監視中のファイル -> file_stamp
+        self._jobs = {}        # デッキID -> ジョブ
+        self._batch_jobs = {}  # バッチ定義 -> 前回読み込めたジョブの一覧
+        self._dependents = {}  # ファイル -> そのファイルを読むデッキIDの集合
+        self._built = {}       # デッキID -> 前回作成したときの (出力先, スライドキー)
+
+    def watched_files(self):
+        """監視するファイルの一覧"""
+        files = set(self._dependents)
+        files.update(self.batches)
+        for path in self.paths:
+            files.update(list_specs(path) if os.path.isdir(path) else [path])
+        files.add(create_slides.LOGO_PATH)
+        return files
+
+    def discover_jobs(self):
+        """監視対象からジョブを集める
+
+        {デッキID: (ジョブ, そのデッキが読むファイルの一覧)} を見つけた順に返す
+        （ロゴは全デッキ共通なので含めない）。
+        """
+        jobs = {}
+        for path in self.paths:
+            for spec in (list_specs(path) if os.path.isdir(path) else [path]):
+                jobs[spec] = ({"spec": spec}, [spec])
+        for batch in self.batches:
+            try:
+                self._batch_jobs[batch] = create_slides.load_batch_jobs(batch, self.out_dir)
+            except (OSError, ValueError) as e:
+                # 書きかけのバッチ定義は前回読み込めた内容のまま監視を続ける
+                print(f"バッチ定義を読み込めません: {e}")
+            for job in self._batch_jobs.get(batch, ()):
+                inputs = [batch, job["spec"]] if job.get("spec") else [batch]
+                jobs[f"{batch}#{job['name']}"] = (job, inputs)
+        return jobs
+
+    def poll(self):
+        """ファイルの変更を調べ、依存するデッキを作り直して結果の一覧を返す"""
+        stamps = {path: file_stamp(path) for path in self.watched_files()}
+        changed = {path for path in stamps.keys() | self._stamps.keys() if stamps.get(path) != self._stamps.get(path)}
+        self._stamps = stamps
+        if not changed:
+            return []
+        return self.update(changed)
+
+    def update(self, changed):
+        """changed（変更されたファイルの集合）に依存するデッキを作り直す"""
+        assets_changed = create_slides.LOGO_PATH in changed
+        if assets_changed:
+            # 読み込み済みのロゴを捨てる（スライド・テンプレートのキーはロゴの mtime で変わる）
+            create_slides.clear_image_assets()
+
+        discovered = self.discover_jobs()
+        for deck in self._jobs.keys() - discovered.keys():
+            self._built.pop(deck, None)
+            print(f"監視対象から外れました: {deck}")
+        jobs = self._jobs = {deck: job for deck, (job, _) in discovered.items()}
+        self._dependents = {}
+        for deck, (_, inputs) in discovered.items():
+            for path in inputs:
+                self._dependents.setdefault(path, set()).add(deck)
+
+        affected = set(jobs) - set(self._built) if not assets_changed else set(jobs)
+        for path in changed:
+            affected.update(self._dependents.get(path, ()))
+        results = []
+        for deck in jobs:
+            if deck in affected:
+                result = self.rebuild(deck)
+                if result is not None:
+                    results.append(result)
+        return results
+
+    def rebuild(self, deck):
+        """デッキを読み直し、スライドのキーが変わっていれば作り直す（変更がなければ None）"""
+        job = self._jobs[deck]
+        started = time.perf_counter()
+        try:
+            plan = create_slides.job_plan(job)
+        except (OSError, SpecError) as e:
+            # 前回作成した内容はそのまま（直して保存すれば作り直す）
+            self._built.setdefault(deck, None)
+            return WatchResult(deck, job.get("name") or os.path.basename(deck), None, False, error=str(e))
+        name = job.get("name") or plan.name
+        output = create_slides.resolve_output_path(dict(job, name=name), self.out_dir)
+        keys = slide_keys(plan, self.use_template, self.backend)
+        previous = self._built.get(deck)
+        if previous == (output, keys) and os.path.exists(output):
+            return None
+
+        changed = None
+        if previous is not None:
+            changed = tuple(label for label, create_slide in slide_sequence()
+                            if previous[1][create_slide.__name__] != keys[create_slide.__name__])
+        hits, misses = self.slide_cache.hits, self.slide_cache.misses
+        try:
+            os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+            prs = create_slides.build_presentation(plan, use_template=self.use_template,
+                                                   slide_cache=self.slide_cache, backend=self.backend)
+            create_slides.save_presentation(prs, output, deck=plan.name, options=self.save_options)
+        except Exception as e:
+            self._built.setdefault(deck, None)
+            return WatchResult(deck, name, output, False, error=f"{type(e).__name__}: {e}")
+        self._built[deck] = (output, keys)
+        seconds = time.perf_counter() - started
+        issues = tuple(issue.to_dict() for issue in deck_validate.validate_deck(output)) if self.validate else ()
+        return WatchResult(
+            deck, name, output, True, changed=changed,
+            built=self.slide_cache.misses - misses, reused=self.slide_cache.hits - hits,
+            seconds=seconds, issues=issues,
+        )
+
+    def run(self, interval=WATCH_INTERVAL, once=False):
+        """変更を待って作り直すのを繰り返す（once なら初回の作成だけして、失敗した件数を返す）"""
+        results = self.poll()
+        for result in results:
+            print_watch_result(result)
+        if once:
+            return sum(not result.ok for result in results)
+        print(f"監視中（{interval:g} 秒ごと、Ctrl+C で終了）...", flush=True)
+        while True:
+            time.sleep(interval)
+            for result in self.poll():
+                print_watch_result(result)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="デッキ定義・ロゴの変更を監視して、影響するデッキだけを作り直す")
+    parser.add_argument("paths", nargs="*", help=f"デッキ定義（JSON / YAML）またはそのディレクトリ"
+                                                 f"（既定: --batch がなければ {create_slides.SPECS_DIR}）")
+    parser.add_argument("--batch", action="append", default=[], metavar="JOBS_JSON",
+                        help="バッチ定義（JSON配列）も監視する（複数指定可）")
+    parser.add_argument("--out-dir", default=".", help="出力ディレクトリ")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="変更を調べる間隔（秒）")
+    parser.add_argument("--once", action="store_true", help="初回の作成だけして終了")
+    parser.add_argument("--no-template", action="store_true",
+                        help="キャッシュ済みテンプレートを使わず、ヘッダー類をスライドごとに作成")
+    parser.add_argument("--backend", choices=create_slides.BACKENDS, default=create_slides.DEFAULT_BACKEND,
+                        help="描画バックエンド")
+    parser.add_argument("--compression", choices=list(deck_zip.COMPRESSION_LEVELS), default="fast",
+                        help="保存時の圧縮レベル（既定: fast、作り直しの待ち時間を短くする）")
+    parser.add_argument("--validate", action="store_true",
+                        help="作り直すたびにテキストの重なり・スライド外へのはみ出しを検証")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or ([] if args.batch else [create_slides.SPECS_DIR])
+    watcher = DeckWatcher(
+        paths, args.batch, args.out_dir, use_template=not args.no_template, backend=args.backend,
+        save_options=create_slides.SaveOptions(args.compression), validate=args.validate,
+    )
+    try:
+        failed = watcher.run(args.interval, once=args.once)
+    except KeyboardInterrupt:
+        print("\n監視を終了しました")
+        return 0
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
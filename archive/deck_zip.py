@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+デッキ（.pptx）の zip 書き出し
+圧縮レベルの選択・圧縮済みメディアの無圧縮格納・圧縮結果の再利用を行う
+
+    fast     zlib レベル1（保存が速い、ファイルは少し大きい）
+    default  zlib の既定（python-pptx の prs.save と同じ）
+    small    zlib レベル9（ファイルが小さい、保存は遅い）
+
+PNG / JPEG などはもともと圧縮されているため、store_media=True なら
+deflate せずにそのまま格納する（サイズはほぼ変わらず、圧縮の時間がなくなる）。
+
+MediaStore は部品の内容のハッシュをキーに圧縮済みのデータを覚えておく
+（content-addressed）。バッチで全デッキに入るロゴ・テーマ・レイアウト等は
+最初の1回だけ圧縮し、以降はそのバイト列をそのまま書き込む。
+
+zipfile には圧縮済みのデータを書き込むAPIがないため、書き出しは
+ここで直接行う（ZIP64 は使わない。デッキの大きさなら不要）。
+"""
+
+from dataclasses import dataclass
+import hashlib
+import os
+import struct
+import time
+import zlib
+
+COMPRESSION_LEVELS = {"fast": 1, "default": zlib.Z_DEFAULT_COMPRESSION, "small": 9}
+
+# 圧縮済みの形式（deflate しても小さくならない）
+PRECOMPRESSED_EXTENSIONS = frozenset((
+    ".png", ".jpg", ".jpeg", ".gif", ".tif", ".tiff", ".webp",
+    ".mp3", ".m4a", ".mp4", ".mov", ".wmv", ".zip",
+))
+
+METHOD_STORED = 0
+METHOD_DEFLATED = 8
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+
+def is_precompressed(name):
+    """もともと圧縮されている形式か（拡張子で判定）"""
+    return os.path.splitext(name)[1].lower() in PRECOMPRESSED_EXTENSIONS
+
+def compress(data, method, level):
+    """zip の1メンバー分のデータを (CRC32, 格納するバイト列) にする"""
+    crc = zlib.crc32(data)
+    if method == METHOD_STORED:
+        return crc, data
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return crc, compressor.compress(data) + compressor.flush()
+
+# =============================================================================
+# 圧縮結果の再利用
+# =============================================================================
+
+class MediaStore:
+    """内容のハッシュをキーに圧縮済みのデータを再利用する
+
+    同一プロセス内ではメモリ上に、directory を指定するとプロセス間でも
+    （バッチのワーカー同士・実行をまたいで）ファイルとして共有する。
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._memory = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def compressed(self, data, method, level):
+        """data を圧縮した (CRC32, バイト列) を返す（同じ内容なら圧縮しない）"""
+        key = f"{hashlib.sha256(data).hexdigest()}-{method}-{level}"
+        cached = self._memory.get(key)
+        if cached is None and self.directory:
+            try:
+                with open(self._path(key), "rb") as f:
+                    cached = (zlib.crc32(data), f.read())
+            except OSError:
+                pass
+        if cached is not None:
+            self.hits += 1
+            self._memory[key] = cached
+            return cached
+        self.misses += 1
+        cached = self._memory[key] = compress(data, method, level)
+        if self.directory:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(cached[1])
+            os.replace(tmp_path, path)
+        return cached
+
+# =============================================================================
+# zip の書き出し
+# =============================================================================
+
+@dataclass(frozen=True)
+class _Member:
+    name: bytes
+    flags: int
+    method: int
+    dos_time: int
+    dos_date: int
+    crc: int
+    compressed_size: int
+    size: int
+    offset: int
+
+def _dos_datetime(timestamp):
+    t = time.localtime(timestamp)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = (max(t.tm_year, 1980) - 1980) << 9 | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+class ZipWriter:
+    """メンバーを順に書き出す zip ライター
+
+    compression は COMPRESSION_LEVELS のキー。store_media=True なら圧縮済みの
+    形式は無圧縮で格納する。media_store（MediaStore）を渡すと、write(reuse=True)
+    のメンバーは圧縮結果を再利用する。
+    """
+
+    def __init__(self, file, compression="default", store_media=False, media_store=None):
+        if compression not in COMPRESSION_LEVELS:
+            raise ValueError(f"圧縮レベルは {' / '.join(COMPRESSION_LEVELS)} のいずれかです: {compression}")
+        self._file = open(file, "wb") if isinstance(file, (str, os.PathLike)) else file
+        self._owns_file = self._file is not file
+        self.level = COMPRESSION_LEVELS[compression]
+        self.store_media = store_media
+        self.media_store = media_store
+        self._members = []
+        self._offset = 0
+        self._dos_time, self._dos_date = _dos_datetime(time.time())
+
+    def write(self, name, data, reuse=False):
+        """メンバーを1つ書き出す"""
+        method = METHOD_STORED if self.store_media and is_precompressed(name) else METHOD_DEFLATED
+        if reuse and self.media_store is not None:
+            crc, payload = self.media_store.compressed(data, method, self.level)
+        else:
+            crc, payload = compress(data, method, self.level)
+        encoded = name.encode("utf-8")
+        flags = 0x800 if not name.isascii() else 0
+        member = _Member(encoded, flags, method, self._dos_time, self._dos_date,
+                         crc, len(payload), len(data), self._offset)
+        header = _LOCAL_HEADER.pack(
+            b"PK\x03\x04", 20, 0, flags, method, member.dos_time, member.dos_date,
+            crc, member.compressed_size, member.size, len(encoded), 0,
+        )
+        self._file.write(header)
+        self._file.write(encoded)
+        self._file.write(payload)
+        self._offset += len(header) + len(encoded) + len(payload)
+        self._members.append(member)
+
+    def close(self):
+        """セントラルディレクトリを書き出して閉じる"""
+        start = self._offset
+        for m in self._members:
+            record = _CENTRAL_HEADER.pack(
+                b"PK\x01\x02", 20, 3, 20, 0, m.flags, m.method, m.dos_time, m.dos_date,
+                m.crc, m.compressed_size, m.size, len(m.name), 0, 0, 0, 0, 0o100644 << 16, m.offset,
+            )
+            self._file.write(record)
+            self._file.write(m.name)
+            self._offset += len(record) + len(m.name)
+        self._file.write(_END_RECORD.pack(
+            b"PK\x05\x06", 0, 0, len(self._members), len(self._members), self._offset - start, start, 0,
+        ))
+        if self._owns_file:
+            self._file.close()
+
+    def abort(self):
+        """書きかけのまま閉じる（削除は呼び出し側）"""
+        if self._owns_file:
+            self._file.close()
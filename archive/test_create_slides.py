@@ -0,0 +1,160 @@
+"""
+create_slides の回帰テスト
+
+    python -m pytest -q test_create_slides.py
+"""
+
+import dataclasses
+import json
+import os
+import time
+
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+import create_slides
+import deck_ir
+from deck_layout import Box
+from deck_spec import MAX_COMPARISON_COLUMNS, MIN_COMPARISON_COLUMNS, SpecError, compile_spec, load_spec
+
+SPECS = [os.path.join(create_slides.SPECS_DIR, "介護.json")]
+
+def plans():
+    """既定のデッキと業種別のデッキ定義"""
+    return [create_slides.DEFAULT_PLAN] + [load_spec(path, use_cache=False) for path in SPECS]
+
+# =============================================================================
+# 並列作成（user-010）
+# =============================================================================
+
+@pytest.mark.parametrize("use_template", [True, False])
+@pytest.mark.parametrize("plan", plans(), ids=lambda plan: plan.name)
+def test_parallel_build_matches_serial(plan, use_template):
+    """スライドを並列に作っても、全パートが逐次作成とバイト単位で一致する"""
+    assert create_slides.verify_parallel_build(plan, use_template=use_template, workers=2) == []
+
+# =============================================================================
+# 描画バックエンド（user-018）
+# =============================================================================
+
+@pytest.mark.parametrize("use_template", [True, False])
+@pytest.mark.parametrize("plan", plans(), ids=lambda plan: plan.name)
+def test_backends_build_same_structure(plan, use_template):
+    """xml / pptx バックエンドのデッキが、全パートでXMLの構造まで一致する"""
+    assert create_slides.compare_backends(plan, use_template=use_template) == {}
+
+def test_xml_differences_ignores_serialization_only():
+    """属性の順序・空要素の書き方の違いは無視し、値の違いは報告する"""
+    assert deck_ir.xml_differences(b'<a x="1" y="2"><b/></a>', b'<a y="2" x="1"><b></b></a>') == []
+    assert deck_ir.xml_differences(b'<a x="1"><b>t</b></a>', b'<a x="2"><b>t</b></a>')
+    assert deck_ir.xml_differences(b'<a><b>t</b></a>', b'<a><b>u</b></a>')
+
+# =============================================================================
+# 比較表（user-004）
+# =============================================================================
+
+@pytest.mark.parametrize("count", range(MIN_COMPARISON_COLUMNS, MAX_COMPARISON_COLUMNS + 1))
+def test_comparison_columns_fill_table_width(count):
+    """比較表の列幅は列数から決まり、合計は表の幅になる"""
+    area = Box(Inches(0.6), Inches(1.85), Inches(12.1), Inches(0.48))
+    widths = create_slides.comparison_column_widths(count, area)
+    assert len(widths) == count
+    assert sum(widths) == area.width
+
+def test_comparison_rejects_too_many_columns():
+    headers = ["項目"] + [f"プラン{i}" for i in range(MAX_COMPARISON_COLUMNS)]
+    with pytest.raises(SpecError, match="comparison.headers"):
+        compile_spec({"comparison": {"headers": headers, "rows": [headers]}})
+
+# =============================================================================
+# 差し込み生成（user-023）
+# =============================================================================
+
+def test_rows_with_duplicate_names_get_separate_outputs(tmp_path):
+    """同じ名前の行も別のファイルに保存され、どのデッキも開ける"""
+    rows = [{"name": "A社"}, {"name": "B社"}, {"name": "A社"}, {"name": "a社"}]
+    summary = create_slides.render_rows(create_slides.iter_row_jobs(rows), str(tmp_path), workers=2)
+    assert summary["succeeded"] == len(rows)
+    outputs = sorted(path.name for path in tmp_path.iterdir())
+    assert outputs == ["A社-000003.pptx", "A社.pptx", "B社.pptx", "a社-000004.pptx"]
+    for name in outputs:
+        assert len(Presentation(str(tmp_path / name)).slides) == len(create_slides.CONTENT_SLIDES) + 1
+
+# =============================================================================
+# バッチ生成（user-001）
+# =============================================================================
+
+@pytest.mark.parametrize("jobs", [
+    [{"name": "A社"}, {"name": "A社"}],
+    [{"name": "A社"}, {"name": "B社", "output": "A社.pptx"}],
+    [{"name": "A社", "output": "out/x.pptx"}, {"name": "B社", "output": "out/X.pptx"}],
+], ids=["name", "name-output", "output-case"])
+def test_batch_rejects_jobs_with_same_output(tmp_path, jobs):
+    """出力先が重なるジョブは、読み込みの時点でも生成の前でも拒否する"""
+    batch = tmp_path / "jobs.json"
+    batch.write_text(json.dumps(jobs, ensure_ascii=False), encoding="utf-8")
+    with pytest.raises(ValueError, match="出力先が同じです"):
+        create_slides.load_batch_jobs(str(batch), str(tmp_path))
+    with pytest.raises(ValueError, match="出力先が同じです"):
+        create_slides.render_batch(jobs, str(tmp_path), workers=1)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["jobs.json"]
+
+# =============================================================================
+# 業種別バリアント（user-016）
+# =============================================================================
+
+def test_variant_names_stay_inside_out_dir(tmp_path):
+    plans = [dataclasses.replace(create_slides.DEFAULT_PLAN, name="../外/建設"), create_slides.DEFAULT_PLAN]
+    outputs = create_slides.variant_output_paths(plans, str(tmp_path))
+    assert all(os.path.dirname(path) == str(tmp_path) for path in outputs)
+
+@pytest.mark.parametrize("names", [("建設", "建設"), ("a/b", "a:b"), ("Deck", "deck")])
+def test_variants_reject_duplicate_names(tmp_path, names):
+    plans = [dataclasses.replace(create_slides.DEFAULT_PLAN, name=name) for name in names]
+    with pytest.raises(ValueError, match="重複"):
+        create_slides.render_variants(plans, str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+# =============================================================================
+# スライドキャッシュ（user-009）
+# =============================================================================
+
+def cached_entries(cache):
+    return sorted(name[:-len(".pickle")] for name in os.listdir(cache.directory))
+
+def test_slide_cache_evicts_expired_entries(tmp_path):
+    cache = create_slides.SlideCache(str(tmp_path), max_bytes=None, max_age=3600)
+    for key in ("old", "new"):
+        cache.put(key, b"x" * 100)
+    old = time.time() - 7200
+    os.utime(cache._path("old"), (old, old))
+    assert cache.evict() == 1
+    assert cached_entries(cache) == ["new"]
+
+def test_slide_cache_evicts_least_recently_used_over_capacity(tmp_path):
+    cache = create_slides.SlideCache(str(tmp_path), max_bytes=None, max_age=None)
+    now = time.time()
+    for age, key in enumerate(("c", "b", "a")):
+        cache.put(key, b"x" * 1000)
+        os.utime(cache._path(key), (now - 100 * age, now - 100 * age))
+    # 読み出したエントリは最終利用が新しくなり、残る
+    assert cache.get("a") == b"x" * 1000
+    cache.max_bytes = os.path.getsize(cache._path("a")) * 2
+    assert cache.evict() == 1
+    assert cached_entries(cache) == ["a", "c"]
+
+def test_slide_cache_drops_corrupt_entry(tmp_path):
+    cache = create_slides.SlideCache(str(tmp_path))
+    with open(cache._path("broken"), "wb") as f:
+        f.write(b"not a pickle")
+    assert cache.get("broken") is None
+    assert cached_entries(cache) == []
+
+def test_slide_cache_restores_identical_deck(tmp_path):
+    """キャッシュから復元したデッキは、作り直したデッキとパートの内容が一致する"""
+    cache = create_slides.SlideCache(str(tmp_path))
+    fresh = create_slides.package_digests(create_slides.build_presentation(slide_cache=cache))
+    restored = create_slides.build_presentation(slide_cache=cache)
+    assert cache.hits > 0
+    assert create_slides.package_digests(restored) == fresh
@@ -0,0 +1,53 @@
+"""
+deck_async の回帰テスト
+
+    python -m pytest -q test_deck_async.py
+"""
+
+import asyncio
+import threading
+
+from pptx import Presentation
+
+import create_slides
+import deck_async
+
+def test_concurrent_renders_to_same_output(tmp_path):
+    """同じ出力先への作成が重なっても、壊れていないデッキが1つだけ残る（ループをまたいで2回）"""
+    output = tmp_path / "deck.pptx"
+
+    async def render_all(renderer):
+        await asyncio.gather(*(renderer.render_deck(output_path=str(output)) for _ in range(4)))
+
+    renderer = deck_async.DeckRenderer(concurrency=2, workers=1)
+    try:
+        asyncio.run(render_all(renderer))
+        asyncio.run(render_all(renderer))
+    finally:
+        renderer.close()
+    assert [path.name for path in tmp_path.iterdir()] == ["deck.pptx"]
+    assert len(Presentation(str(output)).slides) == len(create_slides.CONTENT_SLIDES) + 1
+
+def test_slide_cache_put_from_threads(tmp_path):
+    """スレッドから同じキーを同時に保存しても、読み出せるエントリが1つだけ残る"""
+    cache = create_slides.SlideCache(str(tmp_path))
+    snapshots = [create_slides.capture_slide(slide)
+                 for slide in list(create_slides.build_presentation(use_template=False).slides)[:4]]
+
+    errors = []
+
+    def put(snapshot):
+        try:
+            for _ in range(50):
+                cache.put("key", snapshot)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=put, args=(snapshot,)) for snapshot in snapshots]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert [path.name for path in tmp_path.iterdir()] == ["key.pickle"]
+    assert cache.get("key") in snapshots
@@ -0,0 +1,23 @@
+"""
+deck_cli の回帰テスト
+
+    python -m pytest -q test_deck_cli.py
+"""
+
+import pytest
+
+import deck_cli
+
+@pytest.mark.parametrize("command", ["render", "batch", "merge", "variants", "watch", "diff", "export", "bench"])
+def test_help_is_delegated(command, capsys):
+    """委譲するサブコマンドの -h は、位置引数がなくても委譲先のヘルプを表示する"""
+    with pytest.raises(SystemExit) as exc:
+        deck_cli.main([command, "-h"])
+    assert exc.value.code == 0
+    assert "usage:" in capsys.readouterr().out
+
+@pytest.mark.parametrize("command", ["batch", "merge"])
+def test_missing_positional_is_an_error(command):
+    with pytest.raises(SystemExit) as exc:
+        deck_cli.main([command])
+    assert exc.value.code == 2
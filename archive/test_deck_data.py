@@ -0,0 +1,102 @@
+"""
+deck_data の回帰テスト
+
+    python -m pytest -q test_deck_data.py
+"""
+
+import zipfile
+
+import pytest
+
+import deck_data
+
+ROWS = [{"name": "山田建設", "industry": "建設業"}, {"name": "佐藤介護", "industry": "介護"}]
+
+def write_csv(tmp_path, data, name="rows.csv"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+# =============================================================================
+# CSV
+# =============================================================================
+
+@pytest.mark.parametrize("encoding, prefix", [("utf-8", b""), ("utf-8", b"\xef\xbb\xbf"), ("cp932", b"")],
+                         ids=["utf-8", "utf-8-bom", "cp932"])
+def test_csv_encodings(tmp_path, encoding, prefix):
+    text = "name,industry\r\n山田建設,建設業\r\n佐藤介護,介護\r\n"
+    path = write_csv(tmp_path, prefix + text.encode(encoding))
+    read_as = "cp932" if encoding == "cp932" else deck_data.DEFAULT_ENCODING
+    assert list(deck_data.iter_rows(path, encoding=read_as)) == ROWS
+
+def test_csv_skips_blank_rows_and_keeps_quoted_newlines(tmp_path):
+    path = write_csv(tmp_path, "name, industry \n\n,\n\"山田\n建設\",建設業\n  ,  \n".encode())
+    assert list(deck_data.iter_rows(path)) == [{"name": "山田\n建設", "industry": "建設業"}]
+
+def test_csv_decode_error_names_file_and_line(tmp_path):
+    path = write_csv(tmp_path, "name\nA社\n".encode() + "佐藤\n".encode("cp932"))
+    with pytest.raises(deck_data.DataError, match=r"rows\.csv: 3行目を utf-8-sig として読めません"):
+        list(deck_data.iter_rows(path))
+
+def test_csv_truncated_multibyte_at_end_is_an_error(tmp_path):
+    path = write_csv(tmp_path, "name\n山田".encode()[:-1])
+    with pytest.raises(deck_data.DataError, match="2行目"):
+        list(deck_data.iter_rows(path))
+
+def test_csv_unknown_encoding(tmp_path):
+    path = write_csv(tmp_path, b"name\nA\n")
+    with pytest.raises(deck_data.DataError, match="文字コードが分かりません"):
+        list(deck_data.iter_rows(path, encoding="no-such-encoding"))
+
+# =============================================================================
+# XLSX
+# =============================================================================
+
+WORKBOOK = """<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+ xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="表紙" sheetId="1" r:id="rId1"/><sheet name="リスト" sheetId="2" r:id="rId2"/></sheets>
+</workbook>"""
+
+WORKBOOK_RELS = """<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Target="/xl/worksheets/sheet2.xml"/>
+</Relationships>"""
+
+SHARED_STRINGS = """<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<si><t>name</t></si><si><t>industry</t></si><si><r><t>山田</t></r><r><t>建設</t></r></si>
+</sst>"""
+
+SHEET = """<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>
+<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c></row>
+<row r="2"><c r="A2"><v></v></c></row>
+<row r="3"><c r="A3" t="s"><v>2</v></c><c r="B3" t="inlineStr"><is><t>建設業</t></is></c></row>
+<row r="4"><c r="B4"><v>12.0</v></c></row>
+</sheetData></worksheet>"""
+
+EMPTY_SHEET = """<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"/>"""
+
+def write_xlsx(tmp_path):
+    path = tmp_path / "rows.xlsx"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("xl/workbook.xml", WORKBOOK)
+        zf.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        zf.writestr("xl/sharedStrings.xml", SHARED_STRINGS)
+        zf.writestr("xl/worksheets/sheet1.xml", EMPTY_SHEET)
+        zf.writestr("xl/worksheets/sheet2.xml", SHEET)
+    return str(path)
+
+def test_xlsx_rows_by_sheet_name(tmp_path):
+    path = write_xlsx(tmp_path)
+    assert list(deck_data.iter_rows(path, sheet="リスト")) == [
+        {"name": "山田建設", "industry": "建設業"},
+        {"name": "", "industry": "12"},
+    ]
+    assert list(deck_data.iter_rows(path)) == []
+
+def test_xlsx_unknown_sheet(tmp_path):
+    with pytest.raises(deck_data.DataError, match="シートが見つかりません"):
+        list(deck_data.iter_rows(write_xlsx(tmp_path), sheet="なし"))
+
+def test_unsupported_suffix(tmp_path):
+    with pytest.raises(deck_data.DataError):
+        list(deck_data.iter_rows(str(tmp_path / "rows.txt")))
@@ -0,0 +1,68 @@
+"""
+deck_diff の回帰テスト
+
+    python -m pytest -q test_deck_diff.py
+"""
+
+import json
+
+from pptx import Presentation
+from pptx.util import Inches
+
+import create_slides
+import deck_diff
+
+def save(plan, path):
+    create_slides.build_presentation(plan).save(str(path))
+    return str(path)
+
+def test_identical_decks_have_no_changes(tmp_path):
+    old = save(create_slides.DEFAULT_PLAN, tmp_path / "old.pptx")
+    new = save(create_slides.DEFAULT_PLAN, tmp_path / "new.pptx")
+    assert deck_diff.diff_decks(old, new) == []
+
+def test_text_change_is_reported_on_its_slide(tmp_path):
+    old = save(create_slides.DEFAULT_PLAN.with_overrides(prospect="株式会社A"), tmp_path / "old.pptx")
+    new = save(create_slides.DEFAULT_PLAN.with_overrides(prospect="株式会社B"), tmp_path / "new.pptx")
+    changes = deck_diff.diff_decks(old, new)
+    assert [(change.slide, change.kind) for change in changes] == [(1, "text")]
+    assert "株式会社A" in changes[0].before and "株式会社B" in changes[0].after
+    assert "+株式会社B 御中" in deck_diff.format_change(changes[0].to_dict())
+
+def test_position_style_and_added_shapes(tmp_path):
+    old = save(create_slides.DEFAULT_PLAN, tmp_path / "old.pptx")
+    prs = Presentation(old)
+    shapes = [shape for shape in prs.slides[1].shapes if shape.has_text_frame and shape.text_frame.text]
+    shapes[0].left += Inches(0.5)
+    run = shapes[1].text_frame.paragraphs[0].runs[0]
+    run.font.bold = not run.font.bold
+    prs.slides[1].shapes.add_textbox(Inches(1), Inches(1), Inches(1), Inches(1)).text_frame.text = "追加"
+    new = str(tmp_path / "new.pptx")
+    prs.save(new)
+    kinds = {(change.slide, change.kind) for change in deck_diff.diff_decks(old, new)}
+    assert kinds == {(2, "position"), (2, "style"), (2, "added")}
+
+def test_removed_slides(tmp_path):
+    old = save(create_slides.DEFAULT_PLAN, tmp_path / "old.pptx")
+    new = save(create_slides.DEFAULT_PLAN, tmp_path / "new.pptx")
+    prs = Presentation(new)
+    slide_ids = prs.slides._sldIdLst
+    slide_ids.remove(slide_ids[-1])
+    prs.save(new)
+    last = len(create_slides.CONTENT_SLIDES) + 1
+    assert [(change.slide, change.kind) for change in deck_diff.diff_decks(old, new)] == [(last, "slide_removed")]
+
+def test_directories_pair_by_relative_path(tmp_path, capsys):
+    for side in ("old", "new"):
+        (tmp_path / side / "sub").mkdir(parents=True)
+        save(create_slides.DEFAULT_PLAN, tmp_path / side / "sub" / "same.pptx")
+    save(create_slides.DEFAULT_PLAN, tmp_path / "old" / "gone.pptx")
+    save(create_slides.DEFAULT_PLAN.with_overrides(industry="介護"), tmp_path / "new" / "gone.pptx")
+    save(create_slides.DEFAULT_PLAN, tmp_path / "new" / "added.pptx")
+
+    assert deck_diff.main([str(tmp_path / "old"), str(tmp_path / "new"), "--json", "-", "--workers", "1"]) == 1
+    report = json.loads(capsys.readouterr().out)
+    assert report["added"] == ["added.pptx"]
+    assert report["removed"] == []
+    changed = {path: bool(result["changes"]) for path, result in report["results"].items()}
+    assert changed == {str(tmp_path / "new" / "gone.pptx"): True, str(tmp_path / "new" / "sub" / "same.pptx"): False}
@@ -0,0 +1,89 @@
+"""
+deck_export の回帰テスト（LibreOffice / poppler の代わりに同じ引数を受ける偽の実行ファイルを使う）
+
+    python -m pytest -q test_deck_export.py
+"""
+
+import os
+import stat
+
+import pytest
+
+import deck_export
+
+FAKE_SOFFICE = """#!/bin/sh
+out=""; prev=""
+for a in "$@"; do
+  [ "$prev" = "--outdir" ] && out="$a"
+  prev="$a"; f="$a"
+done
+case "$*" in *terminate_after_init*) exit 0;; esac
+b=$(basename "$f" .pptx); echo pdf > "$out/$b.pdf"
+"""
+
+FAKE_PDFTOPPM = """#!/bin/sh
+{sleep}
+for a in "$@"; do last="$a"; done
+for i in 1 2; do echo png > "$last-$i.png"; done
+"""
+
+def executable(path, text):
+    path.write_text(text)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+@pytest.fixture
+def tools(tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    return {
+        "soffice": executable(bin_dir / "soffice", FAKE_SOFFICE),
+        "pdftoppm": executable(bin_dir / "pdftoppm", FAKE_PDFTOPPM.format(sleep="")),
+        "slow_pdftoppm": executable(bin_dir / "slow_pdftoppm", FAKE_PDFTOPPM.format(sleep="sleep 5")),
+    }
+
+def decks(tmp_path, *names):
+    paths = []
+    for name in names:
+        path = tmp_path / "in" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+        paths.append(str(path))
+    return paths
+
+def test_same_basename_in_subdirectories(tmp_path, tools):
+    """別ディレクトリの同名デッキは、サブディレクトリを保って別々に書き出す"""
+    paths = decks(tmp_path, "a/x.pptx", "b/x.pptx")
+    out = tmp_path / "out"
+    with deck_export.ExportPool(str(out), workers=1, soffice=tools["soffice"], pdftoppm=tools["pdftoppm"],
+                                base_dir=str(tmp_path / "in")) as pool:
+        results = list(pool.map(paths))
+    assert all(result.ok for result in results)
+    assert sorted(os.path.relpath(os.path.join(root, name), out)
+                  for root, _, names in os.walk(out) for name in names) == [
+        "a/x-1.png", "a/x-2.png", "a/x.pdf", "b/x-1.png", "b/x-2.png", "b/x.pdf"]
+
+def test_same_output_without_base_dir_fails_one_deck(tmp_path, tools):
+    paths = decks(tmp_path, "a/x.pptx", "b/x.pptx")
+    with deck_export.ExportPool(str(tmp_path / "out"), workers=1, formats=("pdf",), soffice=tools["soffice"]) as pool:
+        results = list(pool.map(paths))
+    assert sorted(result.ok for result in results) == [False, True]
+
+def test_write_error_is_reported_per_deck(tmp_path, tools):
+    """出力先に書き込めないデッキだけが失敗し、バッチは続く"""
+    paths = decks(tmp_path, "a/x.pptx", "y.pptx")
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "a").write_text("ディレクトリの代わりのファイル")
+    with deck_export.ExportPool(str(out), workers=1, formats=("pdf",), retries=0, soffice=tools["soffice"],
+                                base_dir=str(tmp_path / "in")) as pool:
+        results = {os.path.basename(result.deck): result for result in pool.map(paths)}
+    assert results["y.pptx"].ok
+    assert "書き込めません" in results["x.pptx"].error
+
+def test_thumbnail_stage_uses_pool_timeout(tmp_path, tools):
+    paths = decks(tmp_path, "x.pptx")
+    with deck_export.ExportPool(str(tmp_path / "out"), workers=1, timeout=0.5, retries=0,
+                                soffice=tools["soffice"], pdftoppm=tools["slow_pdftoppm"]) as pool:
+        result, = pool.map(paths)
+    assert "タイムアウト" in result.error
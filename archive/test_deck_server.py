@@ -0,0 +1,62 @@
+"""
+deck_server の回帰テスト
+
+    python -m pytest -q test_deck_server.py
+"""
+
+import http.client
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import deck_server
+
+@pytest.fixture
+def server():
+    service = deck_server.RenderService(workers=1, queue_size=2)
+    service.warm_up()
+    httpd = deck_server.make_server(service, port=0, quiet=True)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    service.shutdown()
+
+def request(server, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=60)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_invalid_content_length_is_rejected(server, length):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    conn.putrequest("POST", "/render")
+    conn.putheader("Content-Length", length)
+    conn.endheaders()
+    assert conn.getresponse().status == 400
+    conn.close()
+
+def test_broken_pool_is_rebuilt(server):
+    """ワーカーが落ちたらそのリクエストは 503、プールを作り直して次から作成できる"""
+    service = server.service
+    assert request(server, "POST", "/render", b"{}")[0] == 200
+
+    service.executor.submit(os._exit, 1)
+    deadline = time.time() + 10
+    while not service.status()["broken"] and time.time() < deadline:
+        time.sleep(0.05)
+    status, body = request(server, "GET", "/healthz")
+    assert status == 503 and json.loads(body)["broken"]
+
+    assert request(server, "POST", "/render", b"{}")[0] == 503
+    status, body = request(server, "GET", "/healthz")
+    assert status == 200 and json.loads(body)["restarts"] == 1
+    assert request(server, "POST", "/render", b"{}")[0] == 200
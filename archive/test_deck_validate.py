@@ -0,0 +1,73 @@
+"""
+deck_validate の回帰テスト
+
+    python -m pytest -q test_deck_validate.py
+"""
+
+import random
+import time
+
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+import create_slides
+import deck_validate
+from deck_validate import ShapeBox
+
+def textbox_deck(path, boxes):
+    """(left, top, width, height) インチのテキストボックスを並べた1枚のデッキ"""
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = Inches(13.333), Inches(7.5)
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    for i, (left, top, width, height) in enumerate(boxes):
+        shape = slide.shapes.add_textbox(Inches(left), Inches(top), Inches(width), Inches(height))
+        shape.name = f"box{i}"
+        shape.text_frame.text = f"テキスト{i}"
+    prs.save(str(path))
+    return str(path)
+
+def test_generated_deck_is_clean(tmp_path):
+    path = tmp_path / "deck.pptx"
+    create_slides.build_presentation().save(str(path))
+    assert deck_validate.validate_deck(str(path)) == []
+
+def test_collision_and_out_of_bounds(tmp_path):
+    path = textbox_deck(tmp_path / "deck.pptx", [(1, 1, 3, 1), (2, 1.1, 3, 1), (6, 1, 2, 1), (12, 6, 2, 1)])
+    issues = {(issue.kind, issue.shapes) for issue in deck_validate.validate_deck(path)}
+    assert issues == {("collision", ("box0", "box1")), ("out_of_bounds", ("box3",))}
+
+def test_touching_boxes_within_tolerance_do_not_collide(tmp_path):
+    path = textbox_deck(tmp_path / "deck.pptx", [(1, 1, 3, 1), (4, 1, 3, 1), (1, 2, 3, 1)])
+    assert deck_validate.validate_deck(path) == []
+
+def brute_force(boxes, tolerance=deck_validate.TOLERANCE):
+    found = set()
+    texts = [box for box in boxes if box.text]
+    for i, a in enumerate(texts):
+        for b in texts[i + 1:]:
+            overlap_x = min(a.right, b.right) - max(a.left, b.left)
+            overlap_y = min(a.bottom, b.bottom) - max(a.top, b.top)
+            if overlap_x > tolerance and overlap_y > tolerance:
+                found.add(frozenset((a.shape_id, b.shape_id)))
+    return found
+
+@pytest.mark.parametrize("seed", range(5))
+def test_find_collisions_matches_brute_force(seed):
+    rng = random.Random(seed)
+    emu = 914400
+    boxes = [
+        ShapeBox(1, str(i), f"box{i}", rng.randrange(0, 12 * emu), rng.randrange(0, 7 * emu),
+                 rng.randrange(1, 3 * emu), rng.randrange(1, 2 * emu), "x" if rng.random() < 0.9 else "")
+        for i in range(300)
+    ]
+    found = {frozenset((a.shape_id, b.shape_id)) for a, b, _, _ in deck_validate.find_collisions(boxes)}
+    assert found == brute_force(boxes)
+
+def test_stacked_boxes_are_not_compared_pairwise():
+    """縦に積んだ重ならない図形が多くても、全組み合わせを調べない"""
+    height = 200000
+    boxes = [ShapeBox(1, str(i), f"box{i}", 0, i * height, 914400, height - 50000, "x") for i in range(8000)]
+    started = time.perf_counter()
+    assert deck_validate.find_collisions(boxes) == []
+    assert time.perf_counter() - started < 2.0
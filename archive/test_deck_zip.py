@@ -0,0 +1,77 @@
+"""
+deck_zip の回帰テスト
+
+    python -m pytest -q test_deck_zip.py
+"""
+
+import io
+import os
+import zipfile
+
+import pytest
+from pptx import Presentation
+
+import create_slides
+import deck_zip
+
+MEMBERS = {
+    "[Content_Types].xml": b"<Types/>" * 50,
+    "ppt/media/image1.png": os.urandom(2000),
+    "ppt/slides/スライド.xml": "<p:sld>日本語</p:sld>".encode("utf-8") * 50,
+}
+
+def write_zip(compression="default", store_media=False, media_store=None, reuse=False):
+    out = io.BytesIO()
+    writer = deck_zip.ZipWriter(out, compression, store_media, media_store)
+    for name, data in MEMBERS.items():
+        writer.write(name, data, reuse=reuse)
+    writer.close()
+    return out.getvalue()
+
+@pytest.mark.parametrize("compression", list(deck_zip.COMPRESSION_LEVELS))
+@pytest.mark.parametrize("store_media", [False, True])
+def test_round_trip(compression, store_media):
+    with zipfile.ZipFile(io.BytesIO(write_zip(compression, store_media))) as zf:
+        assert zf.testzip() is None
+        assert {name: zf.read(name) for name in zf.namelist()} == MEMBERS
+        methods = {info.filename: info.compress_type for info in zf.infolist()}
+    assert methods["ppt/media/image1.png"] == (zipfile.ZIP_STORED if store_media else zipfile.ZIP_DEFLATED)
+    assert methods["ppt/slides/スライド.xml"] == zipfile.ZIP_DEFLATED
+
+def test_media_store_reuses_compressed_members(tmp_path):
+    store = deck_zip.MediaStore(str(tmp_path))
+    first = write_zip("small", True, store, reuse=True)
+    assert (store.hits, store.misses) == (0, len(MEMBERS))
+    assert write_zip("small", True, store, reuse=True) == first
+    assert store.hits == len(MEMBERS)
+
+    # 別プロセス相当（メモリは空）でもディスクから再利用し、同じ内容になる
+    other = deck_zip.MediaStore(str(tmp_path))
+    data = write_zip("small", True, other, reuse=True)
+    assert (other.hits, other.misses) == (len(MEMBERS), 0)
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        assert {name: zf.read(name) for name in zf.namelist()} == MEMBERS
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        deck_zip.ZipWriter(io.BytesIO(), "fastest")
+
+@pytest.mark.parametrize("options", [
+    create_slides.SaveOptions("fast"),
+    create_slides.SaveOptions("small", store_media=True),
+    create_slides.SaveOptions("fast", store_media=True, media_store=True),
+], ids=["fast", "small-store", "media-store"])
+def test_saved_deck_matches_default_save(tmp_path, monkeypatch, options):
+    """zip の設定を変えても、パートの内容は python-pptx の保存と同じ"""
+    monkeypatch.setattr(create_slides, "_media_store", deck_zip.MediaStore(str(tmp_path / "media")))
+    prs = create_slides.build_presentation()
+    default, tuned = tmp_path / "default.pptx", tmp_path / "tuned.pptx"
+    prs.save(str(default))
+    for _ in range(2):
+        create_slides.save_presentation(prs, str(tuned), options=options)
+    with zipfile.ZipFile(default) as a, zipfile.ZipFile(tuned) as b:
+        assert b.testzip() is None
+        assert a.namelist() == b.namelist()
+        assert all(a.read(name) == b.read(name) for name in a.namelist())
+    assert len(Presentation(str(tuned)).slides) == len(create_slides.CONTENT_SLIDES) + 1